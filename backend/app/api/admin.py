@@ -1,13 +1,15 @@
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, HTTPException, status
+from pydantic import BaseModel
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 import os
 
 from app.database import get_db
 from app.db_models import User, SupportInquiry, Notice, EmailVerification, Pet, RefreshToken, FavoriteHospital, HospitalReview, UserAlert
 from app.utils.auth import get_current_admin_user
 from app.schemas import APIResponse, NoticeResponse
+from app.api import predict
 
 
 router = APIRouter()
@@ -155,4 +157,35 @@ def delete_notice_by_admin(
         return APIResponse(success=True, message="공지사항이 성공적으로 삭제되었습니다.", data={"notice_id": notice_id})
     except Exception as e:
         db.rollback()
-        return APIResponse(success=False, message=f"공지사항 삭제 실패: {str(e)}")
\ No newline at end of file
+        return APIResponse(success=False, message=f"공지사항 삭제 실패: {str(e)}")
+
+
+# --- AI 모델 버전 관리 ---
+class ModelReloadRequest(BaseModel):
+    version: Optional[str] = None  # 생략하면 레지스트리의 활성 버전
+
+
+@router.get("/models", response_model=APIResponse)
+def get_model_versions(current_user: User = Depends(get_current_admin_user)):
+    """등록된 모델 버전 목록과 현재 서비스 중인 버전을 조회합니다."""
+    try:
+        data = {"registry": predict.model_registry.manifest(), "state": predict.model_state}
+        return APIResponse(success=True, message="모델 버전 조회 성공", data=data)
+    except Exception as e:
+        return APIResponse(success=False, message=f"모델 버전 조회 실패: {str(e)}")
+
+
+@router.post("/models/reload", response_model=APIResponse)
+async def reload_model_version(
+    reload_request: ModelReloadRequest = Body(default_factory=ModelReloadRequest),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    지정한 버전을 백그라운드로 로드 + warm-up한 뒤 무중단으로 교체합니다.
+    (로드하는 동안 진단 요청은 기존 모델로 처리되며, 실패하면 기존 모델을 유지)
+    """
+    try:
+        info = await predict.hot_reload(reload_request.version)
+    except Exception as e:
+        return APIResponse(success=False, message=f"모델 교체 실패: {str(e)}")
+    return APIResponse(success=True, message=f"{info['version']} 모델로 교체되었습니다", data=info)
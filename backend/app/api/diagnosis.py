@@ -1,4 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query
+import os
+import asyncio
+import uuid
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query, File, Form, UploadFile
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, Field, validator
 from datetime import datetime, timedelta, timezone
@@ -10,16 +13,31 @@ from app.database import get_db
 from app.db_models import DiagnosisHistory, Pet, User, UserAlert
 from app.utils.auth import get_current_user
 from app.api.notifications import EmailService
+from app.utils.model_registry import with_model_version
+from app.inference.common import get_embedding_stores
+from app.inference.common import parse_roi_box
+from app.utils.inference_executor import InferenceQueueFull
+from app.utils.upload import IngestedUpload
+from app.api.predict import (
+    get_pending_embedding, ingest_upload, model_state, predict_upload, queue_full_response
+)
 
 router = APIRouter(tags=["Diagnosis"], prefix="/diagnosis")
 email_service = EmailService()
 
+# /diagnosis/predict로 진단한 업로드 이미지 저장 폴더 (서버 작업 디렉터리 기준, /uploads로 제공)
+DIAGNOSIS_UPLOAD_DIR = os.getenv("DIAGNOSIS_UPLOAD_DIR", "uploads/diagnosis")
+# true면 유사 사례 검색에 다른 사용자의 진단도 포함 (진단명 / 신뢰도만, 기본은 본인 기록만)
+SIMILAR_INCLUDE_OTHER_USERS = os.getenv("SIMILAR_INCLUDE_OTHER_USERS", "false").lower() == "true"
+
 # ------------------- Pydantic 모델 정의 -------------------
 class DiagnosisCreate(BaseModel):
     pet_id: int = Field(..., example=1)
     diagnosis: str = Field(..., example="피부염")
     confidence: float = Field(..., ge=0.0, le=1.0, example=0.95)
     details: Optional[str] = Field(None, example="추가 설명")
+    model_version: Optional[str] = Field(None, example="2025-07-01")  # 예측 응답의 model_version
+    prediction_id: Optional[str] = Field(None, example="3f2a...")  # 예측 응답의 prediction_id (유사 사례 검색용)
 
     @validator("confidence")
     def confidence_range(cls, v):
@@ -70,7 +88,7 @@ async def save_diagnosis(
             pet_id=diag_data.pet_id,
             diagnosis=diag_data.diagnosis,
             confidence=diag_data.confidence,
-            details=diag_data.details
+            details=with_model_version(diag_data.details, diag_data.model_version)
         )
         db.add(new_diag)
         db.commit()
@@ -79,12 +97,13 @@ async def save_diagnosis(
         db.rollback()
         raise HTTPException(status_code=500, detail=f"저장 실패: {str(e)}")
 
+    # 예측 때 계산한 임베딩을 이 기록의 유사 사례 검색용으로 저장 (응답 후 처리)
+    pending = get_pending_embedding(diag_data.prediction_id)
+    if pending is not None:
+        background_tasks.add_task(store_embedding, new_diag.id, *pending)
+
     # 알림 전송(비동기)
-    alerts = db.query(UserAlert).filter(
-        UserAlert.user_id == current_user.id,
-        UserAlert.diagnosis_alert == False
-    ).first()
-    if alerts:
+    if wants_diagnosis_alert(db, current_user.id):
         background_tasks.add_task(
             send_diagnosis_email,
             current_user.email,
@@ -101,6 +120,95 @@ async def save_diagnosis(
         created_at=new_diag.created_at
     )
 
+# ------------------- 진단 + 결과 저장 -------------------
+@router.post("/predict", response_model=APIResponse)
+async def predict_and_save(
+    background_tasks: BackgroundTasks,
+    pet_id: int = Form(...),
+    file: UploadFile = File(...),
+    roi: Optional[str] = Form(None),
+    details: Optional[str] = Form(None),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    이미지 진단 후 결과를 바로 진단 이력으로 저장 (/predict + /diagnosis/save를 한 번에)
+    - 신뢰도는 서버에서 계산한 값을 그대로 저장하며, 업로드 이미지는 image_path로 기록에 연결
+    - 모델 실행 중에는 DB 커넥션을 잡고 있지 않음 (소유권 확인 후 반환, 예측이 끝나면 다시 받아 저장)
+    """
+    pet = db.query(Pet).filter(
+        Pet.id == pet_id,
+        Pet.user_id == current_user.id
+    ).first()
+    if not pet:
+        return APIResponse(success=False, message="반려동물을 찾을 수 없습니다.", data=None)
+    user_id, user_email, pet_name = current_user.id, current_user.email, pet.name
+    send_alert = wants_diagnosis_alert(db, user_id)
+    db.rollback()  # 읽기 트랜잭션 종료 → 예측하는 동안 커넥션을 풀에 반환
+
+    try:
+        upload = await ingest_upload(file)
+        roi_box = parse_roi_box(roi) if roi else None
+    except ValueError as e:
+        return APIResponse(success=False, message=str(e), data=None)
+
+    try:
+        result, reused = await predict_upload(upload, roi_box, user_email)
+    except InferenceQueueFull:
+        return queue_full_response()
+    except Exception as e:
+        return APIResponse(success=False, message=f"진단 처리 중 오류 발생: {str(e)}", data=None)
+    if result.get("rejected"):
+        return APIResponse(
+            success=False,
+            message=result["message"],
+            data={"rejected": result["rejected"], "quality": result["quality"]}
+        )
+
+    model_version = result.get("model_version")
+    try:
+        image_path = await asyncio.to_thread(store_upload, upload, user_id)
+    except OSError as e:
+        return APIResponse(success=False, message=f"이미지 저장 실패: {str(e)}", data=None)
+
+    try:
+        new_diag = DiagnosisHistory(
+            pet_id=pet_id,
+            diagnosis=result["label"],
+            confidence=round(result["probability"], 2),
+            details=with_model_version(details, model_version),
+            image_path=image_path
+        )
+        db.add(new_diag)
+        db.commit()
+        db.refresh(new_diag)
+    except Exception as e:
+        db.rollback()
+        remove_upload(image_path)
+        return APIResponse(success=False, message=f"저장 실패: {str(e)}", data=None)
+
+    pending = get_pending_embedding(result.get("prediction_id"))
+    if pending is not None:
+        background_tasks.add_task(store_embedding, new_diag.id, *pending)
+    if send_alert:
+        background_tasks.add_task(send_diagnosis_email, user_email, pet_name, new_diag.diagnosis)
+
+    return APIResponse(
+        success=True,
+        message="AI 진단 결과가 저장되었습니다",
+        data={
+            "id": new_diag.id,
+            "pet_name": pet_name,
+            "diagnosis": new_diag.diagnosis,
+            "confidence": new_diag.confidence,
+            "details": new_diag.details,
+            "image_path": image_path,
+            "model_version": model_version,
+            "reused": reused,
+            "created_at": new_diag.created_at
+        }
+    )
+
 # ------------------- 진단 이력 조회 -------------------
 @router.get("/history/{pet_id}", response_model=APIResponse)
 def get_diagnosis_history(
@@ -228,8 +336,12 @@ def delete_diagnosis(
         )
 
     try:
+        image_path = diagnosis.image_path
         db.delete(diagnosis)
         db.commit()
+        remove_embedding(diagnosis_id)
+        if image_path:
+            remove_upload(image_path)  # /diagnosis/predict로 저장한 업로드 이미지
         return APIResponse(
             success=True,
             message="진단 기록이 삭제되었습니다",
@@ -243,7 +355,107 @@ def delete_diagnosis(
             data=None
         )
 
+# ------------------- 유사 사례 검색 -------------------
+@router.get("/{diagnosis_id}/similar", response_model=APIResponse)
+def get_similar_diagnoses(
+    diagnosis_id: int,
+    k: int = Query(10, ge=1, le=50, description="최대 결과 수"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    진단 기록과 이미지 특징이 비슷한 과거 진단 사례 (코사인 유사도 내림차순)
+    - 기본은 본인 반려동물의 기록만 검색
+    - SIMILAR_INCLUDE_OTHER_USERS면 다른 사용자의 사례도 포함하되 진단명 / 신뢰도만 반환 (ID, 이름, 날짜 제외)
+    """
+    diagnosis = db.query(DiagnosisHistory).join(Pet).filter(
+        DiagnosisHistory.id == diagnosis_id,
+        Pet.user_id == current_user.id
+    ).first()
+    if not diagnosis:
+        return APIResponse(success=False, message="진단 기록을 찾을 수 없습니다", data=None)
+
+    try:
+        candidate_ids = None
+        if not SIMILAR_INCLUDE_OTHER_USERS:
+            candidate_ids = [
+                row.id for row in db.query(DiagnosisHistory.id).join(Pet).filter(Pet.user_id == current_user.id)
+            ]
+        found = get_embedding_stores().similar(
+            diagnosis_id, k, prefer=model_state["version"], candidate_ids=candidate_ids
+        )
+        if found is None:
+            return APIResponse(success=False, message="유사 사례 검색 정보가 없는 진단 기록입니다", data=None)
+        version, matches = found
+
+        # 저장소에는 남아 있지만 DB에서 지워진 기록(반려동물 삭제 등)은 제외
+        query = db.query(DiagnosisHistory, Pet).join(Pet).filter(
+            DiagnosisHistory.id.in_([match_id for match_id, _ in matches])
+        )
+        if not SIMILAR_INCLUDE_OTHER_USERS:
+            query = query.filter(Pet.user_id == current_user.id)
+        records = {d.id: (d, pet) for d, pet in query.all()}
+        results = []
+        for match_id, similarity in matches:
+            if match_id not in records:
+                continue
+            d, pet = records[match_id]
+            own = pet.user_id == current_user.id
+            results.append({
+                "id": d.id if own else None,
+                "pet_name": pet.name if own else None,
+                "own": own,
+                "diagnosis": d.diagnosis,
+                "confidence": d.confidence,
+                "similarity": round(similarity, 4),
+                "created_at": d.created_at if own else None
+            })
+        return APIResponse(
+            success=True,
+            message="유사 사례 조회 성공",
+            data={"diagnosis_id": diagnosis_id, "model_version": version, "results": results}
+        )
+    except Exception as e:
+        return APIResponse(success=False, message=f"유사 사례 조회 실패: {str(e)}", data=None)
+
 # ------------------- 공통 유틸리티 -------------------
+def wants_diagnosis_alert(db: Session, user_id: int) -> bool:
+    """진단 결과 알림 이메일 발송 대상인지 (알림 설정 기준)"""
+    return db.query(UserAlert).filter(
+        UserAlert.user_id == user_id,
+        UserAlert.diagnosis_alert == False
+    ).first() is not None
+
+def store_upload(upload: IngestedUpload, user_id: int) -> str:
+    """업로드 이미지를 DIAGNOSIS_UPLOAD_DIR에 저장하고 DB에 기록할 상대 경로 반환 (확장자는 판별한 형식 기준)"""
+    os.makedirs(DIAGNOSIS_UPLOAD_DIR, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    path = os.path.join(DIAGNOSIS_UPLOAD_DIR, f"{user_id}_{timestamp}_{uuid.uuid4().hex[:8]}{upload.extension}")
+    with open(path, "wb") as f:
+        f.write(upload.content)
+    return path
+
+def remove_upload(path: str):
+    """저장에 실패했거나 삭제된 진단의 업로드 이미지 삭제 (이미 없으면 무시)"""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def store_embedding(diagnosis_id: int, model_version: Optional[str], embedding: bytes):
+    """진단 기록 임베딩을 모델 버전별 저장소에 추가"""
+    try:
+        get_embedding_stores().get(model_version or "default").add(diagnosis_id, embedding)
+    except Exception as e:
+        print(f"임베딩 저장 실패: {e}")
+
+def remove_embedding(diagnosis_id: int):
+    """삭제된 진단 기록을 유사 사례 검색에서 제외"""
+    try:
+        get_embedding_stores().remove(diagnosis_id)
+    except Exception as e:
+        print(f"임베딩 삭제 실패: {e}")
+
 async def send_diagnosis_email(email: str, pet_name: str, diagnosis: str):
     """진단 결과 알림 이메일 발송"""
     try:
@@ -0,0 +1,21 @@
+# app/api/health.py
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+
+from app.api import predict
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+@router.get("/live")
+async def liveness():
+    """프로세스 생존 여부 (모델 상태와 무관)"""
+    return {"status": "ok"}
+
+@router.get("/ready")
+async def readiness():
+    """모델 로드 + warm-up 완료 여부 (준비 전에는 503 → 로드밸런서가 트래픽을 보내지 않음)"""
+    ready = predict.models_ready()
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"status": "ready" if ready else "not_ready", "models": predict.model_state}
+    )
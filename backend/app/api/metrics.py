@@ -0,0 +1,13 @@
+# app/api/metrics.py
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from app.api import predict  # noqa: F401 (예측 지표 등록)
+from app.utils.metrics import registry, CONTENT_TYPE
+
+router = APIRouter(tags=["metrics"])
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus 스크랩용 지표 (단계별 처리 시간, 라우팅, 대기열, 캐시)"""
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
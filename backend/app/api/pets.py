@@ -4,9 +4,9 @@ from sqlalchemy.orm import Session
 from app.database import SessionLocal, get_db
 from app.db_models import Pet, User
 from app.utils.auth import get_current_user
+from app.utils.upload import UPLOAD_MAX_IMAGE_BYTES, UploadRejected, save_image
 from fastapi.security import OAuth2PasswordBearer
 from typing import List, Optional
-import shutil
 import os
 from datetime import datetime
 from app.schemas import APIResponse, PetStatsResponse
@@ -62,15 +62,14 @@ def create_pet(
     # 사진 업로드 처리
     photo_path = None
     if photo and photo.filename:
-        upload_dir = "uploads/pets"
-        os.makedirs(upload_dir, exist_ok=True)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        file_extension = os.path.splitext(photo.filename)[1]
-        filename = f"{current_user.id}_{timestamp}{file_extension}"
-        photo_path = os.path.join(upload_dir, filename)
         try:
-            with open(photo_path, "wb") as buffer:
-                shutil.copyfileobj(photo.file, buffer)
+            # 형식(매직 넘버) / 크기를 확인하며 저장, 확장자는 판별한 형식 기준
+            photo_path = save_image(
+                photo.file, "uploads/pets", f"{current_user.id}_{timestamp}", UPLOAD_MAX_IMAGE_BYTES
+            ).path
+        except UploadRejected as e:
+            return APIResponse(success=False, message=str(e), data=None)
         except Exception as e:
             return APIResponse(
                 success=False,
@@ -176,17 +175,12 @@ def update_pet(
     try:
         # 3. 새 사진 업로드 처리
         if photo and photo.filename:
-            upload_dir = "uploads/pets"
-            os.makedirs(upload_dir, exist_ok=True)
-            
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            file_extension = os.path.splitext(photo.filename)[1]
-            filename = f"{current_user.id}_{timestamp}{file_extension}"
-            new_photo_path = os.path.join(upload_dir, filename)
-            
-            # 파일 저장
-            with open(new_photo_path, "wb") as buffer:
-                shutil.copyfileobj(photo.file, buffer)
+
+            # 파일 저장 (형식 / 크기 확인, 확장자는 판별한 형식 기준)
+            new_photo_path = save_image(
+                photo.file, "uploads/pets", f"{current_user.id}_{timestamp}", UPLOAD_MAX_IMAGE_BYTES
+            ).path
             
             # 기존 사진 경로 업데이트
             pet.photo = new_photo_path
@@ -222,6 +216,9 @@ def update_pet(
             }
         )
 
+    except UploadRejected as e:
+        db.rollback()
+        return APIResponse(success=False, message=str(e), data=None)
     except Exception as e:
         db.rollback()
         # 7. 업로드 실패 시 새로 업로드한 파일 삭제
@@ -1,198 +1,675 @@
 import os
+import io
 import json
-import cv2
-import numpy as np
-import torch
-import torch.nn as nn
-import torch.nn.functional as F
-import timm
-from pathlib import Path
+import asyncio
+import threading
+import uuid
+from datetime import datetime
+from typing import List, Optional
 from PIL import Image
-from fastapi import APIRouter, File, UploadFile, HTTPException, status
-from fastapi.responses import JSONResponse
-import albumentations as A
-from albumentations.pytorch import ToTensorV2
+from fastapi import APIRouter, Depends, File, Form, UploadFile, HTTPException, Request, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from app.schemas import APIResponse 
+from app.inference.common import (
+    INFERENCE_POOL_SOCKET, INFERENCE_POOL_AUTHKEY, PREDICT_MAX_BATCH_SIZE,
+    check_image_size, parse_roi_box, get_data_dir, model_registry, stage_seconds
+)
+from app.utils.batching import MicroBatcher
+from app.utils.inference_executor import InferenceExecutor, InferenceQueueFull
+from app.utils.prediction_cache import PredictionCache, content_hash
+from app.utils.prediction_jobs import PredictionJobStore
+from app.utils.inference_pool import InferencePoolClient
+from app.utils.metrics import registry as metrics_registry
+from app.utils.model_registry import format_model_version
+from app.utils.perceptual_hash import PerceptualHashIndex, dhash
+from app.utils.auth import get_optional_user_email
+from app.utils.upload import IngestedUpload, read_upload
 
 # 1. 환경 설정 ----------------------------------------------------
-device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-print(f"Using device: {device}")
-
-# 2. 경로 관리 함수 -----------------------------------------------
-def get_project_root() -> Path:
-    """프로젝트 루트 경로 계산"""
-    current_file = Path(__file__).resolve()
-    return current_file.parent.parent.parent  # src/app/api/predict.py → 프로젝트 루트
-
-def get_model_path(model_name: str) -> str:
-    """모델 파일 절대 경로 생성"""
-    model_dir = get_project_root() / "app" / "models"
-    model_path = model_dir / model_name
-    
-    if not model_path.exists():
-        raise FileNotFoundError(f"Model file not found: {model_path}")
-    return str(model_path)
-
-# 3. 라벨 매핑 ----------------------------------------------------
-binary_label_map = {0: "무증상", 1: "유증상"}
-disease_label_map = {
-    0: "구진_플라크",
-    1: "비듬_각질_상피성잔고리",
-    2: "태선화_과다색소침착",
-    3: "농포_여드름",
-    4: "미란_궤양",
-    5: "결절_종괴"
-}
-
-# 4. 모델 아키텍처 ------------------------------------------------
-class DualInputConvNeXt(nn.Module):
-    def __init__(self, model_name='convnext_base', num_classes=6):
-        super().__init__()
-        self.backbone = timm.create_model(model_name, pretrained=False, num_classes=0)
-        features = self.backbone.num_features
-        
-        self.classifier = nn.Sequential(
-            nn.AdaptiveAvgPool2d(1),
-            nn.Flatten(),
-            nn.Dropout(0.4),
-            nn.Linear(features*2, features),
-            nn.GELU(),
-            nn.BatchNorm1d(features),
-            nn.Dropout(0.3),
-            nn.Linear(features, features//2),
-            nn.GELU(),
-            nn.Dropout(0.2),
-            nn.Linear(features//2, num_classes)
-        )
+# 모델 / 전처리 / 추론 풀 주소 등 추론 엔진과 공유하는 설정은 app.inference.common
 
-    def forward(self, x_full, x_roi):
-        f_full = self.backbone.forward_features(x_full)
-        f_roi = self.backbone.forward_features(x_roi)
-        
-        if f_full.dim() == 4:
-            f_full = F.adaptive_avg_pool2d(f_full, 1)
-        if f_roi.dim() == 4:
-            f_roi = F.adaptive_avg_pool2d(f_roi, 1)
-            
-        combined = torch.cat([f_full, f_roi], dim=1)
-        return self.classifier(combined)
-
-# 5. ROI 추출기 ---------------------------------------------------
-class ROIExtractor:
-    def __init__(self, min_roi_size=64):
-        self.min_roi_size = min_roi_size
-
-    def _auto_detect(self, image: np.ndarray) -> tuple:
-        gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
-        blurred = cv2.GaussianBlur(gray, (5,5), 0)
-        _, thresh = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
-        
-        contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        max_area = 0
-        best_rect = (0,0,image.shape[1],image.shape[0])
-        
-        for cnt in contours:
-            x,y,w,h = cv2.boundingRect(cnt)
-            area = w * h
-            if area > max_area and w > self.min_roi_size and h > self.min_roi_size:
-                max_area = area
-                best_rect = (x,y,x+w,y+h)
-                
-        return best_rect
-
-    def extract(self, image: Image.Image) -> Image.Image:
-        np_image = np.array(image)
-        x1,y1,x2,y2 = self._auto_detect(np_image)
-        return image.crop((x1,y1,x2,y2))
-
-# 6. 전처리 파이프라인 --------------------------------------------
-def create_transform(size=320):
-    return A.Compose([
-        A.Resize(height=size, width=size),
-        A.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225]),
-        ToTensorV2()
-    ])
-
-# 7. 모델 로더 ----------------------------------------------------
-class SkinModel:
-    def __init__(self, model_path, num_classes):
-        self.model = DualInputConvNeXt(num_classes=num_classes).to(device)
-        self.transform = create_transform()
-        self.roi_extractor = ROIExtractor()
-        
-        state = torch.load(model_path, map_location=device)
-        state_dict = state.get("model_state_dict", state)
-        state_dict = {k.replace("module.", ""): v for k, v in state_dict.items()}
-        self.model.load_state_dict(state_dict, strict=False)
-        self.model.eval()
+# 서버 시작 시 백그라운드에서 모델을 미리 로드할지 여부 (false면 첫 요청 시 로드)
+PREDICT_PRELOAD_MODELS = os.getenv("PREDICT_PRELOAD_MODELS", "true").lower() == "true"
+
+# 모델 버전 레지스트리(app/models/registry.json) 활성 버전 변경 확인 주기 (초, 0이면 확인하지 않음)
+# 다른 워커에서 활성 버전을 바꾸면 이 주기 안에 백그라운드로 새 버전을 로드해 교체
+MODEL_REGISTRY_POLL_SECONDS = float(os.getenv("MODEL_REGISTRY_POLL_SECONDS", 30))
+
+# 마이크로 배치 설정 (동시 요청을 모아 한 번의 forward로 처리, 최대 크기는 PREDICT_MAX_BATCH_SIZE)
+PREDICT_MAX_WAIT_MS = float(os.getenv("PREDICT_MAX_WAIT_MS", 10))
+PREDICT_MAX_FILES = int(os.getenv("PREDICT_MAX_FILES", 16))  # /predict/batch 요청당 최대 파일 수
+
+# 추론 전용 실행기 설정 (대기열이 가득 차면 503 + Retry-After)
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", 1))
+INFERENCE_MAX_QUEUE = int(os.getenv("INFERENCE_MAX_QUEUE", 64))
+PREDICT_RETRY_AFTER_SECONDS = int(os.getenv("PREDICT_RETRY_AFTER_SECONDS", 2))
+
+# 예측 결과 캐시 설정 (같은 이미지 재업로드 시 모델 실행 생략, 0이면 비활성화)
+PREDICT_CACHE_SIZE = int(os.getenv("PREDICT_CACHE_SIZE", 1024))
+PREDICT_CACHE_TTL_SECONDS = float(os.getenv("PREDICT_CACHE_TTL_SECONDS", 3600))
+
+# 유사 업로드 재사용 (같은 사용자가 최근 올린 사진과 dHash 해밍 거리가 가까우면 모델 실행 생략)
+# 로그인한 사용자의 요청에만 적용, 거리는 128비트 중 다른 비트 수
+# (재압축/축소는 보통 0~3, 조금 잘라낸 사진은 3~16, 서로 다른 사진은 40 이상)
+PREDICT_DEDUP_ENABLED = os.getenv("PREDICT_DEDUP_ENABLED", "true").lower() == "true"
+PREDICT_DEDUP_MAX_DISTANCE = int(os.getenv("PREDICT_DEDUP_MAX_DISTANCE", 10))
+PREDICT_DEDUP_WINDOW_SECONDS = float(os.getenv("PREDICT_DEDUP_WINDOW_SECONDS", 3600))
+PREDICT_DEDUP_MAX_PER_USER = int(os.getenv("PREDICT_DEDUP_MAX_PER_USER", 20))
+PREDICT_DEDUP_SAVE_SECONDS = float(os.getenv("PREDICT_DEDUP_SAVE_SECONDS", 60))  # 인덱스 파일 저장 주기
+PREDICT_DEDUP_INDEX_PATH = os.getenv("PREDICT_DEDUP_INDEX_PATH", str(get_data_dir() / "phash_index.json"))
+
+# 예측 임베딩을 진단 결과 저장(/diagnosis/save의 prediction_id) 전까지 보관할 최대 개수 (보관 시간은 캐시 TTL)
+PREDICT_PENDING_EMBEDDINGS = int(os.getenv("PREDICT_PENDING_EMBEDDINGS", 4096))
+
+# 비동기 진단 작업 (/predict/jobs): 동시에 진행 가능한 작업 수, 끝난 작업 결과 보관 시간
+PREDICT_MAX_JOBS = int(os.getenv("PREDICT_MAX_JOBS", INFERENCE_MAX_QUEUE))
+PREDICT_JOB_TTL_SECONDS = float(os.getenv("PREDICT_JOB_TTL_SECONDS", 600))
+SSE_HEARTBEAT_SECONDS = 15  # 프록시가 유휴 연결을 끊지 않도록 보내는 주석 이벤트 간격
 
-    def predict(self, image_file):
+# 업로드 파일 크기 제한 (해상도 제한은 PREDICT_MAX_PIXELS)
+PREDICT_MAX_UPLOAD_BYTES = int(os.getenv("PREDICT_MAX_UPLOAD_BYTES", 20 * 1024 * 1024))
+# 진단에 받는 이미지 형식 (매직 넘버로 판별, HEIC는 PIL로 디코딩할 수 없어 제외)
+PREDICT_IMAGE_TYPES = ("jpeg", "png", "webp")
+
+# 단계별 처리 시간 측정 (/metrics 히스토그램), false면 측정 생략 (카운터/대기열 지표는 유지)
+PREDICT_TIMING = os.getenv("PREDICT_TIMING", "true").lower() == "true"
+metrics_registry.timing_enabled = PREDICT_TIMING
+request_seconds = metrics_registry.histogram(
+    "predict_request_seconds", "진단 API 요청 처리 시간 (대기열 대기 포함)", ["endpoint"]
+)
+quality_rejected_total = metrics_registry.counter(
+    "predict_quality_rejected_total", "품질 사전 검사에서 모델 실행 전에 거절된 이미지 수", ["check"]
+)
+
+# 2. 추론 백엔드 -------------------------------------------------
+router = APIRouter()
+
+# 추론 풀 모드에서는 torch 등 ML 패키지를 import하지 않고 풀 서버에 예측을 위임
+# (로그인/반려동물/병원 API만 처리하는 워커도 가볍게 시작)
+if INFERENCE_POOL_SOCKET:
+    engine = None
+    inference_pool = InferencePoolClient(
+        INFERENCE_POOL_SOCKET,
+        authkey=INFERENCE_POOL_AUTHKEY.encode() if INFERENCE_POOL_AUTHKEY else None
+    )
+    model_state = {
+        "status": "not_loaded", "error": None, "loaded_at": None,
+        "runtime": None, "precision": None, "version": None, "pool": None
+    }
+else:
+    from app.inference import engine
+    inference_pool = None
+    model_state = engine.model_state
+_pool_model_key = None
+_pool_lock = threading.Lock()
+
+def models_ready() -> bool:
+    return model_state["status"] == "ready"
+
+def _connect_pool():
+    """추론 풀 모드: 풀 상태를 확인해 준비 상태로 전환"""
+    global _pool_model_key
+    status = inference_pool.status()
+    _pool_model_key = status["model_key"]
+    model_state.update(
+        status="ready",
+        loaded_at=datetime.now().isoformat(),
+        runtime=status["models"].get("runtime"),
+        precision=status["models"].get("precision"),
+        version=status["models"].get("version"),
+        pool={"socket": INFERENCE_POOL_SOCKET, "worker": status["worker"], "cores": status["cores"]}
+    )
+
+def load_models():
+    """모델(또는 추론 풀 연결)을 준비 상태로 전환 (이미 준비되었으면 생략)"""
+    if engine is not None:
+        engine.load_models()
+        return
+    with _pool_lock:
+        if models_ready():
+            return
+        model_state.update(status="loading", error=None)
         try:
-            image = Image.open(image_file).convert("RGB")
-            roi_image = self.roi_extractor.extract(image)
-            
-            input_full = self.transform(image=np.array(image))['image'].unsqueeze(0).to(device)
-            input_roi = self.transform(image=np.array(roi_image))['image'].unsqueeze(0).to(device)
-            
-            with torch.no_grad():
-                outputs = self.model(input_full, input_roi)
-                probabilities = F.softmax(outputs, dim=1)
-                confidence, predicted = torch.max(probabilities, 1)
-            
-            return predicted.item(), confidence.item()
+            _connect_pool()
         except Exception as e:
-            raise RuntimeError(f"Prediction failed: {str(e)}")
+            model_state.update(status="failed", error=str(e))
+            raise RuntimeError(f"Model loading failed: {str(e)}")
 
-# 8. API 초기화 ---------------------------------------------------
-router = APIRouter()
+# 3. 계층적 예측 --------------------------------------------------
+def get_model_key():
+    """현재 서비스 중인 모델 버전 + 체크포인트 조합의 식별자 (예측 캐시 무효화 기준)"""
+    if engine is None:
+        return _pool_model_key
+    return engine.get_model_key()
 
-try:
-    binary_model = SkinModel(get_model_path("binary_best.pth"), num_classes=2)
-    disease_model = SkinModel(get_model_path("disease_best.pth"), num_classes=6)
-except Exception as e:
-    raise RuntimeError(f"Model loading failed: {str(e)}")
+def hierarchical_predict_batch(image_files, roi_boxes=None, progress=None):
+    """
+    여러 이미지를 배치로 계층 예측 (추론 풀 모드면 풀 서버에서, 아니면 이 프로세스에서 실행)
+    - 결과는 입력 순서대로 반환하며, 실패한 이미지는 해당 위치에 예외 객체를 담음
+    - progress(이미지별 진행 콜백)는 이 프로세스에서 예측할 때만 단계별로 호출됨
+    - 품질 사전 검사 거절은 여기서 집계 (캐시 / 유사 업로드로 재사용한 거절 결과는 다시 세지 않음)
+    """
+    load_models()
+    roi_boxes = roi_boxes or [None] * len(image_files)
+    if engine is None:
+        results = _predict_via_pool(image_files, roi_boxes)
+    else:
+        results = engine.hierarchical_predict_batch(image_files, roi_boxes, progress)
+    for result in results:
+        if isinstance(result, dict) and result.get("rejected"):
+            quality_rejected_total.inc(result["rejected"])
+    return results
 
-# 9. 계층적 예측 --------------------------------------------------
-def hierarchical_predict(image_file):
+def _predict_via_pool(image_files, roi_boxes):
+    """추론 풀 모드: 이미지 바이트를 풀로 보내고 결과를 받음 (연결 실패 시 준비 상태 해제)"""
+    global _pool_model_key
     try:
-        binary_pred, binary_conf = binary_model.predict(image_file)
-        if binary_pred == 0:
-            return {"label": binary_label_map[binary_pred], "probability": binary_conf}
-        else:
-            disease_pred, disease_conf = disease_model.predict(image_file)
-            return {"label": disease_label_map[disease_pred], "probability": disease_conf}
+        with stage_seconds.time("pool"):
+            results, _pool_model_key = inference_pool.predict_batch([f.read() for f in image_files], roi_boxes)
+        return results
+    except (OSError, EOFError) as e:
+        model_state.update(status="failed", error=f"추론 풀 연결 실패: {str(e)}")
+        return [RuntimeError(f"추론 풀 연결 실패: {str(e)}")] * len(image_files)
+
+def _predict_items(items):
+    """배치 큐 핸들러: (이미지 파일, ROI 박스, 진행 콜백) 리스트 → 결과 리스트"""
+    return hierarchical_predict_batch(
+        [f for f, _, _ in items], [box for _, box, _ in items], [progress for _, _, progress in items]
+    )
+
+# 4. 추론 실행기 / 배치 큐 -----------------------------------------
+inference_executor = InferenceExecutor(
+    max_workers=INFERENCE_WORKERS,
+    max_queue=INFERENCE_MAX_QUEUE
+)
+prediction_batcher = MicroBatcher(
+    _predict_items,
+    max_batch_size=PREDICT_MAX_BATCH_SIZE,
+    max_wait_ms=PREDICT_MAX_WAIT_MS,
+    max_queue_size=INFERENCE_MAX_QUEUE,
+    executor=inference_executor
+)
+
+prediction_jobs = PredictionJobStore(
+    max_in_flight=PREDICT_MAX_JOBS,
+    ttl_seconds=PREDICT_JOB_TTL_SECONDS
+)
+_job_tasks = set()  # 실행 중인 작업 태스크 (GC로 취소되지 않도록 참조 유지)
+
+prediction_cache = PredictionCache(
+    max_entries=PREDICT_CACHE_SIZE,
+    ttl_seconds=PREDICT_CACHE_TTL_SECONDS
+)
+
+# 예측 임베딩 (prediction_id → (모델 버전, float16 바이트)), 저장 시 진단 기록 ID로 임베딩 저장소에 추가
+# 모델이 바뀌어도 버전을 함께 보관하므로 캐시처럼 비우지 않음 (model_key는 항상 None)
+pending_embeddings = PredictionCache(
+    max_entries=PREDICT_PENDING_EMBEDDINGS,
+    ttl_seconds=PREDICT_CACHE_TTL_SECONDS
+)
+
+# 여러 워커가 같은 파일을 쓰면 마지막 저장이 남음 (워커별 인덱스는 메모리에서 따로 유지)
+phash_index = PerceptualHashIndex(
+    PREDICT_DEDUP_INDEX_PATH,
+    max_distance=PREDICT_DEDUP_MAX_DISTANCE,
+    window_seconds=PREDICT_DEDUP_WINDOW_SECONDS,
+    max_per_user=PREDICT_DEDUP_MAX_PER_USER
+) if PREDICT_DEDUP_ENABLED else None
+
+# 이미 집계 중인 실행기/배치 큐/캐시 통계는 스크랩 시점에 읽어서 노출
+metrics_registry.gauge_callback(
+    "predict_queue_depth", "추론 대기열 길이", lambda: {
+        ("batcher",): prediction_batcher.stats()["queue_depth"],
+        ("executor",): inference_executor.stats()["queue_depth"]
+    }, ["queue"]
+)
+metrics_registry.gauge_callback(
+    "predict_executor_running", "실행 중인 추론 작업 수", lambda: inference_executor.stats()["running"]
+)
+metrics_registry.counter_callback(
+    "predict_rejected_total", "대기열이 가득 차 거절된 추론 요청 수", lambda: inference_executor.stats()["rejected"]
+)
+metrics_registry.counter_callback(
+    "predict_batches_total", "마이크로 배치 실행 횟수", lambda: prediction_batcher.stats()["batches"]
+)
+metrics_registry.counter_callback(
+    "predict_cache_requests_total", "예측 캐시 조회 수", lambda: {
+        ("hit",): prediction_cache.stats()["hits"],
+        ("miss",): prediction_cache.stats()["misses"]
+    }, ["result"]
+)
+metrics_registry.gauge_callback(
+    "predict_cache_entries", "예측 캐시 항목 수", lambda: prediction_cache.stats()["entries"]
+)
+metrics_registry.counter_callback(
+    "predict_dedup_requests_total", "유사 업로드 인덱스 조회 수", lambda: {
+        ("hit",): phash_index.stats()["hits"],
+        ("miss",): phash_index.stats()["misses"]
+    } if phash_index is not None else {}, ["result"]
+)
+metrics_registry.gauge_callback(
+    "predict_jobs_in_flight", "진행 중인 비동기 진단 작업 수", lambda: prediction_jobs.stats()["in_flight"]
+)
+metrics_registry.counter_callback(
+    "predict_jobs_rejected_total", "진행 중 작업 수 제한으로 거절된 비동기 진단 작업 수",
+    lambda: prediction_jobs.stats()["rejected"]
+)
+metrics_registry.gauge_callback(
+    "predict_models_ready", "모델 준비 여부 (1: 준비됨)", lambda: int(models_ready())
+)
+metrics_registry.gauge_callback(
+    "predict_model_version_info", "서비스 중인 모델 버전 (값은 항상 1)",
+    lambda: {(model_state["version"],): 1} if model_state["version"] else {}, ["version"]
+)
+
+async def preload_models():
+    """lifespan에서 호출: 추론 스레드에서 모델 로드 + warm-up (실패해도 서버는 계속 동작)"""
+    if not PREDICT_PRELOAD_MODELS:
+        return
+    try:
+        await inference_executor.run(load_models)
     except Exception as e:
-        raise RuntimeError(f"Hierarchical prediction failed: {str(e)}")
+        print(f"모델 사전 로드 실패: {e}")
 
-# 10. API 엔드포인트 -----------------------------------------------
-@router.post("/predict", response_model=APIResponse)
-async def predict(file: UploadFile = File(...)):
+async def ensure_models_loaded():
+    """요청 처리 전 모델 준비 (아직 로드되지 않았다면 추론 스레드에서 로드)"""
+    if not models_ready():
+        await inference_executor.run(load_models)
+
+async def hot_reload(version=None):
+    """
+    모델 버전 교체 (추론 스레드가 아닌 별도 스레드에서 로드하므로 그동안 예측은 기존 모델로 계속 처리)
+    - 반환: 새 버전의 로드 정보 (previous: 교체 전 버전)
+    """
+    if engine is None:
+        raise RuntimeError("추론 풀 모드에서는 추론 서버를 재시작해 모델을 교체해야 합니다")
+    return await asyncio.get_running_loop().run_in_executor(None, engine.reload_models, version)
+
+async def watch_model_registry():
+    """lifespan에서 호출: 레지스트리의 활성 버전이 서비스 중인 버전과 다르면 백그라운드로 교체"""
+    if MODEL_REGISTRY_POLL_SECONDS <= 0 or engine is None:
+        return
+    last_mtime = model_registry.manifest_mtime()
+    while True:
+        await asyncio.sleep(MODEL_REGISTRY_POLL_SECONDS)
+        mtime = model_registry.manifest_mtime()
+        if mtime == last_mtime or not models_ready():
+            continue
+        try:
+            version = model_registry.active_version()
+            if version != engine.active_models.version:
+                print(f"모델 버전 변경 감지: {engine.active_models.version} → {version}")
+                await hot_reload(version)
+            last_mtime = mtime
+        except Exception as e:
+            print(f"모델 버전 교체 실패: {e}")
+            last_mtime = mtime  # 같은 매니페스트로 반복 시도하지 않음 (다음 변경 시 재시도)
+
+async def persist_phash_index():
+    """lifespan에서 호출: 유사 업로드 인덱스를 파일에서 복원하고 주기적으로 저장"""
+    if phash_index is None:
+        return
+    await asyncio.to_thread(phash_index.load)
+    while PREDICT_DEDUP_SAVE_SECONDS > 0:
+        await asyncio.sleep(PREDICT_DEDUP_SAVE_SECONDS)
+        try:
+            await asyncio.to_thread(phash_index.save)
+        except OSError as e:
+            print(f"유사 업로드 인덱스 저장 실패: {e}")
+
+async def shutdown_inference():
+    """대기 중인 예측 요청을 모두 처리한 뒤 추론 스레드 종료 (유사 업로드 인덱스도 저장)"""
+    await prediction_batcher.close()
+    await inference_executor.shutdown()
+    if phash_index is not None:
+        try:
+            await asyncio.to_thread(phash_index.save)
+        except OSError as e:
+            print(f"유사 업로드 인덱스 저장 실패: {e}")
+
+# 5. API 엔드포인트 ------------------------------------------------
+def _diagnosis_data(filename, result, reused=None):
+    """reused: 모델을 실행하지 않고 이전 결과를 돌려준 경우 {"reason": "exact" | "near_duplicate", ...}"""
+    model_version = result.get("model_version")
+    return {
+        "filename": filename,
+        "diagnosis": result["label"],
+        "confidence": round(result["probability"], 4),
+        "model_version": model_version,
+        "details": format_model_version(model_version),  # 저장 시 DiagnosisHistory.details로 전달됨
+        "prediction_id": result.get("prediction_id"),  # 저장 시 함께 보내면 유사 사례 검색용 임베딩이 연결됨
+        "reused": reused
+    }
+
+def _split_embedding(result):
+    """
+    모델 결과에서 임베딩을 떼어 pending_embeddings에 보관하고 prediction_id를 붙인 결과 반환
+    - 캐시 / 유사 업로드 인덱스에는 임베딩 없이 저장되며, 재사용된 결과는 원래 prediction_id를 그대로 가짐
+    """
+    if isinstance(result, Exception) or result.get("rejected"):
+        return result
+    embedding = result.get("embedding")
+    result = {key: value for key, value in result.items() if key != "embedding"}
+    result["prediction_id"] = uuid.uuid4().hex
+    if embedding is not None:
+        pending_embeddings.set(result["prediction_id"], None, (result.get("model_version"), embedding))
+    return result
+
+def get_pending_embedding(prediction_id):
+    """prediction_id의 (모델 버전, 임베딩 바이트), 만료되었거나 없으면 None"""
+    return pending_embeddings.get(prediction_id, None) if prediction_id else None
+
+def _rejection_data(filename, result):
+    """품질 사전 검사 거절 결과 → 응답 data"""
+    return {"filename": filename, "rejected": result["rejected"], "quality": result["quality"]}
+
+def _cache_key(digest: str, roi_box=None) -> str:
+    """예측 캐시 키 (업로드 수신 시 계산한 SHA-256, ROI 박스를 지정했으면 박스 좌표 포함)"""
+    key = digest
+    if roi_box is not None:
+        key = f"{key}:{','.join(f'{v:g}' for v in roi_box)}"
+    return key
+
+def _user_key(email):
+    """유사 업로드 인덱스의 사용자 키 (파일에 이메일이 남지 않도록 해시)"""
+    return content_hash(email.encode())[:32] if email else None
+
+def _perceptual_hash(content: bytes):
+    """dHash 계산 (디코딩할 수 없는 이미지는 None, 오류는 예측 단계에서 파일별로 처리)"""
     try:
-        # 이미지 유효성 검사
-        if not file.content_type.startswith('image/'):
+        with stage_seconds.time("phash"):
+            return dhash(content)
+    except Exception:
+        return None
+
+async def _find_near_duplicate(user_key, content, roi_box, model_key):
+    """
+    같은 사용자의 최근 업로드 중 지각 해시가 가까운 결과 조회
+    - 반환: (결과 또는 None, 해시 또는 None, 재사용 정보 또는 None), 해시는 예측 후 인덱스 등록에 사용
+    """
+    if phash_index is None or user_key is None:
+        return None, None, None
+    phash = await asyncio.to_thread(_perceptual_hash, content)
+    match = phash_index.find(user_key, phash, model_key, roi_box) if phash is not None else None
+    if match is None:
+        return None, phash, None
+    result, distance = match
+    return result, phash, {"reason": "near_duplicate", "distance": distance}
+
+def _remember_upload(user_key, phash, model_key, result, roi_box=None):
+    """예측에 성공한 업로드만 유사 업로드 인덱스에 등록 (품질 검사 거절 / 오류는 재사용하지 않음)"""
+    if phash is not None and not isinstance(result, Exception) and not result.get("rejected"):
+        phash_index.add(user_key, phash, model_key, result, roi_box)
+
+async def _predict_content(upload: IngestedUpload, roi_box=None, user_key=None, progress=None):
+    """
+    예측 캐시 → 유사 업로드 인덱스 → 마이크로 배치 예측 순으로 결과를 구함
+    - 반환: (결과, 재사용 정보) 모델을 실행했으면 재사용 정보는 None
+    """
+    await ensure_models_loaded()
+    key, model_key = _cache_key(upload.sha256, roi_box), get_model_key()
+    result = prediction_cache.get(key, model_key)
+    if result is not None:
+        return result, {"reason": "exact"}
+
+    result, phash, reused = await _find_near_duplicate(user_key, upload.content, roi_box, model_key)
+    if result is None:
+        result = _split_embedding(await prediction_batcher.submit((io.BytesIO(upload.content), roi_box, progress)))
+        _remember_upload(user_key, phash, model_key, result, roi_box)
+    prediction_cache.set(key, model_key, result)
+    return result, reused
+
+async def predict_upload(upload: IngestedUpload, roi_box=None, user_email=None):
+    """다른 라우터(예측 + 진단 기록 저장 등)용 단일 이미지 예측, 반환은 _predict_content와 같음"""
+    return await _predict_content(upload, roi_box, _user_key(user_email))
+
+async def ingest_upload(file: UploadFile) -> IngestedUpload:
+    """
+    진단 이미지 수신: 형식(매직 넘버) / 파일 크기를 청크 단위로 읽으며 확인한 뒤 헤더 기준 해상도 확인
+    - 위반 시 ValueError (UploadRejected 또는 ImageTooLarge), 디코딩 전에 거절됨
+    """
+    upload = await read_upload(file, PREDICT_MAX_UPLOAD_BYTES, PREDICT_IMAGE_TYPES)
+    _check_resolution(upload.content)
+    return upload
+
+def _check_resolution(content: bytes):
+    """헤더만 읽어 해상도 확인, 제한을 넘으면 ImageTooLarge"""
+    try:
+        image = Image.open(io.BytesIO(content))
+    except Exception:
+        return  # 디코딩 불가 이미지는 예측 단계에서 파일별 오류로 처리
+    check_image_size(image)
+
+def queue_full_response():
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content=APIResponse(
+            success=False,
+            message="진단 요청이 많아 잠시 후 다시 시도해주세요",
+            data=None
+        ).model_dump(),
+        headers={"Retry-After": str(PREDICT_RETRY_AFTER_SECONDS)}
+    )
+
+@router.post("/predict", response_model=APIResponse)
+async def predict(
+    file: UploadFile = File(...),
+    roi: Optional[str] = Form(None),
+    user_email: Optional[str] = Depends(get_optional_user_email)
+):
+    """
+    단일 이미지 진단 (roi: 이미 알고 있는 병변 영역 "x1,y1,x2,y2", 주면 ROI 자동 검출 생략)
+    - 로그인한 사용자가 최근 올린 사진과 거의 같은 사진이면 이전 결과를 재사용 (data.reused)
+    """
+    with request_seconds.time("predict"):
+        try:
+            # 이미지 형식 / 크기 / 해상도는 전체를 메모리에 올리거나 디코딩하기 전에 확인
+            try:
+                upload = await ingest_upload(file)
+                roi_box = parse_roi_box(roi) if roi else None
+            except ValueError as e:
+                return APIResponse(success=False, message=str(e), data=None)
+
+            # 같은 이미지(또는 거의 같은 사진)는 이전 결과 사용, 없으면 동시 요청과 함께 마이크로 배치로 예측
+            result, reused = await _predict_content(upload, roi_box, _user_key(user_email))
+
+            if result.get("rejected"):
+                return APIResponse(success=False, message=result["message"], data=_rejection_data(file.filename, result))
+        
+            return APIResponse(
+                success=True,
+                message="AI 진단이 완료되었습니다",
+                data=_diagnosis_data(file.filename, result, reused)
+            )
+        
+        except InferenceQueueFull:
+            return queue_full_response()
+        except Exception as e:
             return APIResponse(
                 success=False,
-                message="이미지 파일만 업로드 가능합니다",
+                message=f"진단 처리 중 오류 발생: {str(e)}",
                 data=None
             )
 
-        # 예측 로직 (가정)
-        result = hierarchical_predict(file.file)
-        
+@router.post("/predict/batch", response_model=APIResponse)
+async def predict_batch(
+    files: List[UploadFile] = File(...),
+    user_email: Optional[str] = Depends(get_optional_user_email)
+):
+    """여러 이미지를 한 번에 진단 (결과는 업로드 순서대로, 실패는 파일 단위로 반환)"""
+    with request_seconds.time("batch"):
+        if len(files) > PREDICT_MAX_FILES:
+            return APIResponse(
+                success=False,
+                message=f"한 번에 최대 {PREDICT_MAX_FILES}개의 이미지만 업로드 가능합니다",
+                data=None
+            )
+
+        try:
+            await ensure_models_loaded()
+        except InferenceQueueFull:
+            return queue_full_response()
+        except Exception as e:
+            return APIResponse(success=False, message=f"진단 처리 중 오류 발생: {str(e)}", data=None)
+
+        results = [None] * len(files)
+        reused = [None] * len(files)
+        phashes = {}
+        images = []
+        uploads = {}
+        model_key = get_model_key()
+        user_key = _user_key(user_email)
+        for i, f in enumerate(files):
+            try:
+                uploads[i] = await ingest_upload(f)
+            except ValueError as e:
+                results[i] = e
+                continue
+            cached = prediction_cache.get(_cache_key(uploads[i].sha256), model_key)
+            if cached is not None:
+                results[i], reused[i] = cached, {"reason": "exact"}
+                continue
+            cached, phashes[i], reused[i] = await _find_near_duplicate(user_key, uploads[i].content, None, model_key)
+            if cached is not None:
+                results[i] = cached
+            else:
+                images.append(i)
+
+        # 캐시에 없는 이미지만 배치 크기 단위로 나누어 추론 스레드에서 예측
+        try:
+            for start in range(0, len(images), PREDICT_MAX_BATCH_SIZE):
+                chunk = images[start:start + PREDICT_MAX_BATCH_SIZE]
+                outputs = await inference_executor.run(
+                    hierarchical_predict_batch, [io.BytesIO(uploads[i].content) for i in chunk]
+                )
+                for i, output in zip(chunk, outputs):
+                    results[i] = output = _split_embedding(output)
+                    if not isinstance(output, Exception):
+                        prediction_cache.set(_cache_key(uploads[i].sha256), model_key, output)
+                        _remember_upload(user_key, phashes[i], model_key, output)
+        except InferenceQueueFull:
+            return queue_full_response()
+
+        data = []
+        for f, result, reuse in zip(files, results, reused):
+            if isinstance(result, Exception):
+                data.append({"filename": f.filename, "success": False, "message": f"진단 처리 중 오류 발생: {str(result)}"})
+            elif result.get("rejected"):
+                data.append({"success": False, "message": result["message"], **_rejection_data(f.filename, result)})
+            else:
+                data.append({"success": True, **_diagnosis_data(f.filename, result, reuse)})
+
+        succeeded = sum(1 for item in data if item["success"])
         return APIResponse(
-            success=True,
-            message="AI 진단이 완료되었습니다",
-            data={
-                "filename": file.filename,
-                "diagnosis": result["label"],
-                "confidence": round(result["probability"], 4),
-                "details": "추가 설명 필드"  # 실제 구현시 상세 설명 추가
-            }
+            success=succeeded > 0,
+            message=f"{len(files)}개 중 {succeeded}개 이미지의 AI 진단이 완료되었습니다",
+            data=data
         )
-        
+
+
+async def _run_job(job, filename, upload, roi_box, user_key=None):
+    """비동기 진단 작업 실행 (단계별 진행 상황은 추론 스레드에서 job에 기록)"""
+    try:
+        result, reused = await _predict_content(upload, roi_box, user_key, job.add_stage)
+        if result.get("rejected"):
+            job.finish(result=_rejection_data(filename, result), error=result["message"])
+        else:
+            job.finish(result=_diagnosis_data(filename, result, reused))
+    except InferenceQueueFull:
+        job.finish(error="진단 요청이 많아 잠시 후 다시 시도해주세요")
     except Exception as e:
-        return APIResponse(
-            success=False,
-            message=f"진단 처리 중 오류 발생: {str(e)}",
-            data=None
-        )
\ No newline at end of file
+        job.finish(error=f"진단 처리 중 오류 발생: {str(e)}")
+
+def _job_not_found_response():
+    return JSONResponse(
+        status_code=status.HTTP_404_NOT_FOUND,
+        content=APIResponse(success=False, message="진단 작업을 찾을 수 없거나 만료되었습니다", data=None).model_dump()
+    )
+
+@router.post("/predict/jobs", response_model=APIResponse)
+async def create_prediction_job(
+    request: Request,
+    file: UploadFile = File(...),
+    roi: Optional[str] = Form(None),
+    user_email: Optional[str] = Depends(get_optional_user_email)
+):
+    """
+    진단 작업을 등록하고 바로 작업 ID 반환 (느린 네트워크에서 요청 재시도로 인한 중복 추론 방지)
+    - 결과는 GET /predict/jobs/{job_id} 폴링 또는 /predict/jobs/{job_id}/events (SSE)로 확인
+    """
+    try:
+        upload = await ingest_upload(file)
+        roi_box = parse_roi_box(roi) if roi else None
+        job = prediction_jobs.create()
+    except ValueError as e:
+        return APIResponse(success=False, message=str(e), data=None)
+    except InferenceQueueFull:
+        return queue_full_response()
+
+    task = asyncio.get_running_loop().create_task(_run_job(job, file.filename, upload, roi_box, _user_key(user_email)))
+    _job_tasks.add(task)
+    task.add_done_callback(_job_tasks.discard)
+
+    return APIResponse(
+        success=True,
+        message="진단 작업이 등록되었습니다",
+        data={
+            **job.to_dict(),
+            "status_url": str(request.url_for("get_prediction_job", job_id=job.id)),
+            "events_url": str(request.url_for("prediction_job_events", job_id=job.id))
+        }
+    )
+
+@router.get("/predict/jobs/{job_id}", response_model=APIResponse)
+async def get_prediction_job(job_id: str):
+    """진단 작업 상태 조회 (queued → running → done | failed, 완료 시 result에 진단 결과)"""
+    job = prediction_jobs.get(job_id)
+    if job is None:
+        return _job_not_found_response()
+    return APIResponse(success=True, message="진단 작업 조회 성공", data=job.to_dict())
+
+@router.get("/predict/jobs/{job_id}/events")
+async def prediction_job_events(job_id: str):
+    """
+    진단 작업 진행 상황 스트림 (Server-Sent Events)
+    - event: queued / decoded / binary_done / disease_done / done / failed, data: 작업 상태 JSON
+    - 연결 즉시 현재 상태를 보내므로 재연결해도 놓치는 결과가 없음, 작업이 끝나면 스트림 종료
+    """
+    job = prediction_jobs.get(job_id)
+    if job is None:
+        return _job_not_found_response()
+
+    async def stream():
+        version = None
+        while True:
+            if job.version != version:
+                version = job.version
+                event = job.stages[-1]["stage"] if job.status == "running" else job.status
+                data = json.dumps(job.to_dict(), ensure_ascii=False)
+                yield f"id: {version}\nevent: {event}\ndata: {data}\n\n"
+                if job.finished:
+                    return
+            elif not await job.wait_changed(version, SSE_HEARTBEAT_SECONDS):
+                yield ": keep-alive\n\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/predict/stats", response_model=APIResponse)
+async def predict_stats():
+    """추론 대기열 길이와 대기 시간 (워커 수 산정용)"""
+    return APIResponse(
+        success=True,
+        message="추론 대기열 상태 조회 성공",
+        data={
+            "executor": inference_executor.stats(),
+            "batcher": prediction_batcher.stats(),
+            "cache": prediction_cache.stats(),
+            "pending_embeddings": pending_embeddings.stats(),
+            "jobs": prediction_jobs.stats(),
+            "dedup": phash_index.stats() if phash_index is not None else None
+        }
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Float, Enum, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Float, Enum, Text, UniqueConstraint
 from sqlalchemy.orm import relationship
 from app.database import Base
 from datetime import datetime, timezone
@@ -54,9 +54,24 @@ class DiagnosisHistory(Base):
     diagnosis = Column(String(100), nullable=False)
     confidence = Column(Float)
     details = Column(Text)
+    image_path = Column(String(255), nullable=True)  # 진단에 사용한 업로드 이미지 (재채점 시 결과를 연결)
     created_at = Column(DateTime, default=utcnow)
     pet = relationship("Pet", back_populates="diagnoses")
 
+class DiagnosisRescore(Base):
+    """모델 버전별 업로드 이미지 재채점 결과 (이미지 + 버전당 한 행, 재실행하면 없는 이미지만 이어서 처리)"""
+    __tablename__ = "diagnosis_rescores"
+    __table_args__ = (UniqueConstraint("image_path", "model_version", name="uq_rescore_image_version"),)
+    id = Column(Integer, primary_key=True, index=True)
+    diagnosis_id = Column(Integer, ForeignKey("diagnosis_history.id", ondelete="SET NULL"), nullable=True, index=True)
+    image_path = Column(String(255), nullable=False)
+    model_version = Column(String(64), nullable=False, index=True)
+    diagnosis = Column(String(100), nullable=False)
+    confidence = Column(Float)
+    previous_diagnosis = Column(String(100))  # 연결된 진단 기록의 재채점 전 결과
+    previous_confidence = Column(Float)
+    created_at = Column(DateTime, default=utcnow)
+
 class UserAlert(Base):
     __tablename__ = "user_alerts"
     id = Column(Integer, primary_key=True, index=True)
@@ -0,0 +1,124 @@
+# app/inference/common.py
+"""
+API 프로세스와 추론 엔진(app.inference.engine)이 함께 쓰는 설정 / 입력 검증 / 지표
+- torch, timm, cv2 등 ML 패키지를 import하지 않으므로 추론 풀 모드의 API 프로세스에서도 가볍게 로드됨
+"""
+import os
+from pathlib import Path
+
+from PIL import Image
+
+from app.utils.metrics import registry as metrics_registry
+from app.utils.model_registry import ModelRegistry
+
+# 1. 환경 설정 ----------------------------------------------------
+INPUT_SIZE = 320  # 모델 입력 해상도
+
+# 추론 정밀도 (fp32 | int8 | bf16), fp32가 아니면 평가 이미지로 fp32 대비 일치율을 검증
+PREDICT_PRECISION = os.getenv("PREDICT_PRECISION", "fp32")
+PRECISION_EVAL_DIR = os.getenv("PRECISION_EVAL_DIR")  # 라벨별 하위 폴더 구조의 평가 이미지
+PRECISION_MIN_AGREEMENT = float(os.getenv("PRECISION_MIN_AGREEMENT", 0.98))
+# true면 PRECISION_EVAL_DIR 없이도 fp32가 아닌 정밀도를 검증 없이 사용 (기본: 모델 로드 실패)
+PRECISION_ALLOW_UNVERIFIED = os.getenv("PRECISION_ALLOW_UNVERIFIED", "false").lower() == "true"
+
+# 추론 런타임 (eager | torchscript | onnx), eager 외에는 export_models 스크립트로 만든 아티팩트 사용
+PREDICT_RUNTIME = os.getenv("PREDICT_RUNTIME", "eager")
+
+# 다중 프로세스 추론 풀 (app.scripts.inference_server) 주소: Unix 소켓 경로 또는 tcp://127.0.0.1:8600
+# 설정하면 API 프로세스는 ML 패키지를 import하지 않고 풀에 예측을 위임
+INFERENCE_POOL_SOCKET = os.getenv("INFERENCE_POOL_SOCKET")
+INFERENCE_POOL_AUTHKEY = os.getenv("INFERENCE_POOL_AUTHKEY")
+
+# 마이크로 배치 최대 크기 (동시 요청을 모아 한 번의 forward로 처리, 입력 버퍼 크기도 이 값에 맞춤)
+PREDICT_MAX_BATCH_SIZE = int(os.getenv("PREDICT_MAX_BATCH_SIZE", 8))
+
+# 업로드 이미지 해상도 제한 (초과 시 디코딩 전에 거절)
+PREDICT_MAX_PIXELS = int(os.getenv("PREDICT_MAX_PIXELS", 50_000_000))
+# JPEG는 디코더 축소 모드(1/2, 1/4, 1/8)로 짧은 변이 이 크기 이상인 가장 작은 해상도까지만 디코딩
+# (ROI가 이미지 일부만 잘라내므로 모델 입력 크기보다 여유 있게 설정, 0이면 원본 해상도)
+PREDICT_DECODE_SIZE = int(os.getenv("PREDICT_DECODE_SIZE", INPUT_SIZE * 2))
+
+# 이미지 품질 사전 검사 (모델 실행 전 해상도/노출/흐림/피부·털 비율 확인, false면 생략)
+# 기준은 ROI 검출용 썸네일(긴 변 약 256px)에서 측정한 값
+PREDICT_QUALITY_GATE = os.getenv("PREDICT_QUALITY_GATE", "true").lower() == "true"
+PREDICT_QUALITY_MIN_SIDE = int(os.getenv("PREDICT_QUALITY_MIN_SIDE", 224))  # 원본 짧은 변 (px)
+PREDICT_QUALITY_MIN_SHARPNESS = float(os.getenv("PREDICT_QUALITY_MIN_SHARPNESS", 20))  # Laplacian 분산
+PREDICT_QUALITY_MIN_BRIGHTNESS = float(os.getenv("PREDICT_QUALITY_MIN_BRIGHTNESS", 40))  # 평균 밝기 (0~255)
+PREDICT_QUALITY_MAX_BRIGHTNESS = float(os.getenv("PREDICT_QUALITY_MAX_BRIGHTNESS", 240))
+PREDICT_QUALITY_MAX_CLIPPED_RATIO = float(os.getenv("PREDICT_QUALITY_MAX_CLIPPED_RATIO", 0.5))  # 검게/하얗게 뭉개진 픽셀 비율
+PREDICT_QUALITY_MIN_SKIN_RATIO = float(os.getenv("PREDICT_QUALITY_MIN_SKIN_RATIO", 0.25))  # 피부/털 색 픽셀 비율
+
+# 유사 사례 검색용 임베딩 (이진 모델의 풀링 특징을 이 차원으로 무작위 투영한 float16, 0이면 투영 없이 전체 차원)
+PREDICT_EMBEDDINGS = os.getenv("PREDICT_EMBEDDINGS", "true").lower() == "true"
+PREDICT_EMBEDDING_DIM = int(os.getenv("PREDICT_EMBEDDING_DIM", 256))
+EMBEDDING_IVF_NPROBE = int(os.getenv("EMBEDDING_IVF_NPROBE", 16))  # IVF 검색 시 살펴볼 목록 수 (클수록 정확, 느림)
+# 행 수가 이 값에 이르면 임베딩 추가 시 IVF 자동 학습 (0이면 build_similarity_index로만 학습)
+EMBEDDING_IVF_MIN_ROWS = int(os.getenv("EMBEDDING_IVF_MIN_ROWS", 20000))
+# 학습 시점 행 수의 이 배수로 늘면 추가 시 IVF 다시 학습
+EMBEDDING_IVF_RETRAIN_FACTOR = float(os.getenv("EMBEDDING_IVF_RETRAIN_FACTOR", 2.0))
+
+stage_seconds = metrics_registry.histogram(
+    "predict_stage_seconds", "예측 단계별 처리 시간 (decode/quality/roi/transform은 이미지당, forward는 배치당)", ["stage"]
+)
+routing_total = metrics_registry.counter(
+    "predict_routing_total", "이진 분류 결과에 따른 라우팅 (asymptomatic: 1단계 종료, symptomatic: 질환 모델로 전달)", ["route"]
+)
+
+# 2. 경로 관리 함수 -----------------------------------------------
+def get_project_root() -> Path:
+    """프로젝트 루트 경로 계산"""
+    current_file = Path(__file__).resolve()
+    return current_file.parent.parent.parent  # src/app/inference/common.py → 프로젝트 루트
+
+def get_model_path(model_name: str) -> str:
+    """모델 파일 절대 경로 생성"""
+    model_dir = get_project_root() / "app" / "models"
+    model_path = model_dir / model_name
+
+    if not model_path.exists():
+        raise FileNotFoundError(f"Model file not found: {model_path}")
+    return str(model_path)
+
+model_registry = ModelRegistry(get_project_root() / "app" / "models")
+
+def get_data_dir() -> Path:
+    """런타임 데이터(유사 업로드 인덱스, 임베딩 저장소) 폴더 (DATA_DIR, 기본 backend/data)"""
+    return Path(os.getenv("DATA_DIR", get_project_root() / "data"))
+
+_embedding_stores = None
+
+def get_embedding_stores():
+    """
+    모델 버전별 진단 기록 임베딩 저장소 (DATA_DIR/embeddings/<버전>)
+    - numpy를 쓰므로 처음 사용할 때 import (추론 풀 모드 API 워커의 시작 시간에 포함되지 않도록)
+    """
+    global _embedding_stores
+    if _embedding_stores is None:
+        from app.utils.embedding_store import EmbeddingStores
+        _embedding_stores = EmbeddingStores(
+            get_data_dir() / "embeddings", nprobe=EMBEDDING_IVF_NPROBE,
+            ivf_min_rows=EMBEDDING_IVF_MIN_ROWS, ivf_retrain_factor=EMBEDDING_IVF_RETRAIN_FACTOR
+        )
+    return _embedding_stores
+
+# 3. 입력 검증 ----------------------------------------------------
+class ImageTooLarge(ValueError):
+    pass
+
+def check_image_size(image: Image.Image):
+    """헤더만 읽은 이미지의 픽셀 수가 제한을 넘으면 ImageTooLarge"""
+    width, height = image.size
+    if width * height > PREDICT_MAX_PIXELS:
+        raise ImageTooLarge(
+            f"이미지 해상도가 너무 큽니다 ({width}x{height}, 최대 {PREDICT_MAX_PIXELS // 1_000_000}MP)"
+        )
+
+def parse_roi_box(value: str) -> tuple:
+    """"x1,y1,x2,y2" (원본 이미지 픽셀 좌표) → 튜플, 형식이 잘못되면 ValueError"""
+    try:
+        box = tuple(float(v) for v in value.split(","))
+    except ValueError:
+        box = ()
+    if len(box) != 4 or box[2] <= box[0] or box[3] <= box[1]:
+        raise ValueError("roi는 x1,y1,x2,y2 형식이어야 합니다 (x2 > x1, y2 > y1)")
+    return box
@@ -0,0 +1,576 @@
+# app/inference/engine.py
+"""
+추론 엔진: 모델 로드 / 버전 교체, 전처리, 계층 예측 (torch, timm, cv2 사용)
+- API 서버가 직접 추론하는 모드와 추론 풀 서버(app.scripts.inference_server)에서만 import
+- 추론 풀 모드의 API 프로세스는 app.inference.common만 사용하므로 이 모듈을 로드하지 않음
+"""
+import os
+import copy
+import time
+import threading
+import cv2
+import numpy as np
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+import timm
+from pathlib import Path
+from datetime import datetime
+from PIL import Image
+from app.inference.common import (
+    INPUT_SIZE, PREDICT_PRECISION, PRECISION_EVAL_DIR, PRECISION_MIN_AGREEMENT, PRECISION_ALLOW_UNVERIFIED, PREDICT_RUNTIME,
+    PREDICT_MAX_BATCH_SIZE, PREDICT_DECODE_SIZE, PREDICT_QUALITY_GATE, PREDICT_QUALITY_MIN_SIDE,
+    PREDICT_QUALITY_MIN_SHARPNESS, PREDICT_QUALITY_MIN_BRIGHTNESS, PREDICT_QUALITY_MAX_BRIGHTNESS,
+    PREDICT_QUALITY_MAX_CLIPPED_RATIO, PREDICT_QUALITY_MIN_SKIN_RATIO, PREDICT_EMBEDDINGS, PREDICT_EMBEDDING_DIM,
+    stage_seconds, routing_total,
+    get_model_path, model_registry, check_image_size
+)
+from app.utils.precision import validate_precision, convert_model, autocast_context, load_labelled_images
+from app.utils.runtimes import validate_runtime, get_artifact_path, load_artifact
+from app.utils.fast_transform import FusedTransform, InputBufferPool, compact_rows
+from app.utils.image_quality import ImageQualityError, QualityGate
+
+# 1. 환경 설정 ----------------------------------------------------
+device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+print(f"Using device: {device}")
+
+# 2. 경로 관리 함수 -----------------------------------------------
+def get_checkpoint_id(model_path: str) -> str:
+    """체크포인트 식별자 (파일명 + 크기 + 수정 시각)"""
+    stat = os.stat(model_path)
+    return f"{Path(model_path).name}:{stat.st_size}:{stat.st_mtime_ns}"
+
+# 3. 라벨 매핑 ----------------------------------------------------
+binary_label_map = {0: "무증상", 1: "유증상"}
+disease_label_map = {
+    0: "구진_플라크",
+    1: "비듬_각질_상피성잔고리",
+    2: "태선화_과다색소침착",
+    3: "농포_여드름",
+    4: "미란_궤양",
+    5: "결절_종괴"
+}
+
+# 4. 모델 아키텍처 ------------------------------------------------
+class DualInputConvNeXt(nn.Module):
+    def __init__(self, model_name='convnext_base', num_classes=6):
+        super().__init__()
+        self.backbone = timm.create_model(model_name, pretrained=False, num_classes=0)
+        features = self.backbone.num_features
+        
+        self.classifier = nn.Sequential(
+            nn.AdaptiveAvgPool2d(1),
+            nn.Flatten(),
+            nn.Dropout(0.4),
+            nn.Linear(features*2, features),
+            nn.GELU(),
+            nn.BatchNorm1d(features),
+            nn.Dropout(0.3),
+            nn.Linear(features, features//2),
+            nn.GELU(),
+            nn.Dropout(0.2),
+            nn.Linear(features//2, num_classes)
+        )
+
+    def forward(self, x_full, x_roi):
+        return self.forward_with_features(x_full, x_roi)[0]
+
+    def forward_with_features(self, x_full, x_roi):
+        """(logits, 풀링된 전체 이미지 + ROI 특징 (N, features*2)) - 특징은 유사 사례 검색 임베딩으로 사용"""
+        # 전체 이미지와 ROI를 하나의 배치로 묶어 backbone을 한 번만 통과
+        # (ConvNeXt는 LayerNorm만 사용하므로 샘플 간 간섭 없이 결과가 동일)
+        features = self.backbone.forward_features(torch.cat([x_full, x_roi], dim=0))
+        
+        if features.dim() == 4:
+            features = F.adaptive_avg_pool2d(features, 1)
+        # chunk(2)는 배치 크기를 상수로 고정하지 않아 TorchScript/ONNX에서도 동적 배치 유지
+        f_full, f_roi = features.chunk(2, dim=0)
+            
+        combined = torch.cat([f_full, f_roi], dim=1)
+        return self.classifier(combined), combined.flatten(1)
+
+# 5. ROI 추출기 ---------------------------------------------------
+class ROIExtractor:
+    def __init__(self, min_roi_size=64, detect_size=256):
+        self.min_roi_size = min_roi_size
+        self.detect_size = detect_size  # 검출용 축소 이미지의 대략적인 긴 변 (0이면 원본 해상도에서 검출)
+
+    def thumbnail(self, image: np.ndarray) -> tuple:
+        """
+        긴 변이 약 detect_size가 되도록 정수 배율로 축소한 (이미지, 배율) - ROI 검출과 품질 검사가 함께 사용
+        - step 간격 샘플링(INTER_NEAREST) 후 2x2 평균(INTER_AREA 2배 고속 경로)으로 축소
+        """
+        height, width = image.shape[:2]
+        factor = max(height, width) // self.detect_size if self.detect_size else 1
+        if factor < 2:
+            return image, 1
+        step = (factor + 1) // 2
+        size = (width // (step * 2), height // (step * 2))
+        sampled = cv2.resize(image, (size[0] * 2, size[1] * 2), interpolation=cv2.INTER_NEAREST)
+        return cv2.resize(sampled, size, interpolation=cv2.INTER_AREA), step * 2
+
+    def _auto_detect(self, image: np.ndarray, thumbnail: tuple = None) -> tuple:
+        """
+        병변 후보 영역 (x1, y1, x2, y2) 검출
+        - 축소 이미지(thumbnail, 없으면 새로 생성)에서 Otsu 이진화 후 원본 좌표로 변환
+        - 외곽선 루프 대신 연결 요소 통계로 가장 큰 박스를 한 번에 선택
+        """
+        height, width = image.shape[:2]
+        small, scale = thumbnail or self.thumbnail(image)
+
+        gray = cv2.cvtColor(small, cv2.COLOR_RGB2GRAY)
+        blurred = cv2.GaussianBlur(gray, (5,5), 0)
+        _, thresh = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+
+        # stats: 라벨별 (x, y, w, h, 면적), 0번 라벨은 배경
+        _, _, stats, _ = cv2.connectedComponentsWithStats(thresh, connectivity=8)
+        x, y = stats[1:, cv2.CC_STAT_LEFT] * scale, stats[1:, cv2.CC_STAT_TOP] * scale
+        w, h = stats[1:, cv2.CC_STAT_WIDTH] * scale, stats[1:, cv2.CC_STAT_HEIGHT] * scale
+        areas = np.where((w > self.min_roi_size) & (h > self.min_roi_size), w * h, 0)
+        if not areas.size or areas.max() <= 0:
+            return (0,0,width,height)
+
+        best = int(np.argmax(areas))
+        return (
+            int(x[best]), int(y[best]),
+            min(width, int(np.ceil(x[best] + w[best]))), min(height, int(np.ceil(y[best] + h[best])))
+        )
+
+    @staticmethod
+    def clip_box(box, width: int, height: int) -> tuple:
+        """클라이언트가 지정한 박스를 이미지 범위로 자르고, 비어 있으면 ValueError"""
+        x1, y1, x2, y2 = (int(round(v)) for v in box)
+        x1, x2 = max(0, x1), min(width, x2)
+        y1, y2 = max(0, y1), min(height, y2)
+        if x2 <= x1 or y2 <= y1:
+            raise ValueError("ROI 박스가 이미지 범위를 벗어났습니다")
+        return (x1, y1, x2, y2)
+
+    def extract(self, image: Image.Image) -> Image.Image:
+        np_image = np.array(image)
+        x1,y1,x2,y2 = self._auto_detect(np_image)
+        return image.crop((x1,y1,x2,y2))
+
+    def extract_array(self, np_image: np.ndarray, box=None, thumbnail: tuple = None) -> np.ndarray:
+        """
+        이미 배열로 변환된 이미지에서 ROI 영역을 복사 없이 잘라냄
+        - box (x1, y1, x2, y2)를 주면 검출을 생략하고 그 영역을 사용
+        - thumbnail: 이미 만든 self.thumbnail(np_image) 결과 (있으면 재사용)
+        """
+        if box is None:
+            x1,y1,x2,y2 = self._auto_detect(np_image, thumbnail)
+        else:
+            x1,y1,x2,y2 = self.clip_box(box, np_image.shape[1], np_image.shape[0])
+        return np_image[y1:y2, x1:x2]
+
+# 6. 전처리 파이프라인 --------------------------------------------
+# Resize → Normalize → CHW 변환을 한 번에 수행해 미리 할당된 입력 버퍼에 직접 기록
+# 두 단계 모델이 같은 전처리를 사용하므로 디코딩/ROI 추출/변환은 한 번만 수행
+roi_extractor = ROIExtractor()
+transform = FusedTransform(INPUT_SIZE)
+input_buffers = InputBufferPool(capacity=PREDICT_MAX_BATCH_SIZE, size=INPUT_SIZE)
+quality_gate = QualityGate(
+    min_side=PREDICT_QUALITY_MIN_SIDE,
+    min_sharpness=PREDICT_QUALITY_MIN_SHARPNESS,
+    min_brightness=PREDICT_QUALITY_MIN_BRIGHTNESS,
+    max_brightness=PREDICT_QUALITY_MAX_BRIGHTNESS,
+    max_clipped_ratio=PREDICT_QUALITY_MAX_CLIPPED_RATIO,
+    min_skin_ratio=PREDICT_QUALITY_MIN_SKIN_RATIO
+) if PREDICT_QUALITY_GATE else None
+
+def decode_image(image_file):
+    """
+    이미지 파일 → (RGB 배열, 원본 대비 배율)
+    - 픽셀 수 제한 확인 후, JPEG는 축소 모드로 디코딩 (배율 1/2, 1/4, 1/8)
+    """
+    image = Image.open(image_file)
+    check_image_size(image)
+    original_width = image.size[0]
+    if PREDICT_DECODE_SIZE:
+        image.draft("RGB", (PREDICT_DECODE_SIZE, PREDICT_DECODE_SIZE))
+    np_image = np.asarray(image.convert("RGB"))
+    return np_image, np_image.shape[1] / original_width
+
+def preprocess_into(image_file, out_full, out_roi, roi_box=None, gate=None):
+    """
+    이미지 파일 → 주어진 (3, H, W) 텐서에 전체 이미지 / ROI 입력을 기록
+    - roi_box(원본 좌표)를 주면 ROI 검출을 생략
+    - gate(QualityGate)를 주면 ROI 검출용 썸네일로 품질을 먼저 확인하고, 기준 미달이면 ImageQualityError
+    """
+    with stage_seconds.time("decode"):
+        np_image, scale = decode_image(image_file)
+    thumbnail = None
+    if gate is not None:
+        with stage_seconds.time("quality"):
+            thumbnail = roi_extractor.thumbnail(np_image)
+            original_size = (round(np_image.shape[1] / scale), round(np_image.shape[0] / scale))
+            gate.check(thumbnail[0], original_size)
+    with stage_seconds.time("roi"):
+        if roi_box is not None:
+            roi_box = [v * scale for v in roi_box]
+        roi_image = roi_extractor.extract_array(np_image, roi_box, thumbnail)
+    with stage_seconds.time("transform"):
+        transform(np_image, out_full)
+        transform(roi_image, out_roi)
+
+def preprocess_image(image_file, roi_box=None):
+    """이미지 파일 → (전체 이미지, ROI) 입력 텐서 (새 텐서를 할당, 평가 스크립트용)"""
+    input_full = torch.empty(3, INPUT_SIZE, INPUT_SIZE)
+    input_roi = torch.empty(3, INPUT_SIZE, INPUT_SIZE)
+    preprocess_into(image_file, input_full, input_roi, roi_box)
+    return input_full, input_roi
+
+# 7. 모델 로더 ----------------------------------------------------
+_projections = {}
+
+def project_embeddings(features: torch.Tensor) -> np.ndarray:
+    """
+    (N, 특징 차원) 풀링 특징 → L2 정규화한 (N, PREDICT_EMBEDDING_DIM) float16 임베딩
+    - 고정 시드 가우시안 무작위 투영으로 차원을 줄여도 코사인 유사도는 근사적으로 보존됨
+      (모든 프로세스 / 재시작에서 같은 행렬이 만들어지므로 저장된 임베딩과 계속 비교 가능)
+    - PREDICT_EMBEDDING_DIM이 0이거나 특징 차원 이상이면 투영하지 않음
+    """
+    features = features.float().cpu().numpy()
+    in_dim = features.shape[1]
+    if 0 < PREDICT_EMBEDDING_DIM < in_dim:
+        matrix = _projections.get(in_dim)
+        if matrix is None:
+            rng = np.random.default_rng(0)
+            matrix = _projections[in_dim] = rng.standard_normal((in_dim, PREDICT_EMBEDDING_DIM), dtype=np.float32)
+        features = features @ matrix
+    norms = np.linalg.norm(features, axis=1, keepdims=True)
+    return (features / np.maximum(norms, 1e-12)).astype(np.float16)
+
+class SkinModel:
+    def __init__(self, model_path, num_classes, runtime="eager"):
+        self.runtime = validate_runtime(runtime)
+        self.precision = "fp32"
+        if self.runtime != "eager":
+            # torchscript / onnx: 같은 폴더의 export 아티팩트를 로드 (binary_best.pth → binary_best.onnx)
+            artifact_path = get_artifact_path(model_path, self.runtime)
+            self.model = load_artifact(artifact_path, self.runtime, device)
+            self.checkpoint_id = get_checkpoint_id(str(artifact_path))
+            return
+
+        self.model = DualInputConvNeXt(num_classes=num_classes).to(device)
+        self.checkpoint_id = get_checkpoint_id(model_path)
+        
+        # mmap + assign: 가중치를 복사하지 않고 파일 매핑 그대로 사용 (여러 프로세스가 페이지 캐시를 공유)
+        state = torch.load(model_path, map_location=device, mmap=True)
+        state_dict = state.get("model_state_dict", state)
+        state_dict = {k.replace("module.", ""): v for k, v in state_dict.items()}
+        self.model.load_state_dict(state_dict, strict=False, assign=True)
+        self.model.eval()
+
+    @classmethod
+    def with_random_weights(cls, num_classes, seed=0):
+        """체크포인트 없이 무작위 가중치로 만든 eager 모델 (벤치마크 / 하드웨어 산정용)"""
+        torch.manual_seed(seed)
+        skin_model = cls.__new__(cls)
+        skin_model.runtime = "eager"
+        skin_model.precision = "fp32"
+        skin_model.model = DualInputConvNeXt(num_classes=num_classes).to(device)
+        skin_model.model.eval()
+        skin_model.checkpoint_id = f"random:{num_classes}:{seed}"
+        return skin_model
+
+    def with_precision(self, mode):
+        """같은 가중치를 다른 정밀도로 실행하는 SkinModel (int8은 양자화된 복사본, 원본 유지)"""
+        if mode != "fp32" and self.runtime != "eager":
+            raise ValueError(f"{mode} 정밀도는 eager 런타임에서만 사용할 수 있습니다")
+        converted = copy.copy(self)
+        converted.model = convert_model(self.model, mode)
+        converted.precision = mode
+        return converted
+
+    def logits(self, input_full, input_roi):
+        """배치 입력 텐서 → 클래스별 logits (런타임/정밀도와 무관하게 fp32 텐서)"""
+        with torch.no_grad(), autocast_context(self.precision, device):
+            outputs = self.model(input_full.to(device), input_roi.to(device))
+        return outputs.float()
+
+    @property
+    def supports_embeddings(self) -> bool:
+        """풀링 특징을 꺼낼 수 있는지 (TorchScript / ONNX 아티팩트는 logits만 출력)"""
+        return self.runtime == "eager"
+
+    def predict_batch(self, input_full, input_roi):
+        """(N, 3, H, W) 전체 이미지 / ROI 배치를 한 번의 forward로 예측"""
+        return self._top1(self.logits(input_full, input_roi))
+
+    def predict_batch_with_embeddings(self, input_full, input_roi):
+        """
+        predict_batch와 같은 forward 한 번으로 (예측 리스트, 임베딩 (N, D) float16) 반환
+        - 임베딩을 꺼낼 수 없는 런타임이면 임베딩은 None
+        """
+        if not self.supports_embeddings:
+            return self.predict_batch(input_full, input_roi), None
+        with torch.no_grad(), autocast_context(self.precision, device):
+            outputs, features = self.model.forward_with_features(input_full.to(device), input_roi.to(device))
+        return self._top1(outputs.float()), project_embeddings(features)
+
+    @staticmethod
+    def _top1(outputs):
+        with torch.no_grad():
+            probabilities = F.softmax(outputs, dim=1)
+            confidence, predicted = torch.max(probabilities, 1)
+        
+        return list(zip(predicted.tolist(), confidence.tolist()))
+
+    def warm_up(self):
+        """더미 입력으로 forward를 한 번 실행 (첫 요청의 지연 제거)"""
+        dummy = torch.zeros(1, 3, INPUT_SIZE, INPUT_SIZE)
+        self.predict_batch(dummy, dummy)
+
+    def predict(self, inputs):
+        """preprocess_image()로 만든 입력 하나를 예측"""
+        try:
+            input_full, input_roi = inputs
+            return self.predict_batch(input_full.unsqueeze(0), input_roi.unsqueeze(0))[0]
+        except Exception as e:
+            raise RuntimeError(f"Prediction failed: {str(e)}")
+
+# 8. 모델 상태 ----------------------------------------------------
+class ActiveModels:
+    """
+    함께 서비스되는 이진/질환 모델 묶음 (버전 교체는 이 객체 하나를 바꿔 끼우는 것으로 원자적)
+    - 배치는 시작할 때 읽은 묶음으로 끝까지 처리하므로 교체 중에도 진행 중인 요청은 이전 모델로 완료
+    """
+
+    def __init__(self, binary, disease, version):
+        self.binary = binary
+        self.disease = disease
+        self.version = version
+        self.key = f"{version}|{binary.checkpoint_id}|{disease.checkpoint_id}"
+
+# 모델은 import 시점이 아니라 서버 시작 후(백그라운드) 또는 첫 사용 시점에 로드
+active_models = None
+model_state = {
+    "status": "not_loaded", "error": None, "loaded_at": None, "load_ms": None, "warmup_ms": None,
+    "runtime": None, "precision": None, "precision_report": None, "version": None, "reload": None
+}
+_model_lock = threading.Lock()
+_reload_lock = threading.Lock()
+
+def models_ready() -> bool:
+    return model_state["status"] == "ready"
+
+def evaluate_models(binary, disease, inputs, labels, reference=None):
+    """
+    평가 이미지에 대한 계층 예측 성능
+    - accuracy: 정답 라벨 대비 정확도, agreement: reference(fp32 예측 라벨) 대비 top-1 일치율
+    - 지연 시간은 이미지 1장 단위 계층 예측 기준
+    """
+    predicted, latencies = [], []
+    for input_full, input_roi in inputs:
+        started = time.perf_counter()
+        predicted.append(run_cascade(binary, disease, input_full.unsqueeze(0), input_roi.unsqueeze(0))[0]["label"])
+        latencies.append((time.perf_counter() - started) * 1000)
+    total = max(len(inputs), 1)
+    report = {
+        "precision": binary.precision,
+        "images": len(inputs),
+        "accuracy": round(sum(p == t for p, t in zip(predicted, labels)) / total, 4),
+        "mean_latency_ms": round(float(np.mean(latencies)), 2) if latencies else None,
+        "p50_latency_ms": round(float(np.percentile(latencies, 50)), 2) if latencies else None
+    }
+    if reference is not None:
+        report["agreement"] = round(sum(p == r for p, r in zip(predicted, reference)) / total, 4)
+    return report, predicted
+
+def _apply_precision(binary, disease):
+    """
+    PREDICT_PRECISION 모드 적용
+    - PRECISION_EVAL_DIR의 평가 이미지로 fp32 대비 일치율이 PRECISION_MIN_AGREEMENT 미만이면 거부하고 fp32 유지
+    - PRECISION_EVAL_DIR가 없으면 검증할 수 없으므로 ValueError (모델 로드 실패로 처리),
+      PRECISION_ALLOW_UNVERIFIED=true일 때만 검증 없이 사용
+    """
+    mode = validate_precision(PREDICT_PRECISION, device)
+    if mode == "fp32":
+        return binary, disease, None
+
+    if not PRECISION_EVAL_DIR and not PRECISION_ALLOW_UNVERIFIED:
+        raise ValueError(
+            f"{mode} 정밀도를 검증할 PRECISION_EVAL_DIR가 없습니다 "
+            f"(검증 없이 사용하려면 PRECISION_ALLOW_UNVERIFIED=true)"
+        )
+    candidate = (binary.with_precision(mode), disease.with_precision(mode))
+    if not PRECISION_EVAL_DIR:
+        return (*candidate, {"precision": mode, "verified": False})
+
+    samples = load_labelled_images(PRECISION_EVAL_DIR)
+    inputs = [preprocess_image(path) for path, _ in samples]
+    labels = [label for _, label in samples]
+    reference, reference_labels = evaluate_models(binary, disease, inputs, labels)
+    report, _ = evaluate_models(*candidate, inputs, labels, reference=reference_labels)
+    report.update(verified=True, fp32=reference)
+    if report["agreement"] < PRECISION_MIN_AGREEMENT:
+        # 거부 사유는 model_state["precision_report"]로 /health에 노출
+        report.update(rejected=True, reason=f"fp32 대비 일치율 {report['agreement']} < {PRECISION_MIN_AGREEMENT}")
+        return binary, disease, report
+    return (*candidate, report)
+
+def build_models(version=None, warm_up=True):
+    """레지스트리의 버전(생략하면 활성 버전)을 로드해 정밀도 적용 + warm-up까지 마친 ActiveModels와 로드 정보 반환"""
+    started = time.perf_counter()
+    version, paths = model_registry.resolve(version)
+    binary = SkinModel(paths["binary"], num_classes=2, runtime=PREDICT_RUNTIME)
+    disease = SkinModel(paths["disease"], num_classes=6, runtime=PREDICT_RUNTIME)
+    binary, disease, precision_report = _apply_precision(binary, disease)
+    loaded = time.perf_counter()
+    if warm_up:
+        binary.warm_up()
+        disease.warm_up()
+    info = {
+        "version": version,
+        "loaded_at": datetime.now().isoformat(),
+        "runtime": binary.runtime,
+        "precision": binary.precision,
+        "precision_report": precision_report,
+        "load_ms": round((loaded - started) * 1000, 1),
+        "warmup_ms": round((time.perf_counter() - loaded) * 1000, 1)
+    }
+    return ActiveModels(binary, disease, version), info
+
+def load_models(warm_up=True):
+    """활성 버전의 두 모델을 로드하고 warm-up까지 마친 뒤 준비 상태로 전환 (이미 준비되었으면 생략)"""
+    global active_models
+    with _model_lock:
+        if models_ready():
+            return
+        model_state.update(status="loading", error=None)
+        try:
+            models, info = build_models(warm_up=warm_up)
+            active_models = models
+            model_state.update(status="ready", **info)
+        except Exception as e:
+            model_state.update(status="failed", error=str(e))
+            raise RuntimeError(f"Model loading failed: {str(e)}")
+
+def reload_models(version=None):
+    """
+    새 버전을 로드 + warm-up한 뒤 서비스 중인 모델과 교체 (version 생략 시 레지스트리의 활성 버전)
+    - 로드하는 동안에는 기존 모델이 계속 요청을 처리하고, 실패하면 기존 모델을 그대로 유지
+    - 교체에 성공하면 해당 버전을 활성 버전으로 기록 (다른 워커도 주기적 확인으로 따라옴)
+    """
+    global active_models
+    if not _reload_lock.acquire(blocking=False):
+        raise RuntimeError("이미 다른 모델 버전을 로드하는 중입니다")
+    try:
+        model_state["reload"] = {"status": "loading", "version": version, "error": None}
+        try:
+            models, info = build_models(version)
+        except Exception as e:
+            model_state["reload"] = {"status": "failed", "version": version, "error": str(e)}
+            raise RuntimeError(f"Model loading failed: {str(e)}")
+        with _model_lock:
+            previous = active_models.version if active_models is not None else None
+            active_models = models
+            model_state.update(status="ready", error=None, **info)
+        model_registry.activate(models.version)
+        model_state["reload"] = {"status": "done", "version": models.version, "error": None, "previous": previous}
+        return {**info, "previous": previous}
+    finally:
+        _reload_lock.release()
+
+# 9. 계층적 예측 --------------------------------------------------
+def get_model_key():
+    """현재 서비스 중인 모델 버전 + 체크포인트 조합의 식별자 (예측 캐시 무효화 기준)"""
+    return active_models.key
+
+def run_cascade(binary, disease, input_full, input_roi, on_stage=None):
+    """
+    전처리된 입력 배치(N, 3, H, W)를 이진 → 질환 모델 순으로 예측
+    - 1단계 이진 분류는 전체 배치, 2단계 질환 분류는 유증상 입력만 배치로 실행
+    - 유증상 입력은 새 텐서를 만들지 않고 버퍼 앞쪽으로 제자리 이동 (입력 버퍼 내용이 바뀜)
+    - on_stage(단계, 행 번호 리스트): 단계가 끝날 때마다 호출 (binary_done / disease_done)
+    - PREDICT_EMBEDDINGS면 이진 모델의 풀링 특징을 결과의 embedding(float16 바이트)에 담음
+      (모든 입력이 거치는 1단계 모델의 특징이므로 무증상/유증상 사례를 같은 공간에서 비교 가능)
+    """
+    results = [None] * input_full.shape[0]
+    symptomatic = []
+    embeddings = None  # 빈 배치(모든 이미지가 품질 검사 거절 / 디코딩 실패)면 모델을 실행하지 않음
+    if results:
+        with stage_seconds.time("binary_forward"):
+            if PREDICT_EMBEDDINGS:
+                binary_preds, embeddings = binary.predict_batch_with_embeddings(input_full, input_roi)
+            else:
+                binary_preds, embeddings = binary.predict_batch(input_full, input_roi), None
+        for i, (pred, conf) in enumerate(binary_preds):
+            if pred == 0:
+                results[i] = {"label": binary_label_map[pred], "probability": conf}
+            else:
+                symptomatic.append(i)
+        routing_total.inc("asymptomatic", amount=len(results) - len(symptomatic))
+        routing_total.inc("symptomatic", amount=len(symptomatic))
+        if on_stage is not None:
+            on_stage("binary_done", range(len(results)))
+
+    if symptomatic:
+        count = compact_rows((input_full, input_roi), symptomatic)
+        with stage_seconds.time("disease_forward"):
+            disease_preds = disease.predict_batch(input_full[:count], input_roi[:count])
+        for i, (pred, conf) in zip(symptomatic, disease_preds):
+            results[i] = {"label": disease_label_map[pred], "probability": conf}
+        if on_stage is not None:
+            on_stage("disease_done", symptomatic)
+
+    if embeddings is not None:
+        for result, embedding in zip(results, embeddings):
+            result["embedding"] = embedding.tobytes()
+    return results
+
+def hierarchical_predict(image_file, roi_box=None):
+    result = hierarchical_predict_batch([image_file], [roi_box])[0]
+    if isinstance(result, Exception):
+        raise RuntimeError(f"Hierarchical prediction failed: {str(result)}")
+    return result
+
+def _notify(progress, i, stage):
+    """진행 상황 콜백 호출 (콜백 오류가 예측을 방해하지 않도록 무시)"""
+    if progress is not None and progress[i] is not None:
+        try:
+            progress[i](stage)
+        except Exception as e:
+            print(f"진행 상황 알림 실패: {e}")
+
+def hierarchical_predict_batch(image_files, roi_boxes=None, progress=None):
+    """
+    여러 이미지를 배치로 계층 예측 (roi_boxes: 이미지별 ROI 박스 또는 None, 생략하면 모두 자동 검출)
+    - progress: 이미지별 진행 콜백 progress[i](단계) 또는 None (decoded → binary_done → disease_done)
+    - 전처리는 이미지당 한 번만 수행해 재사용 입력 버퍼에 바로 기록하고, 두 단계 모델이 같은 버퍼를 공유
+    - 결과는 입력 순서대로 반환하며, 실패한 이미지는 해당 위치에 예외 객체를 담음
+    - 결과마다 예측에 사용한 모델 버전(model_version)을 담음
+    - 품질 사전 검사에서 거절된 이미지는 모델을 실행하지 않고 {"rejected": 항목, "message", "quality"}를 담음
+    """
+    load_models()
+    roi_boxes = roi_boxes or [None] * len(image_files)
+    models = active_models  # 배치 도중 버전이 교체되어도 이 배치는 같은 모델로 끝까지 처리
+    results = [None] * len(image_files)
+    try:
+        with input_buffers.acquire(len(image_files)) as (input_full, input_roi):
+            # 성공한 이미지만 버퍼 앞쪽부터 채움 (실패한 파일은 예외 객체로 대체)
+            valid = []
+            for i, (image_file, roi_box) in enumerate(zip(image_files, roi_boxes)):
+                slot = len(valid)
+                try:
+                    preprocess_into(image_file, input_full[slot], input_roi[slot], roi_box, quality_gate)
+                    valid.append(i)
+                    _notify(progress, i, "decoded")
+                except ImageQualityError as e:
+                    results[i] = e.to_result()
+                except Exception as e:
+                    results[i] = RuntimeError(f"Prediction failed: {str(e)}")
+
+            def on_stage(stage, rows):
+                for row in rows:
+                    _notify(progress, valid[row], stage)
+
+            count = len(valid)
+            outputs = run_cascade(models.binary, models.disease, input_full[:count], input_roi[:count], on_stage)
+            for i, output in zip(valid, outputs):
+                results[i] = {**output, "model_version": models.version}
+    except Exception as e:
+        error = RuntimeError(f"Hierarchical prediction failed: {str(e)}")
+        results = [r if r is not None else error for r in results]
+    return results
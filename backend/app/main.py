@@ -7,7 +7,8 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.database import engine
 from app.db_models import Base
-from app.api import user, predict, pets, diagnosis, notifications, support, admin, email_verification, hospitals
+from app.utils.upload import RequestSizeLimitMiddleware
+from app.api import user, predict, pets, diagnosis, notifications, support, admin, email_verification, hospitals, health, metrics
 from fastapi.staticfiles import StaticFiles
 from datetime import datetime
 from fastapi.encoders import jsonable_encoder
@@ -19,11 +20,19 @@ async def lifespan(app: FastAPI):
     # 서버 시작 시 초기화
     print("Server starting...")
     async with anyio.create_task_group() as tg:
+        # 모델 로드 + warm-up은 백그라운드에서 진행 (/health/ready로 완료 여부 확인)
+        tg.start_soon(predict.preload_models)
+        # 레지스트리의 활성 모델 버전이 바뀌면 무중단으로 교체
+        tg.start_soon(predict.watch_model_registry)
+        # 유사 업로드 인덱스 복원 + 주기적 저장
+        tg.start_soon(predict.persist_phash_index)
         yield
+        tg.cancel_scope.cancel()
     # 서버 종료 시 정리
     print("Server shutting down...")
+    await predict.shutdown_inference()
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
 
 app.include_router(
@@ -32,6 +41,9 @@ app.include_router(
     tags=["email_verification"]
 )
 
+# 요청 본문 크기 상한 (multipart 파싱 전에 확인, UPLOAD_MAX_REQUEST_BYTES)
+app.add_middleware(RequestSizeLimitMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  
@@ -49,6 +61,8 @@ app.include_router(notifications.router, prefix="/api", tags=["notifications"])
 app.include_router(hospitals.router, prefix="/api", tags=["hospitals"])
 app.include_router(support.router, prefix="/api/support", tags=["support"]) 
 app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
+app.include_router(health.router)
+app.include_router(metrics.router)
 
 @app.get("/example")
 async def example():
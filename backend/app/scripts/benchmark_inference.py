@@ -0,0 +1,147 @@
+"""
+오프라인 추론 벤치마크 (GPU / 네트워크 없이 회귀 확인 및 하드웨어 산정용)
+
+사용법 (backend 디렉터리에서):
+    python -m app.scripts.benchmark_inference [--weights auto|random|checkpoint]
+        [--batch-sizes 1,4,8] [--threads 1,2,4] [--precisions fp32,int8,bf16]
+        [--images 32] [--image-size 1280x960] [--repeat 3] [--output report.json]
+
+- weights=auto: app/models의 체크포인트가 있으면 사용하고, 없으면 무작위 가중치로 같은 구조의 모델을 만듦
+- 생성한 JPEG 이미지 묶음을 배치 크기별로 나누어 디코딩 → 전처리 → 계층 예측 전체를 측정
+- --worst-case: 무작위 가중치에서 모든 이미지를 질환 모델까지 보내 2단계 비용까지 포함
+- 결과: 배치 지연 시간 p50/p95/p99, 초당 이미지 수, 유증상 비율, 현재/최대 RSS (JSON)
+  (최대 RSS는 프로세스 전체 기준이라 설정을 거칠수록 단조 증가)
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import resource
+import time
+
+import numpy as np
+import torch
+
+from app.inference.engine import (
+    SkinModel, get_model_path, run_cascade, preprocess_into, input_buffers, device, INPUT_SIZE
+)
+from app.scripts.benchmark_preprocess import make_images
+from app.utils.inference_pool import _read_rss_mb
+from app.utils.precision import validate_precision
+
+MODELS = {"binary_best.pth": 2, "disease_best.pth": 6}
+
+
+def load_base_models(weights, worst_case=False):
+    """(binary, disease, 사용한 가중치 종류)"""
+    if weights in ("auto", "checkpoint"):
+        try:
+            paths = {name: get_model_path(name) for name in MODELS}
+            binary, disease = (SkinModel(paths[name], num_classes=n) for name, n in MODELS.items())
+            return binary, disease, "checkpoint"
+        except FileNotFoundError as e:
+            if weights == "checkpoint":
+                raise SystemExit(str(e))
+            print(f"체크포인트가 없어 무작위 가중치를 사용합니다 ({e})")
+    binary, disease = (SkinModel.with_random_weights(n, seed=i) for i, n in enumerate(MODELS.values()))
+    if worst_case:
+        # 이진 분류가 항상 유증상을 내도록 마지막 층 bias 조정 → 모든 이미지가 질환 모델까지 통과
+        with torch.no_grad():
+            binary.model.classifier[-1].bias.copy_(torch.tensor([-100.0, 100.0]))
+    return binary, disease, "random"
+
+
+def run_batch(binary, disease, images):
+    with input_buffers.acquire(len(images)) as (input_full, input_roi):
+        for slot, data in enumerate(images):
+            preprocess_into(io.BytesIO(data), input_full[slot], input_roi[slot])
+        return run_cascade(binary, disease, input_full[:len(images)], input_roi[:len(images)])
+
+
+def benchmark(binary, disease, images, batch_size, repeat):
+    batches = [images[i:i + batch_size] for i in range(0, len(images), batch_size)]
+    run_batch(binary, disease, batches[0])  # warm-up
+
+    latencies, symptomatic = [], 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for batch in batches:
+            batch_started = time.perf_counter()
+            results = run_batch(binary, disease, batch)
+            latencies.append((time.perf_counter() - batch_started) * 1000)
+            symptomatic += sum(r["label"] != "무증상" for r in results)
+    elapsed = time.perf_counter() - started
+    processed = len(images) * repeat
+
+    return {
+        "batches": len(latencies),
+        "p50_latency_ms": round(float(np.percentile(latencies, 50)), 2),
+        "p95_latency_ms": round(float(np.percentile(latencies, 95)), 2),
+        "p99_latency_ms": round(float(np.percentile(latencies, 99)), 2),
+        "images_per_sec": round(processed / elapsed, 2),
+        "symptomatic_ratio": round(symptomatic / processed, 4),
+        "rss_mb": _read_rss_mb().get("VmRSS"),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="배치 크기/스레드 수/정밀도별 오프라인 추론 벤치마크")
+    parser.add_argument("--weights", choices=("auto", "random", "checkpoint"), default="auto")
+    parser.add_argument("--batch-sizes", default="1,4,8", help="배치 크기 (쉼표 구분)")
+    parser.add_argument("--threads", default=str(torch.get_num_threads()), help="intra-op 스레드 수 (쉼표 구분)")
+    parser.add_argument("--precisions", default="fp32", help="정밀도 모드 (쉼표 구분, fp32/int8/bf16)")
+    parser.add_argument("--images", type=int, default=32, help="생성할 이미지 수")
+    parser.add_argument("--image-size", default="1280x960", help="생성 이미지 크기 (너비x높이)")
+    parser.add_argument("--repeat", type=int, default=3, help="이미지 묶음 반복 횟수")
+    parser.add_argument("--worst-case", action="store_true",
+                        help="무작위 가중치일 때 모든 이미지를 질환 모델까지 통과시킴 (최악 지연 시간)")
+    parser.add_argument("--output", help="결과를 저장할 JSON 파일 (없으면 표준 출력만)")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.image_size.lower().split("x"))
+    batch_sizes = [int(b) for b in args.batch_sizes.split(",") if b]
+    threads = [int(t) for t in args.threads.split(",") if t]
+    precisions = [validate_precision(p, device) for p in args.precisions.split(",") if p]
+
+    images = make_images(args.images, width, height)
+    binary, disease, weights = load_base_models(args.weights, args.worst_case)
+
+    results = []
+    for precision in precisions:
+        models = (binary, disease) if precision == "fp32" else (
+            binary.with_precision(precision), disease.with_precision(precision)
+        )
+        for num_threads in threads:
+            torch.set_num_threads(num_threads)
+            for batch_size in batch_sizes:
+                report = benchmark(*models, images, batch_size, args.repeat)
+                results.append({"precision": precision, "threads": num_threads, "batch_size": batch_size, **report})
+                print(f"{precision} threads={num_threads} batch={batch_size}: "
+                      f"p50 {report['p50_latency_ms']}ms, {report['images_per_sec']} img/s")
+
+    output = {
+        "environment": {
+            "weights": weights,
+            "device": str(device),
+            "torch": torch.__version__,
+            "python": platform.python_version(),
+            "cpu": platform.processor() or platform.machine(),
+            "cpu_count": len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count(),
+            "input_size": INPUT_SIZE,
+            "images": args.images,
+            "image_size": f"{width}x{height}",
+            "repeat": args.repeat
+        },
+        "results": results
+    }
+    text = json.dumps(output, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
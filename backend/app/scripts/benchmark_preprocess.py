@@ -0,0 +1,137 @@
+"""
+전처리 경로 마이크로 벤치마크 (기존 albumentations 경로 vs 재사용 입력 버퍼에 직접 쓰는 경로)
+
+사용법 (backend 디렉터리에서):
+    python -m app.scripts.benchmark_preprocess [--batch-sizes 1,8] [--repeat 20] [--width 1280 --height 960]
+
+측정 항목 (배치 하나 = 이미지 N장 → 배치 입력 텐서 2개):
+    - p50/mean 지연 시간 (JPEG 디코딩 + ROI 추출 포함)
+    - torch_allocs / torch_alloc_mb: PyTorch 프로파일러가 기록한 텐서 메모리 할당 횟수 / 총량
+    - numpy_peak_mb: tracemalloc 기준 numpy/Python 중간 배열 최대 사용량
+기존 경로는 albumentations가 설치되어 있을 때만 측정합니다.
+"""
+import argparse
+import io
+import json
+import time
+import tracemalloc
+
+import numpy as np
+import torch
+from PIL import Image
+from torch.profiler import profile, ProfilerActivity
+
+from app.inference.engine import INPUT_SIZE, roi_extractor, input_buffers, preprocess_into
+
+
+def make_images(count, width, height):
+    """가운데에 어두운 병변 영역이 있는 합성 JPEG 이미지 (ROI 추출이 실제처럼 동작하도록)"""
+    rng = np.random.default_rng(0)
+    images = []
+    for _ in range(count):
+        array = rng.integers(150, 256, size=(height, width, 3), dtype=np.uint8)
+        array[height // 4:height * 3 // 4, width // 4:width * 3 // 4] //= 4
+        buffer = io.BytesIO()
+        Image.fromarray(array).save(buffer, format="JPEG", quality=90)
+        images.append(buffer.getvalue())
+    return images
+
+
+def create_reference_transform():
+    """이전 버전의 전처리 (Resize → Normalize → ToTensorV2, 이미지마다 새 배열/텐서 할당)"""
+    import albumentations as A
+    from albumentations.pytorch import ToTensorV2
+
+    return A.Compose([
+        A.Resize(height=INPUT_SIZE, width=INPUT_SIZE),
+        A.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225]),
+        ToTensorV2()
+    ])
+
+
+def run_reference(reference, images):
+    inputs = []
+    for data in images:
+        np_image = np.asarray(Image.open(io.BytesIO(data)).convert("RGB"))
+        roi_image = roi_extractor.extract_array(np_image)
+        inputs.append((
+            reference(image=np_image)["image"],
+            reference(image=np.ascontiguousarray(roi_image))["image"]
+        ))
+    return torch.stack([full for full, _ in inputs]), torch.stack([roi for _, roi in inputs])
+
+
+def run_fused(images):
+    with input_buffers.acquire(len(images)) as (input_full, input_roi):
+        for slot, data in enumerate(images):
+            preprocess_into(io.BytesIO(data), input_full[slot], input_roi[slot])
+        return input_full[:len(images)], input_roi[:len(images)]
+
+
+def measure(fn, repeat):
+    fn()  # warm-up (버퍼 풀 / 스레드 버퍼 생성)
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    with profile(activities=[ProfilerActivity.CPU], profile_memory=True) as prof:
+        fn()
+    allocations = [e.self_cpu_memory_usage for e in prof.events() if e.self_cpu_memory_usage > 0]
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "p50_latency_ms": round(float(np.percentile(latencies, 50)), 2),
+        "mean_latency_ms": round(float(np.mean(latencies)), 2),
+        "torch_allocs": len(allocations),
+        "torch_alloc_mb": round(sum(allocations) / 2 ** 20, 2),
+        "numpy_peak_mb": round(peak / 2 ** 20, 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="전처리 경로별 지연 시간/메모리 할당 비교")
+    parser.add_argument("--batch-sizes", default="1,8", help="비교할 배치 크기 (쉼표 구분)")
+    parser.add_argument("--repeat", type=int, default=20, help="배치 크기별 반복 횟수")
+    parser.add_argument("--width", type=int, default=1280, help="합성 이미지 너비")
+    parser.add_argument("--height", type=int, default=960, help="합성 이미지 높이")
+    args = parser.parse_args()
+    batch_sizes = [int(b) for b in args.batch_sizes.split(",") if b]
+
+    try:
+        reference = create_reference_transform()
+    except ImportError:
+        reference = None
+        print("albumentations가 없어 기존 경로는 건너뜁니다")
+
+    reports = []
+    for batch_size in batch_sizes:
+        images = make_images(batch_size, args.width, args.height)
+        paths = {"fused": lambda: run_fused(images)}
+        if reference is not None:
+            paths = {"albumentations": lambda: run_reference(reference, images), **paths}
+            full, roi = run_reference(reference, images)
+            fused_full, fused_roi = run_fused(images)
+            max_diff = max((full - fused_full).abs().max().item(), (roi - fused_roi).abs().max().item())
+        else:
+            max_diff = None
+
+        for name, fn in paths.items():
+            reports.append({
+                "path": name,
+                "batch_size": batch_size,
+                "image_size": f"{args.width}x{args.height}",
+                **measure(fn, args.repeat),
+                "max_abs_diff_vs_albumentations": max_diff if name == "fused" else None
+            })
+
+    print(json.dumps(reports, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+ROI 검출 벤치마크 (기존 원본 해상도 + 외곽선 루프 방식 vs 축소 이미지 + 연결 요소 통계 방식)
+
+사용법 (backend 디렉터리에서):
+    python -m app.scripts.benchmark_roi <사진 폴더> [--detect-size 256] [--repeat 3] [--decode]
+
+폴더 아래의 jpg/jpeg/png/webp 이미지를 모두 사용하며, 이미지별로 두 방식의 박스 IoU와
+검출 지연 시간을 비교합니다. --decode를 주면 서비스와 같은 축소 디코딩(decode_image) 결과에서 비교합니다.
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from app.inference.engine import ROIExtractor, decode_image
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp"}
+
+
+def reference_detect(image: np.ndarray, min_roi_size: int) -> tuple:
+    """이전 버전의 ROI 검출 (원본 해상도에서 findContours 후 Python 루프로 가장 큰 박스 선택)"""
+    gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+    blurred = cv2.GaussianBlur(gray, (5,5), 0)
+    _, thresh = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+
+    contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    max_area = 0
+    best_rect = (0,0,image.shape[1],image.shape[0])
+    for cnt in contours:
+        x,y,w,h = cv2.boundingRect(cnt)
+        area = w * h
+        if area > max_area and w > min_roi_size and h > min_roi_size:
+            max_area = area
+            best_rect = (x,y,x+w,y+h)
+    return best_rect
+
+
+def iou(a, b) -> float:
+    width = max(0, min(a[2], b[2]) - max(a[0], b[0]))
+    height = max(0, min(a[3], b[3]) - max(a[1], b[1]))
+    intersection = width * height
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - intersection
+    return intersection / union if union else 1.0
+
+
+def measure(fn, repeat):
+    result = fn()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return result, (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ROI 검출 방식별 지연 시간/IoU 비교")
+    parser.add_argument("folder", help="사진 폴더 (하위 폴더 포함)")
+    parser.add_argument("--detect-size", type=int, default=256, help="검출용 축소 이미지의 긴 변")
+    parser.add_argument("--repeat", type=int, default=3, help="이미지별 반복 횟수")
+    parser.add_argument("--decode", action="store_true", help="서비스와 같은 축소 디코딩 결과에서 비교")
+    args = parser.parse_args()
+
+    paths = sorted(p for p in Path(args.folder).rglob("*") if p.suffix.lower() in IMAGE_SUFFIXES)
+    if not paths:
+        raise SystemExit(f"이미지가 없습니다: {args.folder}")
+
+    extractor = ROIExtractor(detect_size=args.detect_size)
+    images, reference_ms, fast_ms, ious = [], [], [], []
+    for path in paths:
+        if args.decode:
+            image, _ = decode_image(path)
+        else:
+            image = np.asarray(Image.open(path).convert("RGB"))
+        reference_box, elapsed = measure(lambda: reference_detect(image, extractor.min_roi_size), args.repeat)
+        reference_ms.append(elapsed)
+        box, elapsed = measure(lambda: extractor._auto_detect(image), args.repeat)
+        fast_ms.append(elapsed)
+        ious.append(iou(reference_box, box))
+        images.append({
+            "file": str(path.relative_to(args.folder)),
+            "size": f"{image.shape[1]}x{image.shape[0]}",
+            "reference_box": reference_box,
+            "box": box,
+            "iou": round(ious[-1], 4)
+        })
+
+    report = {
+        "images": len(paths),
+        "detect_size": args.detect_size,
+        "reference_p50_ms": round(float(np.percentile(reference_ms, 50)), 2),
+        "fast_p50_ms": round(float(np.percentile(fast_ms, 50)), 2),
+        "speedup": round(float(np.sum(reference_ms) / np.sum(fast_ms)), 2),
+        "mean_iou": round(float(np.mean(ious)), 4),
+        "min_iou": round(float(np.min(ious)), 4),
+        "iou_over_0.9": round(float(np.mean(np.array(ious) >= 0.9)), 4),
+        "details": images
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
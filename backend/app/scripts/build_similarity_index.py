@@ -0,0 +1,70 @@
+"""
+유사 사례 검색용 임베딩 저장소의 IVF 목록 학습 / 검색 시간 측정
+
+사용법 (backend 디렉터리에서):
+    python -m app.scripts.build_similarity_index [--version 버전] [--nlist 1000] [--iterations 10]
+    python -m app.scripts.build_similarity_index --stats [--queries 200]
+
+- 임베딩은 진단 결과 저장 시 DATA_DIR/embeddings/<모델 버전>/에 추가되며,
+  행 수가 EMBEDDING_IVF_MIN_ROWS(기본 2만)에 이르거나 학습 시점의
+  EMBEDDING_IVF_RETRAIN_FACTOR(기본 2)배로 늘면 추가 시 자동으로 학습
+- 이 스크립트는 목록 수(--nlist)를 바꾸거나 대량 재채점 후 바로 다시 학습할 때 사용
+- 실행 중인 서버는 다음 검색 때 새 목록을 자동으로 읽음 (재시작 불필요)
+"""
+import argparse
+import json
+import time
+
+from app.inference.common import get_embedding_stores
+
+
+def measure_search(store, queries: int, k: int = 10) -> dict:
+    """저장된 기록을 질의로 한 유사 사례 검색 시간 (ms, API와 같은 경로)"""
+    timings = []
+    for diagnosis_id in store.sample_ids(queries):
+        start = time.perf_counter()
+        store.similar(diagnosis_id, k)
+        timings.append((time.perf_counter() - start) * 1000)
+    if not timings:
+        return {}
+    timings.sort()
+    return {
+        "queries": len(timings),
+        "p50_ms": round(timings[len(timings) // 2], 2),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2),
+        "max_ms": round(timings[-1], 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="유사 사례 검색 IVF 학습 / 검색 시간 측정")
+    parser.add_argument("--version", help="대상 모델 버전 (생략하면 임베딩이 있는 모든 버전)")
+    parser.add_argument("--nlist", type=int, help="IVF 목록 수 (기본: sqrt(행 수))")
+    parser.add_argument("--iterations", type=int, default=10, help="k-means 반복 횟수")
+    parser.add_argument("--stats", action="store_true", help="학습하지 않고 저장소 상태와 검색 시간만 출력")
+    parser.add_argument("--queries", type=int, default=200, help="검색 시간 측정에 쓸 질의 수 (0이면 측정 생략)")
+    args = parser.parse_args()
+
+    stores = get_embedding_stores()
+    versions = [args.version] if args.version else stores.versions()
+    if not versions:
+        raise SystemExit("저장된 임베딩이 없습니다")
+
+    for version in versions:
+        store = stores.get(version)
+        if not args.stats:
+            start = time.perf_counter()
+            try:
+                info = store.build_ivf(nlist=args.nlist, iterations=args.iterations)
+            except ValueError as e:
+                print(f"{version}: {e}")
+                continue
+            print(f"{version}: IVF 학습 완료 ({time.perf_counter() - start:.1f}초) {info}")
+        report = {"version": version, **store.stats()}
+        if args.queries > 0:
+            report["search"] = measure_search(store, args.queries)
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+API 전용 프로세스(추론 풀 모드)의 import 시간 예산 / ML 패키지 미로드 점검
+
+사용법 (backend 디렉터리에서):
+    python -m app.scripts.check_import_budget [--budget-ms 1500] [--top 15]
+
+- INFERENCE_POOL_SOCKET을 설정한 새 인터프리터에서 main.py의 import 문을 `-X importtime`으로 실행
+  (main.py 자체는 import 시 DB 테이블 생성 / 정적 폴더 마운트를 하므로 import 문까지만 측정)
+- ML 패키지(torch, timm, cv2 등)가 하나라도 로드되거나 총 import 시간이 예산을 넘으면 종료 코드 1
+- 측정 시간은 환경에 따라 흔들리므로 --repeat 중 가장 빠른 값을 기준으로 판정
+"""
+import argparse
+import ast
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+FORBIDDEN_MODULES = ("torch", "torchvision", "timm", "cv2", "albumentations", "numpy", "onnxruntime")
+MAIN_PATH = Path(__file__).resolve().parent.parent / "main.py"
+
+
+def main_imports() -> str:
+    """main.py의 최상위 import 문만 모은 코드"""
+    tree = ast.parse(MAIN_PATH.read_text(encoding="utf-8"))
+    statements = [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    return "\n".join(statements)
+
+
+def measure(code: str, env: dict):
+    """(모듈별 누적 import 시간(us), 최상위 import 합계(us)) - import 실패 시 SystemExit"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=MAIN_PATH.parent.parent, env=env, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        raise SystemExit(f"import 실패:\n{completed.stderr[-2000:]}")
+
+    modules, total = {}, 0
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        raw_name = line.rsplit("|", 1)[1]
+        modules[name] = int(cumulative)
+        if raw_name[1:2] != " ":  # 들여쓰기가 없으면 최상위 import
+            total += int(cumulative)
+    return modules, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API 전용 프로세스 import 시간 예산 점검")
+    parser.add_argument("--budget-ms", type=float, default=1500, help="main.py import 문 전체의 허용 시간 (ms)")
+    parser.add_argument("--repeat", type=int, default=3, help="측정 횟수 (가장 빠른 값으로 판정)")
+    parser.add_argument("--top", type=int, default=15, help="출력할 느린 모듈 수")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("INFERENCE_POOL_SOCKET", "/tmp/petskin-inference.sock")
+    code = main_imports()
+
+    runs = [measure(code, env) for _ in range(max(1, args.repeat))]
+    modules, total = min(runs, key=lambda run: run[1])
+    loaded = sorted({name for name in modules for forbidden in FORBIDDEN_MODULES
+                     if name == forbidden or name.startswith(forbidden + ".")})
+
+    print(f"main.py import 시간: {total / 1000:.1f}ms (예산 {args.budget_ms:.0f}ms, {len(modules)}개 모듈)")
+    for name, cumulative in sorted(modules.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {cumulative / 1000:8.1f}ms  {name}")
+
+    failures = []
+    if loaded:
+        failures.append(f"API 전용 프로세스에서 ML 패키지가 로드되었습니다: {', '.join(loaded[:10])}")
+    if total / 1000 > args.budget_ms:
+        failures.append(f"import 시간이 예산을 넘었습니다: {total / 1000:.1f}ms > {args.budget_ms:.0f}ms")
+    for failure in failures:
+        print(failure)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
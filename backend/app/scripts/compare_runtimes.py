@@ -0,0 +1,79 @@
+"""
+런타임별(eager / torchscript / onnx) 결과 일치 여부와 지연 시간 비교
+
+사용법 (backend 디렉터리에서, export_models 실행 후):
+    python -m app.scripts.compare_runtimes [--batch-sizes 1,4,8] [--repeat 5] [--atol 1e-3]
+
+eager 대비 logits 최대 오차가 atol을 넘거나 top-1이 다르면 종료 코드 1로 끝납니다.
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+import torch
+
+from app.inference.engine import SkinModel, get_model_path, INPUT_SIZE
+from app.utils.runtimes import RUNTIMES
+
+MODELS = {"binary_best.pth": 2, "disease_best.pth": 6}
+
+
+def measure(model, inputs, repeat):
+    model.logits(*inputs)  # warm-up
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        model.logits(*inputs)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="추론 런타임 간 일치율/지연 시간 비교")
+    parser.add_argument("--batch-sizes", default="1,4,8", help="비교할 배치 크기 (쉼표 구분)")
+    parser.add_argument("--repeat", type=int, default=5, help="배치 크기별 반복 횟수")
+    parser.add_argument("--atol", type=float, default=1e-3, help="eager 대비 허용 logits 오차")
+    args = parser.parse_args()
+    batch_sizes = [int(b) for b in args.batch_sizes.split(",") if b]
+
+    torch.manual_seed(0)
+    reports, passed = [], True
+    for model_name, num_classes in MODELS.items():
+        model_path = get_model_path(model_name)
+        models = {}
+        for runtime in RUNTIMES:
+            try:
+                models[runtime] = SkinModel(model_path, num_classes=num_classes, runtime=runtime)
+            except Exception as e:
+                print(f"{model_name} [{runtime}] 건너뜀: {e}")
+
+        for batch_size in batch_sizes:
+            inputs = (
+                torch.randn(batch_size, 3, INPUT_SIZE, INPUT_SIZE),
+                torch.randn(batch_size, 3, INPUT_SIZE, INPUT_SIZE)
+            )
+            reference = models["eager"].logits(*inputs)
+            for runtime, model in models.items():
+                outputs = model.logits(*inputs)
+                max_diff = (outputs - reference).abs().max().item()
+                top1_match = bool((outputs.argmax(1) == reference.argmax(1)).all())
+                passed = passed and max_diff <= args.atol and top1_match
+                latencies = measure(model, inputs, args.repeat)
+                reports.append({
+                    "model": model_name,
+                    "runtime": runtime,
+                    "batch_size": batch_size,
+                    "max_abs_diff": max_diff,
+                    "top1_match": top1_match,
+                    "p50_latency_ms": round(float(np.percentile(latencies, 50)), 2),
+                    "images_per_sec": round(batch_size / (np.mean(latencies) / 1000), 2)
+                })
+
+    print(json.dumps(reports, ensure_ascii=False, indent=2))
+    if not passed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
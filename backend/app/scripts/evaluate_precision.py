@@ -0,0 +1,53 @@
+"""
+정밀도 모드별 평가 (fp32 대비 top-1 일치율, 정확도, 지연 시간)
+
+사용법 (backend 디렉터리에서):
+    python -m app.scripts.evaluate_precision <평가 이미지 폴더> [--modes fp32,int8,bf16]
+
+평가 이미지 폴더는 라벨별 하위 폴더 구조여야 합니다.
+    예) eval/무증상/a.jpg, eval/농포_여드름/b.jpg
+"""
+import argparse
+import json
+
+from app.inference.engine import SkinModel, get_model_path, preprocess_image, evaluate_models, device
+from app.utils.precision import PRECISION_MODES, validate_precision, load_labelled_images
+
+
+def main():
+    parser = argparse.ArgumentParser(description="정밀도 모드별 fp32 대비 일치율/지연 시간 평가")
+    parser.add_argument("folder", help="라벨별 하위 폴더 구조의 평가 이미지 폴더")
+    parser.add_argument("--modes", default=",".join(PRECISION_MODES), help="평가할 정밀도 모드 (쉼표 구분)")
+    args = parser.parse_args()
+
+    modes = [validate_precision(mode, device) for mode in args.modes.split(",") if mode]
+    samples = load_labelled_images(args.folder)
+    if not samples:
+        raise SystemExit(f"평가용 이미지가 없습니다: {args.folder}")
+
+    inputs = [preprocess_image(path) for path, _ in samples]
+    labels = [label for _, label in samples]
+
+    binary = SkinModel(get_model_path("binary_best.pth"), num_classes=2)
+    disease = SkinModel(get_model_path("disease_best.pth"), num_classes=6)
+    binary.warm_up()
+    disease.warm_up()
+
+    reference_report, reference = evaluate_models(binary, disease, inputs, labels)
+    reports = []
+    for mode in modes:
+        if mode == "fp32":
+            reports.append({**reference_report, "agreement": 1.0})
+            continue
+        candidate = (binary.with_precision(mode), disease.with_precision(mode))
+        candidate[0].warm_up()
+        candidate[1].warm_up()
+        report, _ = evaluate_models(*candidate, inputs, labels, reference=reference)
+        report["speedup_vs_fp32"] = round(reference_report["mean_latency_ms"] / report["mean_latency_ms"], 3)
+        reports.append(report)
+
+    print(json.dumps(reports, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
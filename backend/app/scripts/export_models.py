@@ -0,0 +1,67 @@
+"""
+체크포인트(.pth)를 TorchScript(.ts) / ONNX(.onnx) 아티팩트로 변환 (배치 차원은 동적)
+
+사용법 (backend 디렉터리에서):
+    python -m app.scripts.export_models [--runtimes torchscript,onnx] [--opset 17]
+
+아티팩트는 체크포인트와 같은 폴더(app/models)에 저장되며, PREDICT_RUNTIME 설정으로 선택합니다.
+"""
+import argparse
+
+import torch
+
+from app.inference.engine import SkinModel, get_model_path, INPUT_SIZE
+from app.utils.runtimes import INPUT_NAMES, OUTPUT_NAMES, get_artifact_path
+
+MODELS = {"binary_best.pth": 2, "disease_best.pth": 6}
+
+
+def export_torchscript(model, example, path):
+    with torch.no_grad():
+        traced = torch.jit.trace(model, example)
+        traced = torch.jit.freeze(traced)
+    traced.save(str(path))
+
+
+def export_onnx(model, example, path, opset):
+    dynamic_axes = {name: {0: "batch"} for name in INPUT_NAMES + OUTPUT_NAMES}
+    torch.onnx.export(
+        model,
+        example,
+        str(path),
+        input_names=INPUT_NAMES,
+        output_names=OUTPUT_NAMES,
+        dynamic_axes=dynamic_axes,
+        opset_version=opset,
+        dynamo=False
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="추론용 TorchScript / ONNX 아티팩트 생성")
+    parser.add_argument("--runtimes", default="torchscript,onnx", help="생성할 런타임 (쉼표 구분)")
+    parser.add_argument("--opset", type=int, default=17, help="ONNX opset 버전")
+    args = parser.parse_args()
+    runtimes = [r for r in args.runtimes.split(",") if r]
+
+    # 배치 2로 추적/내보내기 (배치 1로 추적하면 배치 크기가 상수로 고정될 수 있음)
+    example = (
+        torch.randn(2, 3, INPUT_SIZE, INPUT_SIZE),
+        torch.randn(2, 3, INPUT_SIZE, INPUT_SIZE)
+    )
+    for model_name, num_classes in MODELS.items():
+        model_path = get_model_path(model_name)
+        model = SkinModel(model_path, num_classes=num_classes).model.cpu()
+        for runtime in runtimes:
+            path = get_artifact_path(model_path, runtime)
+            if runtime == "torchscript":
+                export_torchscript(model, example, path)
+            elif runtime == "onnx":
+                export_onnx(model, example, path, args.opset)
+            else:
+                raise SystemExit(f"지원하지 않는 런타임입니다: {runtime}")
+            print(f"{model_name} → {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""
+다중 프로세스 추론 풀 서버
+
+사용법 (backend 디렉터리에서):
+    python -m app.scripts.inference_server --socket /tmp/petskin-inference.sock --workers 4
+    python -m app.scripts.inference_server --socket tcp://127.0.0.1:8600 --workers 4
+
+API 서버는 INFERENCE_POOL_SOCKET(과 INFERENCE_POOL_AUTHKEY)을 같은 값으로 설정하면
+모델을 직접 로드하지 않고(torch 등 ML 패키지도 import하지 않음) 이 풀에 예측을 위임합니다.
+"""
+import argparse
+import os
+
+from app.utils.inference_pool import serve
+
+
+def main():
+    parser = argparse.ArgumentParser(description="코어 고정 다중 프로세스 추론 풀")
+    parser.add_argument("--socket", default=os.getenv("INFERENCE_POOL_SOCKET", "/tmp/petskin-inference.sock"),
+                        help="Unix 소켓 경로 또는 tcp://호스트:포트")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("INFERENCE_POOL_WORKERS", 2)),
+                        help="워커 프로세스 수 (사용 가능한 코어 수를 넘지 않도록 조정)")
+    args = parser.parse_args()
+
+    authkey = os.getenv("INFERENCE_POOL_AUTHKEY")
+    serve(args.socket, args.workers, authkey=authkey.encode() if authkey else None)
+
+
+if __name__ == "__main__":
+    main()
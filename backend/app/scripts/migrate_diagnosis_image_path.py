@@ -0,0 +1,46 @@
+"""
+diagnosis_history.image_path 컬럼 추가 (1회성 마이그레이션)
+
+사용법 (backend 디렉터리에서, /diagnosis/predict를 포함한 버전을 배포하기 전에 한 번 실행):
+    python -m app.scripts.migrate_diagnosis_image_path
+
+- create_all은 기존 테이블에 컬럼을 추가하지 않으므로, 이미 있는 DB에는 이 스크립트로 추가
+- 컬럼이 이미 있으면 아무것도 하지 않음 (여러 번 실행하거나 동시에 실행해도 안전)
+"""
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from app.database import engine
+
+TABLE = "diagnosis_history"
+COLUMN = "image_path"
+
+
+def _has_column(bind) -> bool:
+    return COLUMN in {column["name"] for column in inspect(bind).get_columns(TABLE)}
+
+
+def add_image_path_column(bind) -> bool:
+    """컬럼이 없으면 추가하고 True, 이미 있으면 False (다른 프로세스가 먼저 추가한 경우 포함)"""
+    if not inspect(bind).has_table(TABLE) or _has_column(bind):
+        return False
+    try:
+        with bind.begin() as conn:
+            conn.execute(text(f"ALTER TABLE {TABLE} ADD COLUMN {COLUMN} VARCHAR(255) NULL"))
+    except (OperationalError, ProgrammingError):
+        # 동시에 실행된 다른 프로세스가 먼저 추가했으면 중복 컬럼 오류 → 성공으로 간주
+        if _has_column(bind):
+            return False
+        raise
+    return True
+
+
+def main():
+    if add_image_path_column(engine):
+        print(f"{TABLE}.{COLUMN} 컬럼을 추가했습니다")
+    else:
+        print(f"{TABLE}.{COLUMN} 컬럼이 이미 있거나 테이블이 없습니다 (변경 없음)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+새 모델 버전을 레지스트리(app/models/registry.json)에 등록
+
+사용법 (backend 디렉터리에서):
+    python -m app.scripts.register_model <버전> --binary <binary.pth> --disease <disease.pth> [--note 메모] [--activate]
+    python -m app.scripts.register_model --list
+
+- 체크포인트(와 옆에 있는 .ts / .onnx 아티팩트)를 app/models/versions/<버전>/ 아래로 복사
+- --activate: 활성 버전으로 지정 (실행 중인 서버는 MODEL_REGISTRY_POLL_SECONDS 안에 무중단 교체,
+  즉시 교체하려면 관리자 API POST /api/admin/models/reload)
+"""
+import argparse
+import json
+
+from app.inference.common import model_registry
+
+
+def main():
+    parser = argparse.ArgumentParser(description="모델 버전 등록 / 목록 조회")
+    parser.add_argument("version", nargs="?", help="등록할 버전 이름 (예: 2025-07-01)")
+    parser.add_argument("--binary", help="이진 분류 체크포인트 경로")
+    parser.add_argument("--disease", help="질환 분류 체크포인트 경로")
+    parser.add_argument("--note", help="버전 설명")
+    parser.add_argument("--activate", action="store_true", help="등록 후 활성 버전으로 지정")
+    parser.add_argument("--list", action="store_true", help="등록된 버전 목록 출력")
+    args = parser.parse_args()
+
+    if args.list:
+        print(json.dumps(model_registry.manifest(), ensure_ascii=False, indent=2))
+        return
+    if not (args.version and args.binary and args.disease):
+        parser.error("버전, --binary, --disease가 모두 필요합니다")
+
+    try:
+        entry = model_registry.register(args.version, args.binary, args.disease, note=args.note, activate=args.activate)
+    except (ValueError, OSError) as e:
+        raise SystemExit(str(e))
+    print(f"{args.version} 등록 완료{' (활성 버전)' if args.activate else ''}")
+    print(json.dumps(entry, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+업로드된 진단 이미지를 새 모델 버전으로 일괄 재채점 (오프라인)
+
+사용법 (backend 디렉터리에서, 업로드 경로는 서버와 같은 작업 디렉터리 기준):
+    python -m app.scripts.rescore_uploads [--version 2025-07-01] [--backfill] [--root uploads/diagnosis]
+        [--workers 4] [--threads 4] [--batch-size 8] [--commit-every 256] [--limit N]
+
+- 기본 대상은 진단 기록(diagnosis_history.image_path)에 연결된 이미지뿐
+  (반려동물 프로필 사진 등 진단에 쓰지 않은 업로드는 제외), --root를 주면 그 폴더의 이미지 전체
+- 결과는 diagnosis_rescores 테이블에 (이미지, 모델 버전)당 한 행으로 기록
+  (연결된 진단 기록이 있으면 재채점 전 결과를 함께 남겨 버전 간 비교 가능)
+- 재실행하면 이 버전으로 이미 기록된 이미지는 건너뛰므로 중단된 지점부터 이어서 처리
+- --backfill: diagnosis_history.image_path로 연결된 진단 기록의 진단명 / 신뢰도 / 모델 버전 문구를 갱신
+- 연결된 진단 기록의 임베딩은 이 버전의 유사 사례 검색 저장소에 추가
+- 디코딩 / 전처리는 --workers개 프로세스에서, forward는 이 프로세스에서 배치로 실행하며
+  디코딩이 앞서 나가도 메모리에 올라가는 이미지는 최대 (workers x batch-size x 2)장
+- 품질 사전 검사는 적용하지 않음 (이미 진단에 사용된 이미지)
+"""
+import argparse
+import multiprocessing
+import os
+import time
+from collections import Counter, deque
+
+import numpy as np
+import torch
+
+from app.database import SessionLocal, engine as db_engine
+from app.db_models import Base, DiagnosisHistory, DiagnosisRescore
+from app.inference.common import get_embedding_stores
+from app.inference.engine import build_models, preprocess_image, run_cascade
+from app.scripts.migrate_diagnosis_image_path import add_image_path_column
+from app.utils.model_registry import with_model_version
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".bmp")
+
+
+def find_images(root: str):
+    """root 아래의 이미지 파일 경로 (정렬된 순서, 서버가 DB에 저장하는 형식과 같은 상대 경로)"""
+    for directory, subdirs, files in os.walk(root):
+        subdirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                yield os.path.normpath(os.path.join(directory, name))
+
+
+def _init_worker():
+    # 디코딩 프로세스끼리 코어를 나눠 쓰도록 라이브러리 내부 스레드는 하나만 사용
+    torch.set_num_threads(1)
+    try:
+        import cv2
+        cv2.setNumThreads(1)
+    except ImportError:
+        pass
+
+
+def _decode(path: str):
+    """(경로, 전체 이미지 입력, ROI 입력, 오류) - 입력은 (3, H, W) float32 배열"""
+    try:
+        input_full, input_roi = preprocess_image(path)
+        return path, input_full.numpy(), input_roi.numpy(), None
+    except Exception as e:
+        return path, None, None, str(e)
+
+
+def decode_stream(pool, paths, max_in_flight: int):
+    """경로 순서대로 디코딩 결과를 내보냄 (처리 중인 이미지를 max_in_flight장으로 제한해 메모리 상한 유지)"""
+    pending = deque()
+    for path in paths:
+        pending.append(pool.apply_async(_decode, (path,)))
+        while len(pending) >= max_in_flight or (pending and pending[0].ready()):
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+
+def batched(iterable, size: int):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class RescoreWriter:
+    """재채점 결과를 모아 commit_every장마다 한 트랜잭션으로 대량 기록"""
+
+    def __init__(self, db, version: str, linked: dict, backfill: bool, commit_every: int):
+        self.db = db
+        self.version = version
+        self.linked = linked  # 이미지 경로 → [(진단 ID, 진단명, 신뢰도, details)]
+        self.backfill = backfill
+        self.commit_every = commit_every
+        self.rescores, self.updates, self.embeddings = [], [], []
+        self.written = 0
+        self.changed = Counter()  # (이전 진단명, 새 진단명) → 건수 (달라진 경우만)
+
+    def add(self, path: str, result: dict):
+        records = self.linked.get(path, [])
+        first = records[0] if records else None
+        self.rescores.append({
+            "diagnosis_id": first[0] if first else None,
+            "image_path": path,
+            "model_version": self.version,
+            "diagnosis": result["label"],
+            "confidence": round(result["probability"], 4),
+            "previous_diagnosis": first[1] if first else None,
+            "previous_confidence": first[2] if first else None
+        })
+        for diagnosis_id, previous, _, details in records:
+            if previous != result["label"]:
+                self.changed[(previous, result["label"])] += 1
+            if self.backfill:
+                self.updates.append({
+                    "id": diagnosis_id,
+                    "diagnosis": result["label"],
+                    "confidence": round(result["probability"], 2),
+                    "details": with_model_version(details, self.version)
+                })
+            if result.get("embedding") is not None:
+                self.embeddings.append((diagnosis_id, result["embedding"]))
+        if len(self.rescores) >= self.commit_every:
+            self.flush()
+
+    def flush(self):
+        if not self.rescores:
+            return
+        try:
+            self.db.bulk_insert_mappings(DiagnosisRescore, self.rescores)
+            if self.updates:
+                self.db.bulk_update_mappings(DiagnosisHistory, self.updates)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        # DB에 기록된 뒤에 저장소에 추가 (중단되면 다음 실행에서 같은 이미지를 다시 처리하며 덮어씀)
+        if self.embeddings:
+            ids = [diagnosis_id for diagnosis_id, _ in self.embeddings]
+            vectors = np.stack([np.frombuffer(embedding, dtype=np.float16) for _, embedding in self.embeddings])
+            get_embedding_stores().get(self.version).add_many(ids, vectors)
+        self.written += len(self.rescores)
+        self.rescores, self.updates, self.embeddings = [], [], []
+
+
+def backfill_recorded(db, version: str, linked: dict, commit_every: int) -> int:
+    """
+    이전 실행에서 --backfill 없이 기록된 이 버전의 결과를 연결된 진단 기록에 반영 (이미 반영된 기록은 건너뜀)
+    - 반환: 갱신한 진단 기록 수
+    """
+    updates = []
+    for rescore in db.query(
+        DiagnosisRescore.image_path, DiagnosisRescore.diagnosis, DiagnosisRescore.confidence
+    ).filter(DiagnosisRescore.model_version == version):
+        for diagnosis_id, _, _, details in linked.get(os.path.normpath(rescore.image_path), []):
+            if details == with_model_version(details, version):
+                continue
+            updates.append({
+                "id": diagnosis_id,
+                "diagnosis": rescore.diagnosis,
+                "confidence": round(rescore.confidence, 2),
+                "details": with_model_version(details, version)
+            })
+    for start in range(0, len(updates), commit_every):
+        db.bulk_update_mappings(DiagnosisHistory, updates[start:start + commit_every])
+        db.commit()
+    return len(updates)
+
+
+def main():
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    parser = argparse.ArgumentParser(description="업로드 이미지 일괄 재채점")
+    parser.add_argument("--root", help="진단 기록 대신 이 폴더의 이미지 전체를 재채점 (하위 폴더 포함, 예: uploads/diagnosis)")
+    parser.add_argument("--version", help="사용할 모델 버전 (기본: 레지스트리의 활성 버전)")
+    parser.add_argument("--backfill", action="store_true", help="연결된 진단 기록의 결과를 새 버전으로 갱신")
+    parser.add_argument("--workers", type=int, default=cores, help="디코딩 / 전처리 프로세스 수")
+    parser.add_argument("--threads", type=int, default=cores, help="forward에 쓸 torch 스레드 수")
+    parser.add_argument("--batch-size", type=int, default=8, help="forward 배치 크기")
+    parser.add_argument("--commit-every", type=int, default=256, help="한 트랜잭션에 기록할 이미지 수")
+    parser.add_argument("--limit", type=int, help="이번 실행에서 처리할 최대 이미지 수")
+    parser.add_argument("--report-every", type=float, default=10, help="진행 상황 출력 간격 (초)")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=db_engine, tables=[DiagnosisRescore.__table__])
+    add_image_path_column(db_engine)  # 재채점 결과를 연결할 컬럼 (서버 배포 전 마이그레이션을 건너뛴 경우 대비)
+
+    # 디코딩 프로세스는 모델을 로드하기 전에 띄워 모델 메모리를 복제하지 않음
+    pool = multiprocessing.get_context("fork").Pool(args.workers, initializer=_init_worker)
+    models, info = build_models(args.version, warm_up=False)
+    version = models.version
+    torch.set_num_threads(args.threads)
+
+    db = SessionLocal()
+    try:
+        done = {path for (path,) in db.query(DiagnosisRescore.image_path).filter(DiagnosisRescore.model_version == version)}
+        linked = {}
+        for row in db.query(
+            DiagnosisHistory.id, DiagnosisHistory.image_path, DiagnosisHistory.diagnosis,
+            DiagnosisHistory.confidence, DiagnosisHistory.details
+        ).filter(DiagnosisHistory.image_path.isnot(None)):
+            linked.setdefault(os.path.normpath(row.image_path), []).append(
+                (row.id, row.diagnosis, row.confidence, row.details)
+            )
+
+        candidates = find_images(args.root) if args.root else sorted(linked)
+        paths = (path for path in candidates if path not in done)
+        if args.limit:
+            paths = (path for _, path in zip(range(args.limit), paths))
+        print(f"모델 버전 {version} ({info['runtime']}, {info['precision']}), 이미 처리된 이미지 {len(done)}장 건너뜀, "
+              f"연결된 진단 기록 {sum(len(v) for v in linked.values())}건, 디코딩 {args.workers}프로세스 / "
+              f"torch {args.threads}스레드")
+
+        if args.backfill:
+            print(f"이전 실행 결과로 진단 기록 {backfill_recorded(db, version, linked, args.commit_every)}건 갱신")
+
+        writer = RescoreWriter(db, version, linked, args.backfill, args.commit_every)
+        processed, errors = 0, 0
+        started = last_report = time.perf_counter()
+        stream = decode_stream(pool, paths, max_in_flight=max(1, args.workers) * args.batch_size * 2)
+        for batch in batched(stream, args.batch_size):
+            valid = [item for item in batch if item[3] is None]
+            for path, _, _, error in batch:
+                if error is not None:
+                    errors += 1
+                    print(f"  실패: {path} ({error})")
+            if valid:
+                input_full = torch.from_numpy(np.stack([full for _, full, _, _ in valid]))
+                input_roi = torch.from_numpy(np.stack([roi for _, _, roi, _ in valid]))
+                for (path, _, _, _), result in zip(valid, run_cascade(models.binary, models.disease, input_full, input_roi)):
+                    writer.add(path, result)
+            processed += len(batch)
+
+            now = time.perf_counter()
+            if now - last_report >= args.report_every:
+                last_report = now
+                print(f"  {processed}장 처리 ({processed / (now - started):.1f}장/초), 실패 {errors}장")
+        writer.flush()
+    finally:
+        pool.terminate()
+        db.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"완료: {processed}장 ({elapsed:.1f}초, {processed / elapsed if elapsed else 0:.1f}장/초), "
+          f"기록 {writer.written}장, 실패 {errors}장{', 진단 기록 갱신' if args.backfill else ''}")
+    for (previous, new), count in writer.changed.most_common(10):
+        print(f"  진단 변경 {previous} → {new}: {count}건")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 # app/utils/auth.py
 
 from datetime import datetime, timedelta, timezone
+from typing import Optional
 from jose import JWTError, jwt
 from fastapi.security import OAuth2PasswordBearer
 from fastapi import Depends, HTTPException, status
@@ -19,6 +20,8 @@ ADMIN_EMAILS = [email.strip() for email in os.getenv("ADMIN_EMAILS", "").split("
 
 # OAuth2 토큰 스키마 (로그인 엔드포인트와 일치)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/token")
+# 로그인 없이도 쓸 수 있는 API용 (토큰이 없으면 401 대신 None)
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/token", auto_error=False)
 
 def utcnow():
     return datetime.now(timezone.utc)
@@ -91,6 +94,13 @@ def get_current_user(
 
     return user
 
+def get_optional_user_email(token: Optional[str] = Depends(optional_oauth2_scheme)) -> Optional[str]:
+    """
+    액세스 토큰이 유효하면 사용자 이메일, 없거나 유효하지 않으면 None (DB 조회 없음)
+    """
+    payload = verify_access_token(token) if token else None
+    return payload.get("sub") if payload else None
+
 def get_current_admin_user(
     current_user: User = Depends(get_current_user)
 ) -> User:
@@ -0,0 +1,148 @@
+# app/utils/batching.py
+import asyncio
+from typing import Any, Callable, List, Optional
+
+from app.utils.inference_executor import InferenceExecutor, InferenceQueueFull
+
+
+class MicroBatcher:
+    """
+    동시에 들어온 요청을 모아 하나의 배치로 처리하는 큐
+
+    - 최대 max_batch_size 개까지 모으거나, 가장 오래된 요청이 max_wait_ms 만큼 기다리면 즉시 처리
+    - handler는 입력 리스트를 받아 같은 순서의 결과 리스트를 반환하는 동기 함수
+    - 결과 리스트의 원소가 Exception이면 해당 요청에만 예외를 전달
+    - 대기 요청이 max_queue_size를 넘으면 InferenceQueueFull 발생
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10,
+        max_queue_size: Optional[int] = None,
+        executor: Optional[InferenceExecutor] = None
+    ):
+        self.handler = handler
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.max_queue_size = max_queue_size
+        self.executor = executor
+        # 동시에 실행할 배치 수 (실행기 스레드 수만큼, 기본 1 = 배치를 하나씩 순서대로 처리)
+        self.max_concurrency = executor.max_workers if executor is not None else 1
+        self._pending = []  # (item, future, enqueued_at)
+        self._has_items = None
+        self._full = None
+        self._worker = None
+        self._slots = None
+        self._in_flight = set()
+        self._closing = False
+        self._batches = 0
+        self._items = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _ensure_worker(self):
+        # 이벤트 루프가 생긴 뒤(첫 요청 시점)에 워커 태스크를 시작
+        if self._worker is None or self._worker.done():
+            self._has_items = asyncio.Event()
+            self._full = asyncio.Event()
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, item: Any) -> Any:
+        """요청 하나를 큐에 넣고 배치 처리 결과를 기다림"""
+        if self._closing:
+            raise InferenceQueueFull("서버가 종료 중입니다")
+        if self.max_queue_size is not None and len(self._pending) >= self.max_queue_size:
+            raise InferenceQueueFull("추론 대기열이 가득 찼습니다")
+        self._ensure_worker()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future, loop.time()))
+        self._has_items.set()
+        if len(self._pending) >= self.max_batch_size:
+            self._full.set()
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self._pending:
+                if self._closing:
+                    if self._in_flight:
+                        await asyncio.gather(*self._in_flight)
+                    return
+                self._has_items.clear()
+                await self._has_items.wait()
+                continue
+
+            # 가장 오래된 요청 기준으로 남은 대기 시간만큼만 추가 요청을 기다림
+            timeout = self._pending[0][2] + self.max_wait - loop.time()
+            if len(self._pending) < self.max_batch_size and timeout > 0 and not self._closing:
+                self._full.clear()
+                try:
+                    await asyncio.wait_for(self._full.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+
+            # 동시에 실행 중인 배치 수 제한 (기다리는 동안 들어온 요청은 다음 배치에 합류)
+            await self._slots.acquire()
+
+            batch = self._pending[:self.max_batch_size]
+            self._pending = self._pending[self.max_batch_size:]
+            # 대기 중 연결이 끊긴(취소된) 요청은 제외
+            batch = [entry for entry in batch if not entry[1].done()]
+            if not batch:
+                self._slots.release()
+                continue
+
+            now = loop.time()
+            self._batches += 1
+            self._items += len(batch)
+            for _, _, enqueued_at in batch:
+                self._wait_total += now - enqueued_at
+                self._wait_max = max(self._wait_max, now - enqueued_at)
+
+            task = loop.create_task(self._process(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _process(self, batch):
+        items = [item for item, _, _ in batch]
+        try:
+            if self.executor is not None:
+                results = await self.executor.run(self.handler, items)
+            else:
+                results = await asyncio.get_running_loop().run_in_executor(None, self.handler, items)
+        except Exception as e:
+            results = [e] * len(batch)
+        finally:
+            self._slots.release()
+
+        for (_, future, _), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_queue_size": self.max_queue_size,
+            "queue_depth": len(self._pending),
+            "batches": self._batches,
+            "avg_batch_size": round(self._items / self._batches, 3) if self._batches else 0.0,
+            "avg_wait_ms": round(self._wait_total / self._items * 1000, 3) if self._items else 0.0,
+            "max_wait_ms": round(self._wait_max * 1000, 3),
+        }
+
+    async def close(self):
+        """새 요청을 거절하고 대기 중인 요청을 모두 처리한 뒤 워커를 종료"""
+        self._closing = True
+        if self._worker is not None and not self._worker.done():
+            self._has_items.set()
+            self._full.set()
+            await self._worker
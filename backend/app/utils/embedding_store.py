@@ -0,0 +1,368 @@
+# app/utils/embedding_store.py
+"""
+진단 기록 임베딩 저장소 / 코사인 유사도 검색 (NumPy)
+
+모델 버전마다 디렉터리 하나 (버전이 다르면 임베딩 공간이 달라 섞어서 비교하지 않음)
+    meta.json       {"dim": 256, "ivf": {"nlist": 1000, "rows": 학습 시점 행 수} 또는 null}
+    ids.i64         행 번호 → 진단 기록 ID (삭제된 행은 -1)
+    vectors.f16     (행 수, dim) L2 정규화 float16 → 내적이 곧 코사인 유사도
+    lists.i32       행 번호 → IVF 목록 번호 (IVF 학습 후에만 존재)
+    centroids.npy   IVF 목록 중심 (nlist, dim) float32
+
+- 추가는 파일 끝에 덧붙이고 삭제는 ID를 -1로 덮어쓰므로 재구성 없이 즉시 반영
+- 읽기는 memmap이라 여러 워커가 같은 파일을 공유 (파일 크기로 다른 워커의 추가를 감지)
+- 쓰기는 디렉터리의 lock 파일(flock)으로 직렬화 (학습 중에도 검색은 기존 목록으로 계속 처리)
+- IVF를 학습하기 전에는 전체 행을 청크 단위로 계산 (256차원 기준 2만 행 약 10ms, 20만 행 약 150ms)
+  이후에는 질의와 가까운 nprobe개 목록의 행만 계산 (20만 행 약 5ms, 100만 행 약 20ms)
+- 행 수가 ivf_min_rows에 이르면 추가 시 IVF를 자동 학습하고, 학습 시점의 ivf_retrain_factor배로
+  늘면 다시 학습 (100만 행 학습은 약 8초, 그동안 다른 추가는 대기)
+"""
+import fcntl
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+def _file_size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
+
+
+class EmbeddingStore:
+    """한 모델 버전의 진단 기록 임베딩 (float16 행렬 파일)"""
+
+    def __init__(self, directory, nprobe: int = 16, chunk_rows: int = 65536, ivf_min_rows: int = 20000,
+                 ivf_retrain_factor: float = 2.0):
+        self.directory = Path(directory)
+        self.nprobe = nprobe
+        self.chunk_rows = chunk_rows
+        self.ivf_min_rows = ivf_min_rows  # 행 수가 이 값에 이르면 추가 시 IVF 자동 학습 (0이면 자동 학습 안 함)
+        self.ivf_retrain_factor = ivf_retrain_factor  # 학습 시점 행 수의 이 배수가 되면 다시 학습
+        self.dim = None
+        self._ivf_rows = None  # IVF 학습 시점 행 수 (학습 전에는 None)
+        self._rows = 0
+        self._ids = None  # memmap (행 수,) int64
+        self._vectors = None  # memmap (행 수, dim) float16
+        self._lists = None  # memmap (행 수,) int32, IVF 학습 전에는 None
+        self._centroids = None
+        self._meta_mtime = None
+        self._lock = threading.Lock()
+
+    def _path(self, name: str) -> Path:
+        return self.directory / name
+
+    @contextmanager
+    def _file_lock(self):
+        """다른 워커 / 재채점 스크립트와 쓰기 직렬화"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self._path("lock"), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _write_meta(self, meta: dict):
+        tmp_path = self._path("meta.json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self._path("meta.json"))
+
+    # 파일 → memmap 동기화 (호출자가 self._lock 보유)
+    def _refresh(self):
+        try:
+            mtime = self._path("meta.json").stat().st_mtime_ns
+        except OSError:
+            return  # 아직 임베딩이 하나도 없음
+        if mtime != self._meta_mtime:
+            with open(self._path("meta.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+            self._meta_mtime = mtime
+            self.dim = meta["dim"]
+            self._ivf_rows = meta["ivf"]["rows"] if meta.get("ivf") else None
+            self._centroids = np.load(self._path("centroids.npy")) if meta.get("ivf") else None
+            self._rows = -1  # IVF를 다시 학습하면 lists 파일이 교체되므로 memmap을 새로 열어야 함
+        rows = self._file_rows()
+        if rows != self._rows:
+            self._open(rows)
+
+    def _file_rows(self) -> int:
+        """모든 파일에 온전히 기록된 행 수 (쓰는 중인 마지막 행은 제외)"""
+        sizes = [_file_size(self._path("ids.i64")) // 8, _file_size(self._path("vectors.f16")) // (self.dim * 2)]
+        if self._centroids is not None:
+            sizes.append(_file_size(self._path("lists.i32")) // 4)
+        return min(sizes)
+
+    def _open(self, rows: int):
+        self._rows = rows
+        if rows == 0:
+            self._ids = self._vectors = self._lists = None
+            return
+        self._ids = np.memmap(self._path("ids.i64"), dtype=np.int64, mode="r", shape=(rows,))
+        self._vectors = np.memmap(self._path("vectors.f16"), dtype=np.float16, mode="r", shape=(rows, self.dim))
+        self._lists = (
+            np.memmap(self._path("lists.i32"), dtype=np.int32, mode="r", shape=(rows,))
+            if self._centroids is not None else None
+        )
+
+    def _truncate(self, rows: int):
+        """이전에 중단된 쓰기로 파일 길이가 어긋났으면 온전한 행까지 잘라냄 (호출자가 파일 잠금 보유)"""
+        for name, row_bytes in (("ids.i64", 8), ("vectors.f16", self.dim * 2), ("lists.i32", 4)):
+            path = self._path(name)
+            if _file_size(path) > rows * row_bytes:
+                os.truncate(path, rows * row_bytes)
+
+    def _mark_deleted(self, rows):
+        """행의 ID를 -1로 덮어써 검색에서 제외 (호출자가 파일 잠금 보유)"""
+        with open(self._path("ids.i64"), "r+b") as f:
+            for row in rows:
+                f.seek(int(row) * 8)
+                f.write(np.int64(-1).tobytes())
+
+    # 추가 / 삭제 ----------------------------------------------------
+    def add(self, diagnosis_id: int, embedding):
+        """진단 기록 하나의 임베딩 추가 (embedding: float16 바이트 또는 배열)"""
+        vector = np.frombuffer(embedding, dtype=np.float16) if isinstance(embedding, bytes) else embedding
+        self.add_many([diagnosis_id], np.asarray(vector, dtype=np.float16).reshape(1, -1))
+
+    def add_many(self, diagnosis_ids, vectors: np.ndarray):
+        """
+        여러 기록의 임베딩을 한 번에 덧붙임 (같은 ID가 이미 있으면 이전 행은 삭제 처리)
+        - vectors: (N, dim) L2 정규화된 임베딩
+        """
+        ids = np.asarray(diagnosis_ids, dtype=np.int64)
+        vectors = np.ascontiguousarray(vectors, dtype=np.float16)
+        if len(ids) == 0:
+            return
+        with self._file_lock():
+            with self._lock:
+                self._refresh()
+                if self.dim is None:
+                    self.dim = vectors.shape[1]
+                    self._write_meta({"dim": self.dim, "ivf": None})
+                    self._refresh()
+                if vectors.shape[1] != self.dim:
+                    raise ValueError(f"임베딩 차원이 저장소와 다릅니다 ({vectors.shape[1]} != {self.dim})")
+
+                rows = self._file_rows()
+                self._truncate(rows)
+                if rows:
+                    self._mark_deleted(np.flatnonzero(np.isin(self._ids, ids)))
+
+                # 벡터 → 목록 번호 → ID 순으로 기록 (ID 파일 길이로 행 수를 판단하므로 읽는 쪽은 완성된 행만 봄)
+                with open(self._path("vectors.f16"), "ab") as f:
+                    f.write(vectors.tobytes())
+                if self._centroids is not None:
+                    lists = np.argmax(vectors.astype(np.float32) @ self._centroids.T, axis=1).astype(np.int32)
+                    with open(self._path("lists.i32"), "ab") as f:
+                        f.write(lists.tobytes())
+                with open(self._path("ids.i64"), "ab") as f:
+                    f.write(ids.tobytes())
+                self._open(rows + len(ids))
+
+            if self._needs_ivf():
+                self._build_ivf()
+
+    def _needs_ivf(self) -> bool:
+        """행 수가 자동 학습 기준에 이르렀거나 학습 시점보다 충분히 늘었는지"""
+        if not self.ivf_min_rows or self._rows < self.ivf_min_rows:
+            return False
+        return self._ivf_rows is None or self._rows >= self._ivf_rows * self.ivf_retrain_factor
+
+    def remove(self, diagnosis_id: int) -> int:
+        """진단 기록의 임베딩 삭제 (삭제한 행 수 반환)"""
+        with self._file_lock(), self._lock:
+            self._refresh()
+            if not self._rows:
+                return 0
+            rows = np.flatnonzero(self._ids == diagnosis_id)
+            self._mark_deleted(rows)
+        return len(rows)
+
+    def sample_ids(self, size: int, seed: int = 0) -> List[int]:
+        """삭제되지 않은 진단 기록 ID 중 무작위 표본 (검색 시간 측정용)"""
+        with self._lock:
+            self._refresh()
+            live = self._ids[self._ids >= 0] if self._rows else np.empty(0, dtype=np.int64)
+        rng = np.random.default_rng(seed)
+        return [int(i) for i in rng.choice(live, size=min(size, len(live)), replace=False)]
+
+    # 검색 ----------------------------------------------------------
+    def similar(self, diagnosis_id: int, k: int = 10, candidate_ids=None) -> Optional[List[Tuple[int, float]]]:
+        """진단 기록과 임베딩이 가까운 다른 기록 [(진단 ID, 코사인 유사도)], 임베딩이 없으면 None"""
+        with self._lock:
+            self._refresh()
+            rows = np.flatnonzero(self._ids == diagnosis_id) if self._rows else ()
+            if not len(rows):
+                return None
+            query = self._vectors[rows[-1]].astype(np.float32)
+        return self.search(query, k, exclude_id=diagnosis_id, candidate_ids=candidate_ids)
+
+    def search(self, query: np.ndarray, k: int = 10, exclude_id: Optional[int] = None,
+               candidate_ids=None) -> List[Tuple[int, float]]:
+        """
+        L2 정규화된 질의 벡터와 코사인 유사도가 높은 순으로 최대 k개 [(진단 ID, 유사도)]
+        - candidate_ids: 이 ID들의 행만 비교 (한 사용자의 기록처럼 적은 수라 IVF 없이 전부 계산)
+        """
+        with self._lock:
+            self._refresh()
+            ids, vectors, lists, centroids = self._ids, self._vectors, self._lists, self._centroids
+        if ids is None:
+            return []
+        query = np.asarray(query, dtype=np.float32)
+
+        if candidate_ids is not None:
+            candidates = np.flatnonzero(np.isin(ids, np.asarray(list(candidate_ids), dtype=np.int64)))
+            blocks = (
+                (ids[rows], vectors[rows])
+                for rows in (candidates[i:i + self.chunk_rows] for i in range(0, len(candidates), self.chunk_rows))
+            )
+        elif centroids is not None:
+            # 질의와 가까운 목록의 행만 후보 (행 번호 오름차순이라 memmap을 순서대로 읽음)
+            nprobe = min(self.nprobe, len(centroids))
+            probed = np.zeros(len(centroids), dtype=bool)
+            probed[np.argpartition(-(centroids @ query), nprobe - 1)[:nprobe]] = True
+            candidates = np.flatnonzero(probed[lists])
+            blocks = (
+                (ids[rows], vectors[rows])
+                for rows in (candidates[i:i + self.chunk_rows] for i in range(0, len(candidates), self.chunk_rows))
+            )
+        else:
+            blocks = (
+                (ids[start:start + self.chunk_rows], vectors[start:start + self.chunk_rows])
+                for start in range(0, len(ids), self.chunk_rows)
+            )
+
+        best_ids = np.empty(0, dtype=np.int64)
+        best_scores = np.empty(0, dtype=np.float32)
+        for block_ids, block_vectors in blocks:
+            scores = block_vectors.astype(np.float32) @ query
+            scores[block_ids < 0] = -np.inf
+            if exclude_id is not None:
+                scores[block_ids == exclude_id] = -np.inf
+            if len(scores) > k:
+                top = np.argpartition(-scores, k - 1)[:k]
+                block_ids, scores = block_ids[top], scores[top]
+            best_ids = np.concatenate([best_ids, block_ids])
+            best_scores = np.concatenate([best_scores, scores])
+            if len(best_scores) > k:
+                top = np.argpartition(-best_scores, k - 1)[:k]
+                best_ids, best_scores = best_ids[top], best_scores[top]
+
+        order = np.argsort(-best_scores)
+        return [(int(best_ids[i]), float(best_scores[i])) for i in order if np.isfinite(best_scores[i])]
+
+    # IVF 학습 ------------------------------------------------------
+    def build_ivf(self, nlist: Optional[int] = None, iterations: int = 10, sample_size: Optional[int] = None,
+                  seed: int = 0) -> dict:
+        """
+        IVF 목록 학습: 표본으로 구면 k-means → 모든 행을 가장 가까운 중심의 목록에 배정
+        - nlist 기본값: sqrt(행 수) (100만 행 → 1000개 목록, nprobe 16이면 약 1.6% 행만 계산)
+        - 학습 중에는 추가/삭제가 대기하며, 이후 추가되는 행은 추가 시점에 목록이 배정됨
+        - 검색은 학습 중에도 기존 목록(또는 전체 계산)으로 계속 처리
+        """
+        with self._file_lock():
+            return self._build_ivf(nlist, iterations, sample_size, seed)
+
+    def _build_ivf(self, nlist: Optional[int] = None, iterations: int = 10, sample_size: Optional[int] = None,
+                   seed: int = 0) -> dict:
+        """build_ivf 본체 (호출자가 파일 잠금 보유, 메모리 잠금은 memmap 동기화할 때만 잡음)"""
+        with self._lock:
+            self._refresh()
+            rows, vectors = self._rows, self._vectors
+        if not rows:
+            raise ValueError("임베딩이 없어 IVF를 학습할 수 없습니다")
+        nlist = min(nlist or max(1, int(np.sqrt(rows))), rows)
+        rng = np.random.default_rng(seed)
+        sample_rows = np.sort(rng.choice(rows, size=min(rows, sample_size or nlist * 40), replace=False))
+        sample = vectors[sample_rows].astype(np.float32)
+
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assignments = self._assign(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            counts = np.bincount(assignments, minlength=nlist)
+            empty = counts == 0
+            sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()))]  # 빈 목록은 임의 표본으로 재시작
+            centroids = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+
+        tmp_path = self._path("lists.i32.tmp")
+        with open(tmp_path, "wb") as f:
+            for start in range(0, rows, self.chunk_rows):
+                block = vectors[start:start + self.chunk_rows].astype(np.float32)
+                f.write(self._assign(block, centroids).astype(np.int32).tobytes())
+        with self._lock:
+            self._truncate(rows)
+            os.replace(tmp_path, self._path("lists.i32"))
+            with open(self._path("centroids.npy.tmp"), "wb") as f:
+                np.save(f, centroids.astype(np.float32))
+            os.replace(self._path("centroids.npy.tmp"), self._path("centroids.npy"))
+            self._write_meta({"dim": self.dim, "ivf": {"nlist": nlist, "rows": rows}})
+            self._refresh()
+        return {"rows": rows, "nlist": nlist, "sample": len(sample)}
+
+    @staticmethod
+    def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        return np.argmax(vectors @ centroids.T, axis=1)
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._refresh()
+            live = int((self._ids >= 0).sum()) if self._rows else 0
+            return {
+                "rows": self._rows,
+                "live": live,
+                "dim": self.dim,
+                "ivf_nlist": len(self._centroids) if self._centroids is not None else None,
+                "nprobe": self.nprobe,
+                "bytes": self._rows * (self.dim or 0) * 2
+            }
+
+
+class EmbeddingStores:
+    """모델 버전별 EmbeddingStore (root/<버전>/)"""
+
+    def __init__(self, root, **options):
+        self.root = Path(root)
+        self.options = options
+        self._stores = {}
+        self._lock = threading.Lock()
+
+    def get(self, version: str) -> EmbeddingStore:
+        with self._lock:
+            store = self._stores.get(version)
+            if store is None:
+                store = self._stores[version] = EmbeddingStore(self.root / version, **self.options)
+            return store
+
+    def versions(self) -> List[str]:
+        if not self.root.is_dir():
+            return []
+        return sorted(p.name for p in self.root.iterdir() if (p / "meta.json").exists())
+
+    def similar(self, diagnosis_id: int, k: int = 10, prefer: Optional[str] = None, candidate_ids=None):
+        """
+        진단 기록의 임베딩이 있는 저장소에서 유사 기록 검색 → (버전, [(진단 ID, 유사도)]), 없으면 None
+        - 재채점으로 여러 버전에 임베딩이 있으면 prefer(서비스 중인 버전)를 우선
+        - candidate_ids가 있으면 그 기록들 중에서만 검색
+        """
+        versions = self.versions()
+        if prefer in versions:
+            versions.remove(prefer)
+            versions.insert(0, prefer)
+        for version in versions:
+            matches = self.get(version).similar(diagnosis_id, k, candidate_ids)
+            if matches is not None:
+                return version, matches
+        return None
+
+    def remove(self, diagnosis_id: int) -> int:
+        return sum(self.get(version).remove(diagnosis_id) for version in self.versions())
@@ -0,0 +1,87 @@
+# app/utils/fast_transform.py
+import threading
+from contextlib import contextmanager
+from typing import List, Sequence
+
+import cv2
+import numpy as np
+import torch
+
+IMAGENET_MEAN = (0.485, 0.456, 0.406)
+IMAGENET_STD = (0.229, 0.224, 0.225)
+
+
+class FusedTransform:
+    """
+    Resize → Normalize → HWC→CHW 변환을 미리 할당된 텐서에 직접 기록
+    - albumentations Resize + Normalize + ToTensorV2 와 같은 결과 (오차 ~1e-6)
+    - 리사이즈 결과(uint8)는 스레드별 버퍼를 재사용하고, 정규화는 out 텐서에 바로 기록해 중간 float 배열이 없음
+    """
+
+    def __init__(self, size: int, mean: Sequence[float] = IMAGENET_MEAN, std: Sequence[float] = IMAGENET_STD):
+        self.size = size
+        mean = np.asarray(mean, dtype=np.float64)
+        std = np.asarray(std, dtype=np.float64)
+        # (x / 255 - mean) / std = x * scale + bias
+        self.scale = torch.tensor(1 / (255 * std), dtype=torch.float32).view(3, 1, 1)
+        self.bias = torch.tensor(-mean / std, dtype=torch.float32).view(3, 1, 1)
+        self._local = threading.local()
+
+    def _resize_buffer(self) -> np.ndarray:
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            buffer = self._local.buffer = np.empty((self.size, self.size, 3), dtype=np.uint8)
+        return buffer
+
+    def __call__(self, image: np.ndarray, out: torch.Tensor = None) -> torch.Tensor:
+        """HxWx3 uint8 배열 → out (3, size, size) float32 텐서"""
+        if out is None:
+            out = torch.empty(3, self.size, self.size)
+        resized = self._resize_buffer()
+        cv2.resize(image, (self.size, self.size), dst=resized, interpolation=cv2.INTER_LINEAR)
+        # uint8 → float 변환은 out에 바로 복사, 정규화는 out 위에서 제자리 연산 (임시 텐서 없음)
+        out.copy_(torch.from_numpy(resized).permute(2, 0, 1))
+        torch.addcmul(self.bias, out, self.scale, out=out)
+        return out
+
+
+def compact_rows(tensors: Sequence[torch.Tensor], indices: List[int]) -> int:
+    """오름차순 indices의 행들을 앞쪽(0..k-1)으로 제자리 이동하고 k 반환 (새 텐서를 만들지 않음)"""
+    for dst, src in enumerate(indices):
+        if dst != src:
+            for tensor in tensors:
+                tensor[dst].copy_(tensor[src])
+    return len(indices)
+
+
+class InputBufferPool:
+    """
+    (전체 이미지, ROI) 배치 입력 버퍼 재사용 풀
+    - 버퍼는 동시에 처리 중인 배치 수만큼만 만들어지고 이후 계속 재사용
+    - capacity보다 큰 배치는 일회용 버퍼를 할당
+    """
+
+    def __init__(self, capacity: int, size: int):
+        self.capacity = capacity
+        self.size = size
+        self._free = []
+        self._lock = threading.Lock()
+
+    def _allocate(self, n: int):
+        shape = (n, 3, self.size, self.size)
+        return torch.empty(shape), torch.empty(shape)
+
+    @contextmanager
+    def acquire(self, n: int):
+        if n > self.capacity:
+            yield self._allocate(n)
+            return
+        with self._lock:
+            buffers = self._free.pop() if self._free else None
+        if buffers is None:
+            buffers = self._allocate(self.capacity)
+        try:
+            yield buffers
+        finally:
+            with self._lock:
+                self._free.append(buffers)
@@ -0,0 +1,91 @@
+# app/utils/image_quality.py
+from typing import Tuple
+
+import cv2
+import numpy as np
+
+
+class ImageQualityError(ValueError):
+    """
+    품질 사전 검사 실패
+    - check: resolution | dark | overexposed | blur | content
+    - metrics: 측정값 (클라이언트에 재촬영 안내용으로 그대로 전달)
+    """
+
+    def __init__(self, check: str, message: str, metrics: dict):
+        super().__init__(message)
+        self.check = check
+        self.metrics = metrics
+
+    def to_result(self) -> dict:
+        """예측 결과 자리에 담는 거절 결과 (추론 풀을 거쳐도 그대로 전달되도록 dict)"""
+        return {"rejected": self.check, "message": str(self), "quality": self.metrics}
+
+
+class QualityGate:
+    """
+    모델 실행 전 이미지 품질 사전 검사 (ROI 검출용 썸네일을 재사용해 수 ms 이내)
+
+    - resolution: 원본 짧은 변 (px)
+    - dark / overexposed: 평균 밝기(0~255)와 검게/하얗게 뭉개진 픽셀 비율
+    - blur: 회색조 Laplacian 분산 (초점이 맞지 않으면 고주파 성분이 사라져 작아짐)
+    - content: 피부색(YCrCb) 또는 털 색(무채색 / 갈색 계열) 픽셀 비율
+      (스크린샷, 문서, 풍경처럼 피부/털이 거의 없는 사진을 거르는 경험적 기준)
+    어두운 사진은 Laplacian 분산도 작으므로 노출을 흐림보다 먼저 확인
+    """
+
+    def __init__(self, min_side: int = 224, min_sharpness: float = 20.0, min_brightness: float = 40.0,
+                 max_brightness: float = 240.0, max_clipped_ratio: float = 0.5, min_skin_ratio: float = 0.25):
+        self.min_side = min_side
+        self.min_sharpness = min_sharpness
+        self.min_brightness = min_brightness
+        self.max_brightness = max_brightness
+        self.max_clipped_ratio = max_clipped_ratio
+        self.min_skin_ratio = min_skin_ratio
+
+    @staticmethod
+    def measure(thumbnail: np.ndarray) -> dict:
+        """RGB 썸네일 → 밝기 / 뭉개진 픽셀 비율 / 선명도 / 피부·털 비율"""
+        gray = cv2.cvtColor(thumbnail, cv2.COLOR_RGB2GRAY)
+        pixels = gray.size
+        histogram = cv2.calcHist([gray], [0], None, [256], [0, 256]).ravel()
+        brightness = float(np.dot(histogram, np.arange(256)) / pixels)
+
+        hsv = cv2.cvtColor(thumbnail, cv2.COLOR_RGB2HSV)
+        ycrcb = cv2.cvtColor(thumbnail, cv2.COLOR_RGB2YCrCb)
+        skin = cv2.inRange(ycrcb, (0, 133, 77), (255, 173, 127))
+        gray_fur = cv2.inRange(hsv, (0, 0, 30), (180, 64, 245))  # 흰색/회색/검은색 털 (종이처럼 새하얀 배경 제외)
+        brown_fur = cv2.inRange(hsv, (0, 40, 30), (25, 255, 245)) | cv2.inRange(hsv, (165, 40, 30), (180, 255, 245))
+        content = cv2.countNonZero(skin | gray_fur | brown_fur)
+
+        return {
+            "brightness": round(brightness, 1),
+            "dark_ratio": round(float(histogram[:17].sum() / pixels), 4),
+            "bright_ratio": round(float(histogram[240:].sum() / pixels), 4),
+            "sharpness": round(float(cv2.Laplacian(gray, cv2.CV_32F).var()), 1),
+            "skin_ratio": round(content / pixels, 4)
+        }
+
+    def check(self, thumbnail: np.ndarray, original_size: Tuple[int, int]) -> dict:
+        """기준을 통과하면 측정값 반환, 처음 실패한 항목에서 ImageQualityError"""
+        width, height = original_size
+        metrics = {"width": width, "height": height}
+        if min(width, height) < self.min_side:
+            raise ImageQualityError(
+                "resolution", f"이미지 해상도가 너무 낮습니다 ({width}x{height}, 짧은 변 최소 {self.min_side}px)", metrics
+            )
+
+        metrics.update(self.measure(thumbnail))
+        if metrics["brightness"] < self.min_brightness or metrics["dark_ratio"] > self.max_clipped_ratio:
+            raise ImageQualityError("dark", "사진이 너무 어둡습니다. 밝은 곳에서 다시 촬영해주세요", metrics)
+        if metrics["brightness"] > self.max_brightness or metrics["bright_ratio"] > self.max_clipped_ratio:
+            raise ImageQualityError(
+                "overexposed", "사진이 너무 밝거나 빛이 반사되었습니다. 직사광선이나 플래시를 피해 다시 촬영해주세요", metrics
+            )
+        if metrics["sharpness"] < self.min_sharpness:
+            raise ImageQualityError("blur", "사진이 흐립니다. 초점을 맞춰 다시 촬영해주세요", metrics)
+        if metrics["skin_ratio"] < self.min_skin_ratio:
+            raise ImageQualityError(
+                "content", "피부나 털이 보이지 않습니다. 병변 부위를 가까이에서 다시 촬영해주세요", metrics
+            )
+        return metrics
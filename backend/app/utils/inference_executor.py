@@ -0,0 +1,91 @@
+# app/utils/inference_executor.py
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class InferenceQueueFull(Exception):
+    """추론 대기열이 가득 차서 요청을 받을 수 없는 경우"""
+
+
+class InferenceExecutor:
+    """
+    모델 추론 전용 스레드 풀 (이벤트 루프를 막지 않도록 블로킹 연산을 위임)
+
+    - 실행 대기 작업 수가 max_queue를 넘으면 InferenceQueueFull 발생 (백프레셔)
+    - 대기열 길이, 대기 시간 통계를 stats()로 제공
+    """
+
+    def __init__(self, max_workers: int = 1, max_queue: int = 64):
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self._executor = None
+        self._lock = threading.Lock()
+        self._closed = False
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="inference")
+        return self._executor
+
+    async def run(self, fn, *args):
+        """fn(*args)를 추론 스레드에서 실행하고 결과를 기다림"""
+        with self._lock:
+            if self._closed or self._queued >= self.max_queue:
+                self._rejected += 1
+                raise InferenceQueueFull("추론 대기열이 가득 찼습니다")
+            self._queued += 1
+        enqueued_at = time.perf_counter()
+
+        def task():
+            waited = time.perf_counter() - enqueued_at
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+
+        future = self._get_executor().submit(task)
+
+        def on_done(f):
+            # 시작 전에 취소된 작업은 대기열 카운트를 직접 정리
+            if f.cancelled():
+                with self._lock:
+                    self._queued -= 1
+
+        future.add_done_callback(on_done)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> dict:
+        with self._lock:
+            started = self._completed + self._running
+            return {
+                "workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "queue_depth": self._queued,
+                "running": self._running,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "avg_wait_ms": round(self._wait_total / started * 1000, 3) if started else 0.0,
+                "max_wait_ms": round(self._wait_max * 1000, 3),
+            }
+
+    async def shutdown(self):
+        """새 작업을 거절하고 실행 중/대기 중인 작업이 끝날 때까지 기다림"""
+        with self._lock:
+            self._closed = True
+        if self._executor is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown, True)
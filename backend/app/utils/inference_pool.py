@@ -0,0 +1,178 @@
+# app/utils/inference_pool.py
+"""
+다중 프로세스 추론 풀
+
+- 서버: 부모 프로세스가 모델을 한 번 로드(mmap)한 뒤 fork → 워커마다 서로 겹치지 않는 CPU 코어에 고정
+  (가중치는 copy-on-write / 파일 매핑 페이지로 공유되어 워커 수가 늘어도 메모리가 거의 늘지 않음)
+- 워커들은 같은 소켓(Unix 소켓 또는 localhost TCP)에서 accept → 놀고 있는 워커가 다음 연결을 가져가므로 별도 분배기가 필요 없음
+- 클라이언트(API 워커): 요청마다 연결을 열어 이미지 바이트 묶음을 보내고 결과를 받음 (ML 패키지 불필요)
+"""
+import io
+import os
+import signal
+from multiprocessing import get_context
+from multiprocessing.connection import Client, Listener
+from typing import List, Optional
+
+
+def _read_rss_mb() -> dict:
+    """현재 프로세스 메모리 사용량 (RssAnon: 프로세스 전용, RssFile: 파일 매핑/공유 페이지)"""
+    usage = {}
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("VmRSS", "RssAnon", "RssFile"):
+                    usage[key] = round(int(value.split()[0]) / 1024, 1)
+    except OSError:
+        pass
+    return usage
+
+
+def parse_address(address: str):
+    """"tcp://호스트:포트" → ((호스트, 포트), "AF_INET"), 그 외에는 Unix 소켓 경로 → (경로, "AF_UNIX")"""
+    if address.startswith("tcp://"):
+        host, _, port = address[len("tcp://"):].rpartition(":")
+        return (host or "127.0.0.1", int(port)), "AF_INET"
+    return address, "AF_UNIX"
+
+
+def split_cores(workers: int) -> List[List[int]]:
+    """사용 가능한 CPU 코어를 워커 수만큼 서로 겹치지 않는 연속 구간으로 분할"""
+    if hasattr(os, "sched_getaffinity"):
+        cores = sorted(os.sched_getaffinity(0))
+    else:
+        cores = list(range(os.cpu_count() or 1))
+    workers = max(1, min(workers, len(cores)))
+    size, extra = divmod(len(cores), workers)
+    groups, start = [], 0
+    for i in range(workers):
+        end = start + size + (1 if i < extra else 0)
+        groups.append(cores[start:end])
+        start = end
+    return groups
+
+
+# ------------------- 서버 (추론 프로세스) -------------------
+def _handle_request(request: dict, worker_id: int, cores: List[int]) -> dict:
+    from app.inference import engine
+
+    op = request.get("op")
+    if op == "predict":
+        outputs = engine.hierarchical_predict_batch(
+            [io.BytesIO(data) for data in request["images"]], request.get("rois")
+        )
+        results = [{"error": str(r)} if isinstance(r, Exception) else r for r in outputs]
+        return {"results": results, "model_key": engine.get_model_key()}
+    if op == "status":
+        return {
+            "worker": worker_id,
+            "pid": os.getpid(),
+            "cores": cores,
+            "model_key": engine.get_model_key(),
+            "models": engine.model_state,
+            "memory_mb": _read_rss_mb()
+        }
+    return {"error": f"알 수 없는 요청입니다: {op}"}
+
+
+def _worker_main(listener: Listener, cores: List[int], worker_id: int):
+    import torch
+    from app.inference import engine
+
+    # 할당된 코어에만 스케줄링되도록 고정하고 intra-op 스레드 수를 코어 수에 맞춤
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+    torch.set_num_threads(len(cores))
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    engine.active_models.binary.warm_up()
+    engine.active_models.disease.warm_up()
+    print(f"추론 워커 {worker_id} 준비 완료 (pid={os.getpid()}, cores={cores})")
+
+    while True:
+        try:
+            conn = listener.accept()
+        except Exception as e:
+            print(f"추론 워커 {worker_id} 연결 수락 실패: {e}")
+            continue
+        with conn:
+            try:
+                request = conn.recv()
+                conn.send(_handle_request(request, worker_id, cores))
+            except EOFError:
+                continue
+            except Exception as e:
+                try:
+                    conn.send({"error": str(e)})
+                except Exception:
+                    pass
+
+
+def serve(address: str, workers: int, authkey: Optional[bytes] = None):
+    """모델을 한 번 로드한 뒤 워커 프로세스를 fork하고 종료 신호가 올 때까지 대기"""
+    from app.inference import engine
+
+    engine.load_models(warm_up=False)
+
+    address, family = parse_address(address)
+    if family == "AF_UNIX":
+        if os.path.exists(address):
+            os.unlink(address)
+        listener = Listener(address, family=family, authkey=authkey)
+        os.chmod(address, 0o600)  # 같은 사용자(API 프로세스)만 접근 가능
+    else:
+        if authkey is None:
+            print("경고: INFERENCE_POOL_AUTHKEY 없이 TCP로 추론 풀을 엽니다 (localhost에만 바인딩하세요)")
+        listener = Listener(address, family=family, authkey=authkey)
+
+    ctx = get_context("fork")
+    processes = []
+    for worker_id, cores in enumerate(split_cores(workers)):
+        process = ctx.Process(target=_worker_main, args=(listener, cores, worker_id), daemon=True)
+        process.start()
+        processes.append(process)
+
+    def stop(signum, frame):
+        raise SystemExit(0)
+
+    signal.signal(signal.SIGTERM, stop)
+    try:
+        for process in processes:
+            process.join()
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        listener.close()
+        if family == "AF_UNIX" and os.path.exists(address):
+            os.unlink(address)
+
+
+# ------------------- 클라이언트 (API 워커) -------------------
+class InferencePoolClient:
+    """추론 풀에 요청을 보내는 클라이언트 (요청마다 연결 → 놀고 있는 워커가 처리)"""
+
+    def __init__(self, address: str, authkey: Optional[bytes] = None):
+        self.address, self.family = parse_address(address)
+        self.authkey = authkey
+
+    def _request(self, message: dict) -> dict:
+        with Client(self.address, family=self.family, authkey=self.authkey) as conn:
+            conn.send(message)
+            response = conn.recv()
+        if "error" in response:
+            raise RuntimeError(f"추론 풀 오류: {response['error']}")
+        return response
+
+    def predict_batch(self, images: List[bytes], rois: Optional[List[Optional[tuple]]] = None):
+        """
+        이미지 바이트 리스트 → (입력 순서대로의 결과 리스트, 모델 식별자), 실패한 이미지는 RuntimeError
+        - rois: 이미지별 ROI 박스 (x1, y1, x2, y2) 또는 None
+        """
+        response = self._request({"op": "predict", "images": images, "rois": rois})
+        results = [RuntimeError(r["error"]) if "error" in r else r for r in response["results"]]
+        return results, response["model_key"]
+
+    def status(self) -> dict:
+        return self._request({"op": "status"})
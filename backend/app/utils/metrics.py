@@ -0,0 +1,177 @@
+# app/utils/metrics.py
+"""
+Prometheus 텍스트 형식(0.0.4) 지표 (외부 라이브러리 없이 /metrics 노출용)
+
+- Counter / Histogram: 코드에서 직접 증가·기록
+- CallbackMetric: 스크랩 시점에 함수를 호출해 값을 읽음 (대기열 길이, 캐시 적중 수 등 이미 집계 중인 값)
+- registry.timing_enabled가 False면 Histogram.time()은 아무것도 측정하지 않음
+"""
+import bisect
+import threading
+import time
+from contextlib import nullcontext
+from typing import Callable, Dict, Sequence, Tuple
+
+# 초 단위 (1ms ~ 10s)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Tuple[str, str] = None) -> str:
+    pairs = list(zip(names, values))
+    if extra is not None:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Timer:
+    # @contextmanager보다 진입/종료 비용이 작아 요청마다 여러 번 써도 부담이 없음
+    __slots__ = ("histogram", "labelvalues", "started")
+
+    def __init__(self, histogram: "Histogram", labelvalues: tuple):
+        self.histogram = histogram
+        self.labelvalues = labelvalues
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, *self.labelvalues)
+        return False
+
+
+_NULL_TIMER = nullcontext()
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues, amount: float = 1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def collect(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            values = dict(self._values)
+        for labelvalues, value in values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}"
+
+
+class Histogram:
+    def __init__(self, registry: "MetricsRegistry", name: str, documentation: str,
+                 labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[tuple, list] = {}  # labelvalues → [버킷별 개수..., 합계, 개수]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def time(self, *labelvalues):
+        """with 블록의 실행 시간을 기록 (registry.timing_enabled가 False면 측정 생략)"""
+        if not self.registry.timing_enabled:
+            return _NULL_TIMER
+        return _Timer(self, labelvalues)
+
+    def collect(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            series = {labelvalues: list(values) for labelvalues, values in self._series.items()}
+        for labelvalues, values in series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), values):
+                cumulative += count
+                labels = _format_labels(self.labelnames, labelvalues, ("le", _format_value(bound)))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, labelvalues)
+            yield f"{self.name}_sum{labels} {_format_value(values[-2])}"
+            yield f"{self.name}_count{labels} {values[-1]}"
+
+
+class CallbackMetric:
+    """
+    스크랩할 때 fn()으로 값을 읽는 지표
+    - labelnames가 없으면 fn()은 숫자, 있으면 {라벨 값 튜플: 숫자} 딕셔너리를 반환
+    """
+
+    def __init__(self, name: str, documentation: str, metric_type: str, fn: Callable,
+                 labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.metric_type = metric_type
+        self.fn = fn
+        self.labelnames = tuple(labelnames)
+
+    def collect(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.metric_type}"
+        values = self.fn()
+        if not self.labelnames:
+            values = {(): values}
+        for labelvalues, value in values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}"
+
+
+class MetricsRegistry:
+    def __init__(self, timing_enabled: bool = True):
+        self.timing_enabled = timing_enabled
+        self._metrics = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(self, name, documentation, labelnames, buckets))
+
+    def gauge_callback(self, name: str, documentation: str, fn: Callable, labelnames: Sequence[str] = ()):
+        return self._register(CallbackMetric(name, documentation, "gauge", fn, labelnames))
+
+    def counter_callback(self, name: str, documentation: str, fn: Callable, labelnames: Sequence[str] = ()):
+        return self._register(CallbackMetric(name, documentation, "counter", fn, labelnames))
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            try:
+                lines.extend(metric.collect())
+            except Exception as e:
+                lines.append(f"# {metric.name} 수집 실패: {e}")
+        return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+registry = MetricsRegistry()
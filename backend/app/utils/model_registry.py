@@ -0,0 +1,132 @@
+# app/utils/model_registry.py
+"""
+버전별 모델 체크포인트 관리 (app/models/registry.json)
+
+    {
+      "active": "2025-07-01",
+      "versions": {
+        "2025-07-01": {
+          "binary": "versions/2025-07-01/binary_best.pth",
+          "disease": "versions/2025-07-01/disease_best.pth",
+          "registered_at": "...", "note": "..."
+        }
+      }
+    }
+
+- 경로는 모델 폴더 기준 상대 경로
+- 매니페스트가 없으면 기존 binary_best.pth / disease_best.pth를 "default" 버전으로 취급
+- 매니페스트는 임시 파일에 쓴 뒤 교체하므로 읽는 쪽(다른 워커)이 중간 상태를 보지 않음
+"""
+import json
+import os
+import re
+import shutil
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+DEFAULT_VERSION = "default"
+CHECKPOINT_NAMES = {"binary": "binary_best.pth", "disease": "disease_best.pth"}
+EXPORT_SUFFIXES = (".ts", ".onnx")  # 체크포인트 옆에 있으면 함께 복사하는 export 아티팩트
+_VERSION_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]{0,63}$")
+
+
+class ModelRegistry:
+    def __init__(self, model_dir, manifest_name: str = "registry.json"):
+        self.model_dir = Path(model_dir)
+        self.manifest_path = self.model_dir / manifest_name
+        self._lock = threading.Lock()
+
+    def _read(self) -> dict:
+        if not self.manifest_path.exists():
+            return {"active": DEFAULT_VERSION, "versions": {DEFAULT_VERSION: dict(CHECKPOINT_NAMES)}}
+        with open(self.manifest_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write(self, manifest: dict):
+        tmp_path = self.manifest_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def manifest(self) -> dict:
+        return self._read()
+
+    def active_version(self) -> str:
+        return self._read()["active"]
+
+    def manifest_mtime(self) -> Optional[int]:
+        """매니페스트 수정 시각 (변경 감지용, 없으면 None)"""
+        try:
+            return os.stat(self.manifest_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def resolve(self, version: Optional[str] = None) -> Tuple[str, Dict[str, str]]:
+        """(버전, {"binary": 절대 경로, "disease": 절대 경로}) - version을 생략하면 활성 버전"""
+        manifest = self._read()
+        version = version or manifest["active"]
+        entry = manifest["versions"].get(version)
+        if entry is None:
+            raise ValueError(f"등록되지 않은 모델 버전입니다: {version}")
+        paths = {}
+        for name in CHECKPOINT_NAMES:
+            path = self.model_dir / entry[name]
+            if not path.exists():
+                raise FileNotFoundError(f"Model file not found: {path}")
+            paths[name] = str(path)
+        return version, paths
+
+    def register(self, version: str, binary_path: str, disease_path: str,
+                 note: Optional[str] = None, activate: bool = False) -> dict:
+        """체크포인트(+ 같은 이름의 export 아티팩트)를 versions/<버전>/ 아래로 복사하고 매니페스트에 등록"""
+        if not _VERSION_PATTERN.match(version):
+            raise ValueError("버전 이름은 영문/숫자/._- 조합 64자 이하만 사용할 수 있습니다")
+        with self._lock:
+            manifest = self._read()
+            if version in manifest["versions"]:
+                raise ValueError(f"이미 등록된 모델 버전입니다: {version}")
+            target_dir = self.model_dir / "versions" / version
+            target_dir.mkdir(parents=True, exist_ok=True)
+            entry = {}
+            for name, source in (("binary", binary_path), ("disease", disease_path)):
+                target = target_dir / CHECKPOINT_NAMES[name]
+                shutil.copyfile(source, target)
+                for suffix in EXPORT_SUFFIXES:
+                    artifact = Path(source).with_suffix(suffix)
+                    if artifact.exists():
+                        shutil.copyfile(artifact, target.with_suffix(suffix))
+                entry[name] = str(target.relative_to(self.model_dir))
+            entry.update(registered_at=datetime.now().isoformat(), note=note)
+            manifest["versions"][version] = entry
+            if activate:
+                manifest["active"] = version
+            self._write(manifest)
+            return entry
+
+    def activate(self, version: str):
+        """활성 버전 변경 (다음 로드/재로드부터 적용)"""
+        with self._lock:
+            manifest = self._read()
+            if version not in manifest["versions"]:
+                raise ValueError(f"등록되지 않은 모델 버전입니다: {version}")
+            if manifest["active"] != version:
+                manifest["active"] = version
+                self._write(manifest)
+
+
+MODEL_VERSION_PREFIX = "AI 모델 버전: "
+
+
+def format_model_version(version: Optional[str]) -> str:
+    """진단 기록(details)에 남기는 모델 버전 문구"""
+    return f"{MODEL_VERSION_PREFIX}{version or '알 수 없음'}"
+
+
+def with_model_version(details: Optional[str], version: Optional[str]) -> Optional[str]:
+    """details의 모델 버전 문구를 version으로 맞춤 (없으면 덧붙이고, 재채점 등으로 버전이 바뀌었으면 교체)"""
+    if not version:
+        return details
+    lines = [line for line in (details or "").splitlines() if not line.startswith(MODEL_VERSION_PREFIX)]
+    return "\n".join(lines + [format_model_version(version)])
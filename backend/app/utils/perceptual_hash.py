@@ -0,0 +1,148 @@
+# app/utils/perceptual_hash.py
+"""
+지각 해시(dHash) 기반 유사 업로드 검출
+
+- 같은 병변을 두 번 찍었거나 같은 사진을 다시 압축한 업로드는 바이트 해시(SHA-256)는 달라도
+  dHash의 해밍 거리가 작음 → 최근 결과를 재사용해 모델 실행 생략
+- PIL만 사용하므로 추론 풀 모드의 API 프로세스(ML 패키지 없음)에서도 계산 가능
+"""
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Optional, Tuple
+
+from PIL import Image
+
+HASH_SIZE = 8  # 가로/세로 방향 각각 8x8 비교 → 128비트
+
+
+def dhash(content: bytes, hash_size: int = HASH_SIZE) -> int:
+    """
+    이미지 바이트 → 128비트 dHash (가로 인접 픽셀 비교 64비트 + 세로 인접 픽셀 비교 64비트)
+    - JPEG는 축소 모드로 디코딩해 수 ms 안에 계산
+    """
+    image = Image.open(io.BytesIO(content))
+    image.draft("L", (hash_size * 8, hash_size * 8))
+    side = hash_size + 1
+    pixels = list(image.convert("L").resize((side, side), Image.BOX).getdata())
+
+    value = 0
+    for y in range(hash_size):
+        for x in range(hash_size):
+            value = (value << 1) | (pixels[y * side + x] < pixels[y * side + x + 1])
+    for y in range(hash_size):
+        for x in range(hash_size):
+            value = (value << 1) | (pixels[y * side + x] < pixels[(y + 1) * side + x])
+    return value
+
+
+class PerceptualHashIndex:
+    """
+    사용자별 최근 업로드의 dHash → 예측 결과 (메모리 보관 + JSON 파일로 영속화)
+
+    - 사용자당 최근 max_per_user개, window_seconds 이내 업로드만 해밍 거리로 비교
+      (사용자별 목록이 작아 선형 탐색이 가장 빠름, 비교 한 번은 int.bit_count 한 번)
+    - model_key나 ROI 박스가 다른 결과는 재사용하지 않음
+    - 사용자 수가 max_users를 넘으면 가장 오래 업로드가 없던 사용자부터 삭제
+    """
+
+    def __init__(self, path, max_distance: int = 10, window_seconds: float = 3600,
+                 max_per_user: int = 20, max_users: int = 10000):
+        self.path = Path(path)
+        self.max_distance = max_distance
+        self.window = window_seconds
+        self.max_per_user = max_per_user
+        self.max_users = max_users
+        self._users = OrderedDict()  # user_key → deque[(해시, model_key, roi_box, 등록 시각, 결과)]
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+
+    def find(self, user_key: str, phash: int, model_key: str, roi_box=None) -> Optional[Tuple[dict, int]]:
+        """거리 max_distance 이내의 가장 가까운 최근 업로드 → (결과, 해밍 거리), 없으면 None"""
+        now = time.time()
+        roi_box = list(roi_box) if roi_box is not None else None
+        best = None
+        with self._lock:
+            for entry_hash, entry_model, entry_roi, created_at, result in self._users.get(user_key, ()):
+                if entry_model != model_key or entry_roi != roi_box or created_at + self.window < now:
+                    continue
+                distance = (entry_hash ^ phash).bit_count()
+                if distance <= self.max_distance and (best is None or distance < best[1]):
+                    best = (result, distance)
+            if best is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return best
+
+    def add(self, user_key: str, phash: int, model_key: str, result: dict, roi_box=None):
+        roi_box = list(roi_box) if roi_box is not None else None
+        with self._lock:
+            entries = self._users.get(user_key)
+            if entries is None:
+                entries = self._users[user_key] = deque(maxlen=self.max_per_user)
+            self._users.move_to_end(user_key)
+            entries.append((phash, model_key, roi_box, time.time(), result))
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+            self._dirty = True
+
+    def load(self):
+        """파일에서 복원 (없거나 손상되었으면 빈 인덱스로 시작, 기간이 지난 항목은 버림)"""
+        cutoff = time.time() - self.window
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            users = OrderedDict()
+            for user_key, entries in data["users"].items():
+                kept = [(int(h, 16), m, roi, float(t), r) for h, m, roi, t, r in entries if float(t) >= cutoff]
+                if kept:
+                    users[user_key] = deque(kept, maxlen=self.max_per_user)
+        except (OSError, ValueError, TypeError, KeyError, AttributeError):
+            return  # 형식이 다른 파일도 손상된 것으로 보고 일부만 복원하지 않음
+        with self._lock:
+            self._users.update(users)
+
+    def save(self, force: bool = False):
+        """변경 사항이 있으면 고유한 임시 파일에 쓴 뒤 교체 (읽는 쪽이 중간 상태를 보지 않음)"""
+        with self._lock:
+            if not (self._dirty or force):
+                return
+            cutoff = time.time() - self.window
+            data = {"users": {
+                user_key: [[format(h, "x"), m, roi, t, r] for h, m, roi, t, r in entries if t >= cutoff]
+                for user_key, entries in self._users.items()
+            }}
+            self._dirty = False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # 워커마다 다른 임시 파일에 써야 동시에 저장해도 서로의 파일을 덮어쓰지 않음
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=self.path.parent, prefix=self.path.name + ".",
+                                         suffix=".tmp", delete=False) as f:
+            tmp_path = f.name
+            try:
+                json.dump(data, f, ensure_ascii=False, default=float)
+            except BaseException:
+                f.close()
+                os.remove(tmp_path)
+                raise
+        os.replace(tmp_path, self.path)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "users": len(self._users),
+                "entries": sum(len(entries) for entries in self._users.values()),
+                "max_distance": self.max_distance,
+                "window_seconds": self.window,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
@@ -0,0 +1,54 @@
+# app/utils/precision.py
+import copy
+from contextlib import nullcontext
+from pathlib import Path
+from typing import List, Tuple
+
+import torch
+import torch.nn as nn
+
+# fp32: 기본, int8: Linear 레이어 동적 양자화, bf16: bfloat16 autocast
+PRECISION_MODES = ("fp32", "int8", "bf16")
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".bmp"}
+
+
+def validate_precision(mode: str, device: torch.device) -> str:
+    mode = (mode or "fp32").lower()
+    if mode not in PRECISION_MODES:
+        raise ValueError(f"지원하지 않는 정밀도 모드입니다: {mode} (사용 가능: {', '.join(PRECISION_MODES)})")
+    if mode == "int8" and device.type != "cpu":
+        raise ValueError("int8 동적 양자화는 CPU에서만 사용할 수 있습니다")
+    return mode
+
+
+def convert_model(model: nn.Module, mode: str) -> nn.Module:
+    """
+    정밀도 모드에 맞게 변환된 모델 반환
+    - int8: classifier와 backbone의 nn.Linear를 동적 양자화한 복사본 (원본은 유지)
+    - fp32 / bf16: 원본 모델 그대로 (bf16은 forward 시 autocast로 처리)
+    """
+    if mode == "int8":
+        return torch.ao.quantization.quantize_dynamic(copy.deepcopy(model), {nn.Linear}, dtype=torch.qint8)
+    return model
+
+
+def autocast_context(mode: str, device: torch.device):
+    if mode == "bf16":
+        return torch.autocast(device_type=device.type, dtype=torch.bfloat16)
+    return nullcontext()
+
+
+def load_labelled_images(folder: str) -> List[Tuple[Path, str]]:
+    """
+    라벨별 하위 폴더 구조의 평가용 이미지 목록
+    예) folder/무증상/a.jpg, folder/농포_여드름/b.jpg → [(경로, 라벨), ...]
+    """
+    root = Path(folder)
+    if not root.is_dir():
+        raise FileNotFoundError(f"평가용 이미지 폴더를 찾을 수 없습니다: {root}")
+    samples = []
+    for label_dir in sorted(p for p in root.iterdir() if p.is_dir()):
+        for path in sorted(label_dir.iterdir()):
+            if path.suffix.lower() in IMAGE_EXTENSIONS:
+                samples.append((path, label_dir.name))
+    return samples
@@ -0,0 +1,85 @@
+# app/utils/prediction_cache.py
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+def content_hash(data: bytes) -> str:
+    """업로드 원본 바이트의 SHA-256"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class PredictionCache:
+    """
+    이미지 내용 해시 기반 예측 결과 캐시 (LRU + TTL)
+
+    - 메모리 상한은 max_entries (결과는 라벨/확률 정도의 작은 dict)
+    - model_key(체크포인트 식별자)가 바뀌면 이전 모델의 결과를 모두 폐기
+    - max_entries가 0 이하이면 캐시를 사용하지 않음
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600):
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._model_key = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def _check_model(self, model_key: str):
+        if model_key != self._model_key:
+            self._entries.clear()
+            self._model_key = model_key
+
+    def get(self, key: str, model_key: str) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            self._check_model(model_key)
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, model_key: str, value: Any):
+        if not self.enabled:
+            return
+        with self._lock:
+            # 조회 이후 모델이 교체되었다면 이전 모델의 결과는 저장하지 않음
+            if model_key != self._model_key:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,139 @@
+# app/utils/prediction_jobs.py
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional
+
+from app.utils.inference_executor import InferenceQueueFull
+
+
+class PredictionJob:
+    """
+    비동기 진단 작업 하나의 상태 (queued → running → done | failed)
+    - 상태 변경은 추론 스레드에서 요청해도 이벤트 루프에서 적용되고, 기다리는 구독자(SSE)를 깨움
+    """
+
+    def __init__(self, store: "PredictionJobStore", job_id: str, loop: asyncio.AbstractEventLoop):
+        self.store = store
+        self.id = job_id
+        self.status = "queued"
+        self.stages = []  # [{"stage": ..., "at": ...}]
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.version = 0
+        self._loop = loop
+        self._changed = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "stages": list(self.stages),
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at
+        }
+
+    def add_stage(self, stage: str):
+        """진행 단계 기록 (어느 스레드에서든 호출 가능)"""
+        self._update(status="running", stage=stage)
+
+    def finish(self, result=None, error: Optional[str] = None):
+        """최종 결과 또는 오류 기록 (어느 스레드에서든 호출 가능)"""
+        self._update(status="failed" if error else "done", result=result, error=error)
+
+    def _update(self, **fields):
+        try:
+            self._loop.call_soon_threadsafe(self._apply, fields)
+        except RuntimeError:
+            pass  # 이벤트 루프가 이미 종료됨 (서버 종료 중)
+
+    def _apply(self, fields):
+        if self.finished:
+            return
+        stage = fields.pop("stage", None)
+        if stage is not None:
+            self.stages.append({"stage": stage, "at": time.time()})
+        for key, value in fields.items():
+            setattr(self, key, value)
+        self.version += 1
+        if self.finished:
+            self.finished_at = time.time()
+            self.store._on_finished(self)
+        # 기다리던 구독자를 깨우고 다음 변경용 이벤트로 교체
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait_changed(self, version: int, timeout: float) -> bool:
+        """version 이후 상태가 바뀔 때까지 최대 timeout초 대기 (바뀌었으면 True)"""
+        if self.version != version:
+            return True
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+class PredictionJobStore:
+    """
+    진단 작업 저장소 (이벤트 루프 스레드에서만 접근)
+    - 진행 중(queued/running) 작업이 max_in_flight 이상이면 새 작업을 거절 (InferenceQueueFull → 503)
+    - 끝난 작업은 ttl_seconds 동안만 결과를 보관
+    """
+
+    def __init__(self, max_in_flight: int = 64, ttl_seconds: float = 600):
+        self.max_in_flight = max_in_flight
+        self.ttl = ttl_seconds
+        self._jobs = {}
+        self._finished = OrderedDict()  # job_id → finished_at (끝난 순서)
+        self.created = 0
+        self.rejected = 0
+
+    def create(self) -> PredictionJob:
+        self._purge()
+        if self.in_flight() >= self.max_in_flight:
+            self.rejected += 1
+            raise InferenceQueueFull("진행 중인 진단 작업이 너무 많습니다")
+        job = PredictionJob(self, uuid.uuid4().hex, asyncio.get_running_loop())
+        self._jobs[job.id] = job
+        self.created += 1
+        return job
+
+    def get(self, job_id: str) -> Optional[PredictionJob]:
+        self._purge()
+        return self._jobs.get(job_id)
+
+    def in_flight(self) -> int:
+        return len(self._jobs) - len(self._finished)
+
+    def _on_finished(self, job: PredictionJob):
+        self._finished[job.id] = job.finished_at
+
+    def _purge(self):
+        now = time.time()
+        while self._finished:
+            job_id, finished_at = next(iter(self._finished.items()))
+            if finished_at + self.ttl > now:
+                break
+            self._finished.popitem(last=False)
+            self._jobs.pop(job_id, None)
+
+    def stats(self) -> dict:
+        self._purge()
+        return {
+            "max_in_flight": self.max_in_flight,
+            "ttl_seconds": self.ttl,
+            "in_flight": self.in_flight(),
+            "finished": len(self._finished),
+            "created": self.created,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,64 @@
+# app/utils/runtimes.py
+from pathlib import Path
+
+import numpy as np
+import torch
+
+# eager: PyTorch 모델 직접 실행, torchscript: torch.jit 아티팩트, onnx: ONNX Runtime (CPU)
+RUNTIMES = ("eager", "torchscript", "onnx")
+ARTIFACT_SUFFIXES = {"torchscript": ".ts", "onnx": ".onnx"}
+
+INPUT_NAMES = ["x_full", "x_roi"]
+OUTPUT_NAMES = ["logits"]
+
+
+def validate_runtime(runtime: str) -> str:
+    runtime = (runtime or "eager").lower()
+    if runtime not in RUNTIMES:
+        raise ValueError(f"지원하지 않는 추론 런타임입니다: {runtime} (사용 가능: {', '.join(RUNTIMES)})")
+    return runtime
+
+
+def get_artifact_path(model_path: str, runtime: str) -> Path:
+    """체크포인트(.pth) 경로 → 같은 폴더의 런타임별 아티팩트 경로 (binary_best.pth → binary_best.onnx)"""
+    return Path(model_path).with_suffix(ARTIFACT_SUFFIXES[runtime])
+
+
+class OnnxRuntimeModel:
+    """ONNX Runtime 세션을 PyTorch 모델처럼 호출할 수 있게 감싼 래퍼 (입출력은 torch.Tensor)"""
+
+    def __init__(self, path: Path, num_threads: int = 0):
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            raise RuntimeError("onnx 런타임을 사용하려면 onnxruntime 패키지가 필요합니다")
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(str(path), sess_options=options, providers=["CPUExecutionProvider"])
+
+    def __call__(self, x_full: torch.Tensor, x_roi: torch.Tensor) -> torch.Tensor:
+        (logits,) = self.session.run(OUTPUT_NAMES, {
+            "x_full": np.ascontiguousarray(x_full.cpu().numpy()),
+            "x_roi": np.ascontiguousarray(x_roi.cpu().numpy()),
+        })
+        return torch.from_numpy(logits)
+
+
+def load_artifact(path: Path, runtime: str, device: torch.device):
+    """export_models 스크립트로 만든 아티팩트 로드"""
+    if not path.exists():
+        raise FileNotFoundError(
+            f"{runtime} 아티팩트를 찾을 수 없습니다: {path} (python -m app.scripts.export_models 로 생성)"
+        )
+    if runtime == "torchscript":
+        model = torch.jit.load(str(path), map_location=device)
+        model.eval()
+        return model
+    if runtime == "onnx":
+        if device.type != "cpu":
+            raise ValueError("onnx 런타임은 CPU에서만 사용할 수 있습니다")
+        return OnnxRuntimeModel(path, num_threads=torch.get_num_threads())
+    raise ValueError(f"아티팩트가 필요 없는 런타임입니다: {runtime}")
@@ -0,0 +1,183 @@
+# app/utils/upload.py
+"""
+업로드 이미지 수신 (진단 / 반려동물 사진 공통)
+
+- content_type이나 파일 이름 확장자 대신 앞부분 바이트(매직 넘버)로 이미지 형식 확인
+- 청크 단위로 읽으며 크기 상한을 넘는 순간 중단하고, 읽는 동안 SHA-256도 함께 계산 (다시 읽지 않음)
+- 형식이 맞지 않거나 너무 큰 업로드는 전체를 메모리에 올리거나 디코딩하기 전에 거절
+- 요청 본문 전체 크기는 RequestSizeLimitMiddleware가 multipart 파싱(임시 파일 저장) 전에 제한
+"""
+import asyncio
+import hashlib
+import os
+import uuid
+from typing import Optional
+
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+
+# 요청 본문 전체 상한 (0이면 제한 없음), /predict/batch는 파일 수 x 파일당 상한과 이 값 중 작은 쪽이 적용됨
+UPLOAD_MAX_REQUEST_BYTES = int(os.getenv("UPLOAD_MAX_REQUEST_BYTES", 128 * 1024 * 1024))
+# 반려동물 사진 등 저장만 하는 이미지의 파일당 상한 (진단 이미지는 PREDICT_MAX_UPLOAD_BYTES)
+UPLOAD_MAX_IMAGE_BYTES = int(os.getenv("UPLOAD_MAX_IMAGE_BYTES", 10 * 1024 * 1024))
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# 형식 → 저장 확장자 (HEIC는 PIL로 디코딩할 수 없어 진단에는 쓰지 않고 저장용으로만 허용)
+IMAGE_EXTENSIONS = {"jpeg": ".jpg", "png": ".png", "webp": ".webp", "heic": ".heic"}
+IMAGE_TYPES = tuple(IMAGE_EXTENSIONS)
+HEIC_BRANDS = {b"heic", b"heix", b"hevc", b"hevx", b"heim", b"heis", b"mif1", b"msf1"}
+SNIFF_BYTES = 12  # 형식 판별에 필요한 앞부분 길이
+
+
+class UploadRejected(ValueError):
+    pass
+
+class UploadTooLarge(UploadRejected):
+    pass
+
+class UnsupportedImageType(UploadRejected):
+    pass
+
+
+class IngestedUpload:
+    """검증을 마친 업로드 (content: 메모리로 읽은 경우, path: 파일로 저장한 경우)"""
+
+    def __init__(self, image_type: str, size: int, sha256: str, content: Optional[bytes] = None,
+                 path: Optional[str] = None):
+        self.image_type = image_type
+        self.size = size
+        self.sha256 = sha256
+        self.content = content
+        self.path = path
+
+    @property
+    def extension(self) -> str:
+        return IMAGE_EXTENSIONS[self.image_type]
+
+
+def sniff_image_type(head: bytes) -> Optional[str]:
+    """앞부분 바이트 → "jpeg" | "png" | "webp" | "heic", 알 수 없는 형식이면 None"""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    if head[4:8] == b"ftyp" and head[8:12] in HEIC_BRANDS:
+        return "heic"
+    return None
+
+
+def _type_message(allowed) -> str:
+    names = {"jpeg": "JPEG", "png": "PNG", "webp": "WebP", "heic": "HEIC"}
+    return f"{', '.join(names[t] for t in allowed)} 이미지만 업로드 가능합니다"
+
+
+def _iter_chunks(fileobj, max_bytes: int, allowed, digest):
+    """
+    형식을 확인한 뒤 청크를 순서대로 내보냄 (digest에 누적)
+    - 앞부분이 허용된 형식이 아니면 UnsupportedImageType, 합계가 max_bytes를 넘으면 UploadTooLarge
+    """
+    head = b""
+    while len(head) < SNIFF_BYTES:
+        chunk = fileobj.read(SNIFF_BYTES - len(head))
+        if not chunk:
+            break
+        head += chunk
+    image_type = sniff_image_type(head)
+    if image_type not in allowed:
+        raise UnsupportedImageType(_type_message(allowed))
+    yield image_type
+
+    size = len(head)
+    chunk = head
+    while chunk:
+        if size > max_bytes:
+            raise UploadTooLarge(f"파일이 너무 큽니다 (최대 {max_bytes // (1024 * 1024)}MB)")
+        digest.update(chunk)
+        yield chunk
+        chunk = fileobj.read(UPLOAD_CHUNK_SIZE)
+        size += len(chunk)
+
+
+def read_image(fileobj, max_bytes: int, allowed=IMAGE_TYPES) -> IngestedUpload:
+    """파일 객체에서 이미지를 메모리로 읽음 (형식 / 크기 위반 시 UploadRejected)"""
+    digest = hashlib.sha256()
+    chunks = _iter_chunks(fileobj, max_bytes, allowed, digest)
+    image_type = next(chunks)
+    content = b"".join(chunks)
+    return IngestedUpload(image_type, len(content), digest.hexdigest(), content=content)
+
+
+def save_image(fileobj, directory: str, name: str, max_bytes: int, allowed=IMAGE_TYPES) -> IngestedUpload:
+    """
+    파일 객체의 이미지를 directory/name.<확장자>로 저장 (확장자는 판별한 형식 기준)
+    - 임시 파일에 쓴 뒤 이름을 바꾸므로 거절되거나 실패하면 아무 파일도 남지 않음
+    """
+    digest = hashlib.sha256()
+    chunks = _iter_chunks(fileobj, max_bytes, allowed, digest)
+    image_type = next(chunks)
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = os.path.join(directory, f".{uuid.uuid4().hex}.tmp")
+    size = 0
+    try:
+        with open(tmp_path, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+                size += len(chunk)
+        path = os.path.join(directory, name + IMAGE_EXTENSIONS[image_type])
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return IngestedUpload(image_type, size, digest.hexdigest(), path=path)
+
+
+async def read_upload(upload: UploadFile, max_bytes: int, allowed=IMAGE_TYPES) -> IngestedUpload:
+    """비동기 엔드포인트용 read_image (디스크로 넘어간 임시 파일도 이벤트 루프를 막지 않도록 스레드에서 읽음)"""
+    return await asyncio.to_thread(read_image, upload.file, max_bytes, allowed)
+
+
+class RequestSizeLimitMiddleware:
+    """
+    요청 본문이 max_bytes를 넘으면 413 (ASGI 미들웨어)
+    - Content-Length가 상한을 넘으면 본문을 읽지 않고 바로 응답
+    - Content-Length 없이(chunked) 보내면 읽은 양을 세다가 넘는 순간 중단
+      (multipart 파싱 중에 발생하므로 임시 파일에는 상한까지만 기록됨)
+    """
+
+    def __init__(self, app, max_bytes: int = UPLOAD_MAX_REQUEST_BYTES):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    def _message(self) -> str:
+        return f"요청 크기가 너무 큽니다 (최대 {self.max_bytes // (1024 * 1024)}MB)"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.max_bytes <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_bytes:
+            response = JSONResponse(
+                status_code=413,
+                content={"detail": self._message()}
+            )
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # FastAPI는 본문 파싱 중 발생한 HTTPException을 그대로 응답으로 변환
+                    raise HTTPException(status_code=413, detail=self._message())
+            return message
+
+        await self.app(scope, limited_receive, send)
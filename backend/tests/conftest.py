@@ -0,0 +1,7 @@
+import os
+
+# API 모듈 import 시 읽는 메일 / 토큰 설정 (실제 메일은 보내지 않음), 모델은 미리 로드하지 않음
+for name, value in (("SMTP_SERVER", "localhost"), ("SMTP_EMAIL", "test@example.com"), ("SMTP_PASSWORD", "test"),
+                    ("MAIL_FROM", "test@example.com"), ("SECRET_KEY", "test-secret"),
+                    ("PREDICT_PRELOAD_MODELS", "false")):
+    os.environ.setdefault(name, value)
@@ -0,0 +1,30 @@
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+from app.database import InstrumentedQueuePool, pool_timeouts_total, pool_wait_seconds
+
+
+def _wait_count():
+    return pool_wait_seconds._series.get((), [0])[-1]
+
+
+def test_pool_metrics_move(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.sqlite'}", poolclass=InstrumentedQueuePool,
+        pool_size=1, max_overflow=0, pool_timeout=0.05
+    )
+    waits, timeouts = _wait_count(), pool_timeouts_total._values.get((), 0)
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        assert engine.pool.checkedout() == 1
+        assert _wait_count() == waits + 1
+
+        # 하나뿐인 커넥션을 잡고 있는 동안 두 번째 요청은 pool_timeout 후 실패
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+        assert pool_timeouts_total._values.get((), 0) == timeouts + 1
+        assert _wait_count() == waits + 2
+
+    assert engine.pool.checkedout() == 0
+    engine.dispose()
@@ -0,0 +1,49 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api import diagnosis
+from app.database import get_db
+from app.db_models import Base, DiagnosisHistory, Pet, User
+from app.utils.auth import create_access_token
+
+
+def test_delete_removes_stored_upload(tmp_path, monkeypatch):
+    monkeypatch.setattr(diagnosis, "remove_embedding", lambda diagnosis_id: None)
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    image = tmp_path / "1_20250101_000000_abcd1234.jpg"
+    image.write_bytes(b"\xff\xd8\xff")
+    db = Session()
+    user = User(name="user", email="user@example.com", password="x")
+    db.add(user)
+    db.commit()
+    pet = Pet(user_id=user.id, name="pet")
+    db.add(pet)
+    db.commit()
+    record = DiagnosisHistory(pet_id=pet.id, diagnosis="피부염", confidence=0.9, image_path=str(image))
+    db.add(record)
+    db.commit()
+    record_id = record.id
+    db.close()
+
+    def override_get_db():
+        session = Session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app = FastAPI()
+    app.include_router(diagnosis.router, prefix="/api")
+    app.dependency_overrides[get_db] = override_get_db
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": "user@example.com"})}
+
+    response = TestClient(app).delete(f"/api/diagnosis/{record_id}", headers=headers).json()
+
+    assert response["success"], response
+    assert not image.exists()
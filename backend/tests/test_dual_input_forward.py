@@ -0,0 +1,32 @@
+import torch
+import torch.nn.functional as F
+
+from app.inference.engine import DualInputConvNeXt
+
+
+def _two_pass_forward(model, x_full, x_roi):
+    """배치를 합치기 전의 방식: 전체 이미지와 ROI를 backbone에 따로 통과"""
+    pooled = []
+    for x in (x_full, x_roi):
+        features = model.backbone.forward_features(x)
+        if features.dim() == 4:
+            features = F.adaptive_avg_pool2d(features, 1)
+        pooled.append(features)
+    combined = torch.cat(pooled, dim=1)
+    return model.classifier(combined), combined.flatten(1)
+
+
+def test_fused_forward_matches_two_pass():
+    torch.manual_seed(0)
+    # 구조는 같고 크기만 작은 ConvNeXt로 확인 (convnext_base와 같은 LayerNorm 기반)
+    model = DualInputConvNeXt(model_name="convnext_atto", num_classes=6).eval()
+    x_full, x_roi = torch.randn(3, 3, 64, 64), torch.randn(3, 3, 64, 64)
+
+    with torch.no_grad():
+        logits, features = model.forward_with_features(x_full, x_roi)
+        ref_logits, ref_features = _two_pass_forward(model, x_full, x_roi)
+        forward_logits = model(x_full, x_roi)
+
+    torch.testing.assert_close(logits, ref_logits)
+    torch.testing.assert_close(features, ref_features)
+    torch.testing.assert_close(forward_logits, ref_logits)
@@ -0,0 +1,44 @@
+import json
+
+import numpy as np
+
+from app.utils.embedding_store import EmbeddingStore
+
+
+def _vectors(rng, n, dim=16):
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _ivf_meta(store):
+    with open(store.directory / "meta.json", encoding="utf-8") as f:
+        return json.load(f)["ivf"]
+
+
+def test_ivf_builds_and_retrains_on_add(tmp_path):
+    rng = np.random.default_rng(0)
+    store = EmbeddingStore(tmp_path, nprobe=4, ivf_min_rows=100, ivf_retrain_factor=2.0)
+    vectors = _vectors(rng, 250)
+
+    store.add_many(range(99), vectors[:99])
+    assert store.stats()["ivf_nlist"] is None  # 기준 미만이면 전체 계산
+
+    store.add(99, vectors[99].astype(np.float16).tobytes())
+    assert _ivf_meta(store)["rows"] == 100
+    assert store.stats()["ivf_nlist"] == 10
+
+    store.add_many(range(100, 199), vectors[100:199])
+    assert _ivf_meta(store)["rows"] == 100  # 학습 시점의 2배 전에는 그대로
+
+    store.add_many(range(199, 250), vectors[199:250])
+    assert _ivf_meta(store)["rows"] == 250
+
+    # IVF 경로에서도 자기 자신과 같은 벡터가 가장 가까움
+    for diagnosis_id in (5, 150, 249):
+        assert store.search(vectors[diagnosis_id], k=1)[0][0] == diagnosis_id
+
+
+def test_ivf_auto_build_disabled(tmp_path):
+    store = EmbeddingStore(tmp_path, ivf_min_rows=0)
+    store.add_many(range(300), _vectors(np.random.default_rng(1), 300))
+    assert store.stats()["ivf_nlist"] is None
@@ -0,0 +1,22 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def test_pool_mode_api_process_stays_torch_free_and_within_budget():
+    env = dict(os.environ)
+    env["INFERENCE_POOL_SOCKET"] = "/tmp/petskin-inference-test.sock"
+    # main.py import 중 메일 설정을 읽으므로 값이 없으면 채워 둠 (실제로 메일을 보내지는 않음)
+    for name, value in (("SMTP_SERVER", "localhost"), ("SMTP_EMAIL", "test@example.com"),
+                        ("SMTP_PASSWORD", "test"), ("MAIL_FROM", "test@example.com")):
+        env.setdefault(name, value)
+
+    completed = subprocess.run(
+        [sys.executable, "-m", "app.scripts.check_import_budget", "--repeat", "3", "--top", "0"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=300
+    )
+
+    assert completed.returncode == 0, completed.stdout + completed.stderr
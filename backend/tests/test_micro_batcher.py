@@ -0,0 +1,82 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.utils.batching import MicroBatcher
+from app.utils.inference_executor import InferenceQueueFull
+
+
+def test_concurrent_requests_share_a_batch():
+    batches = []
+
+    def handler(items):
+        batches.append(list(items))
+        return [item * 10 for item in items]
+
+    async def run():
+        batcher = MicroBatcher(handler, max_batch_size=4, max_wait_ms=50)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(6)))
+        await batcher.close()
+        return results, batcher.stats()
+
+    results, stats = asyncio.run(run())
+
+    assert results == [0, 10, 20, 30, 40, 50]  # 결과는 요청 순서대로
+    assert batches == [[0, 1, 2, 3], [4, 5]]
+    assert stats["batches"] == 2
+
+
+def test_exception_result_only_fails_its_request():
+    def handler(items):
+        return [ValueError("bad") if item == "bad" else item for item in items]
+
+    async def run():
+        batcher = MicroBatcher(handler, max_batch_size=3, max_wait_ms=50)
+        results = await asyncio.gather(*(batcher.submit(i) for i in ("a", "bad", "c")), return_exceptions=True)
+        await batcher.close()
+        return results
+
+    a, bad, c = asyncio.run(run())
+
+    assert (a, c) == ("a", "c")
+    assert isinstance(bad, ValueError)
+
+
+def test_queue_full_when_pending_exceeds_limit():
+    release = threading.Event()
+
+    def handler(items):
+        release.wait(5)
+        return items
+
+    async def run():
+        batcher = MicroBatcher(handler, max_batch_size=1, max_wait_ms=0, max_queue_size=2)
+        first = asyncio.ensure_future(batcher.submit(0))
+        await asyncio.sleep(0.05)  # 첫 요청은 처리 중 (대기열에서 빠짐)
+        queued = [asyncio.ensure_future(batcher.submit(i)) for i in (1, 2)]
+        await asyncio.sleep(0)
+        with pytest.raises(InferenceQueueFull):
+            await batcher.submit(3)
+        release.set()
+        results = await asyncio.gather(first, *queued)
+        await batcher.close()
+        return results
+
+    assert asyncio.run(run()) == [0, 1, 2]
+
+
+def test_close_drains_pending_and_rejects_new_requests():
+    def handler(items):
+        return items
+
+    async def run():
+        batcher = MicroBatcher(handler, max_batch_size=8, max_wait_ms=10_000)
+        pending = [asyncio.ensure_future(batcher.submit(i)) for i in range(3)]
+        await asyncio.sleep(0)
+        await batcher.close()  # max_wait를 기다리지 않고 바로 처리
+        with pytest.raises(InferenceQueueFull):
+            await batcher.submit(99)
+        return [future.result() for future in pending]
+
+    assert asyncio.run(asyncio.wait_for(run(), 5)) == [0, 1, 2]
@@ -0,0 +1,28 @@
+from sqlalchemy import create_engine, inspect, text
+
+from app.scripts import migrate_diagnosis_image_path as migration
+
+
+def _engine_without_column(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'db.sqlite'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE diagnosis_history (id INTEGER PRIMARY KEY, diagnosis VARCHAR(100))"))
+    return engine
+
+
+def test_adds_column_once(tmp_path):
+    engine = _engine_without_column(tmp_path)
+
+    assert migration.add_image_path_column(engine) is True
+    assert migration.add_image_path_column(engine) is False
+    assert "image_path" in {c["name"] for c in inspect(engine).get_columns("diagnosis_history")}
+
+
+def test_tolerates_column_added_concurrently(tmp_path, monkeypatch):
+    engine = _engine_without_column(tmp_path)
+    migration.add_image_path_column(engine)
+    # 확인 시점에는 없었지만 ALTER 직전에 다른 프로세스가 추가한 경우 (중복 컬럼 오류)
+    checks = iter([False, True])
+    monkeypatch.setattr(migration, "_has_column", lambda bind: next(checks))
+
+    assert migration.add_image_path_column(engine) is False
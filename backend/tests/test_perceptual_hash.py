@@ -0,0 +1,48 @@
+import json
+import threading
+
+from app.utils.perceptual_hash import PerceptualHashIndex
+
+
+def test_concurrent_saves_keep_index_readable(tmp_path):
+    path = tmp_path / "phash.json"
+    indexes = []
+    for worker in range(4):
+        index = PerceptualHashIndex(path)
+        for i in range(200):
+            index.add(f"user-{worker}-{i}", i, "model", {"label": "정상", "probability": 0.9})
+        indexes.append(index)
+
+    def save_repeatedly(index):
+        for _ in range(20):
+            index.save(force=True)
+
+    threads = [threading.Thread(target=save_repeatedly, args=(index,)) for index in indexes]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with open(path, encoding="utf-8") as f:
+        assert len(json.load(f)["users"]) == 200
+    assert [p.name for p in tmp_path.iterdir()] == ["phash.json"]  # 임시 파일이 남지 않음
+
+    restored = PerceptualHashIndex(path)
+    restored.load()
+    assert restored.stats()["users"] == 200
+
+
+def test_load_ignores_malformed_file(tmp_path):
+    path = tmp_path / "phash.json"
+    for content in (
+        "{not json",
+        "[]",
+        '{"users": []}',
+        '{"users": {"u": [["ff", "model"]]}}',
+        '{"users": {"u": [[1, "model", null, 0, {}]]}}',
+        '{"users": {"u": 3}}',
+    ):
+        path.write_text(content, encoding="utf-8")
+        index = PerceptualHashIndex(path)
+        index.load()
+        assert index.stats()["users"] == 0, content
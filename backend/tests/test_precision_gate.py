@@ -0,0 +1,43 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.inference import engine
+
+
+def _model(name):
+    return SimpleNamespace(name=name, with_precision=lambda mode: SimpleNamespace(name=f"{name}-{mode}"))
+
+
+def test_unverified_precision_fails_startup(monkeypatch):
+    monkeypatch.setattr(engine, "PREDICT_PRECISION", "int8")
+    monkeypatch.setattr(engine, "PRECISION_EVAL_DIR", None)
+    monkeypatch.setattr(engine, "PRECISION_ALLOW_UNVERIFIED", False)
+
+    with pytest.raises(ValueError, match="PRECISION_EVAL_DIR"):
+        engine._apply_precision(_model("binary"), _model("disease"))
+
+
+def test_unverified_precision_opt_in(monkeypatch):
+    monkeypatch.setattr(engine, "PREDICT_PRECISION", "int8")
+    monkeypatch.setattr(engine, "PRECISION_EVAL_DIR", None)
+    monkeypatch.setattr(engine, "PRECISION_ALLOW_UNVERIFIED", True)
+
+    binary, disease, report = engine._apply_precision(_model("binary"), _model("disease"))
+
+    assert (binary.name, disease.name) == ("binary-int8", "disease-int8")
+    assert report == {"precision": "int8", "verified": False}
+
+
+def test_load_models_reports_precision_failure(monkeypatch):
+    monkeypatch.setattr(engine, "PREDICT_PRECISION", "int8")
+    monkeypatch.setattr(engine, "PRECISION_EVAL_DIR", None)
+    monkeypatch.setattr(engine, "PRECISION_ALLOW_UNVERIFIED", False)
+    monkeypatch.setattr(engine.model_registry, "resolve", lambda version=None: ("v1", {"binary": "b", "disease": "d"}))
+    monkeypatch.setattr(engine, "SkinModel", lambda path, num_classes, runtime: _model(path))
+    monkeypatch.setattr(engine, "model_state", dict(engine.model_state, status="not_loaded"))
+
+    with pytest.raises(RuntimeError):
+        engine.load_models(warm_up=False)
+    assert engine.model_state["status"] == "failed"
+    assert "PRECISION_EVAL_DIR" in engine.model_state["error"]
@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+
+from app.utils import prediction_cache
+from app.utils.prediction_cache import PredictionCache
+
+
+def test_lru_eviction():
+    cache = PredictionCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", "model", 1)  # 모델 키가 정해지기 전(첫 조회 전)의 저장은 무시
+    assert cache.get("a", "model") is None
+
+    cache.set("a", "model", 1)
+    cache.set("b", "model", 2)
+    assert cache.get("a", "model") == 1  # a를 최근 사용으로 갱신
+    cache.set("c", "model", 3)
+
+    assert cache.get("b", "model") is None
+    assert (cache.get("a", "model"), cache.get("c", "model")) == (1, 3)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(prediction_cache, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    cache = PredictionCache(max_entries=4, ttl_seconds=10)
+    cache.get("a", "model")
+    cache.set("a", "model", 1)
+
+    now[0] += 9
+    assert cache.get("a", "model") == 1
+    now[0] += 2
+    assert cache.get("a", "model") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_model_key_change_drops_previous_results():
+    cache = PredictionCache(max_entries=4, ttl_seconds=60)
+    cache.get("a", "v1")
+    cache.set("a", "v1", "old")
+
+    assert cache.get("a", "v2") is None
+    cache.set("a", "v1", "stale")  # 교체 전 모델의 늦은 결과는 저장하지 않음
+    assert cache.get("a", "v2") is None
+    assert cache.get("a", "v1") is None
+
+
+def test_disabled_cache():
+    cache = PredictionCache(max_entries=0)
+    cache.get("a", "model")
+    cache.set("a", "model", 1)
+    assert cache.get("a", "model") is None
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from app.utils.image_quality import ImageQualityError, QualityGate
+
+SIZE = (640, 480)
+
+
+def _textured(color, seed=0):
+    """색 주변으로 픽셀마다 흔들린 썸네일 (선명도가 충분히 높음)"""
+    noise = np.random.default_rng(seed).integers(-25, 25, (128, 128, 1))
+    return np.clip(np.array(color) + noise, 0, 255).astype(np.uint8)
+
+
+def _rejected_check(gate, thumbnail, size=SIZE):
+    with pytest.raises(ImageQualityError) as info:
+        gate.check(thumbnail, size)
+    return info.value.check
+
+
+def test_good_photo_passes():
+    metrics = QualityGate().check(_textured((200, 150, 120)), SIZE)
+    assert metrics["width"] == 640 and metrics["skin_ratio"] > 0.9
+
+
+@pytest.mark.parametrize("thumbnail, size, check", [
+    (_textured((200, 150, 120)), (200, 150), "resolution"),
+    (np.zeros((128, 128, 3), dtype=np.uint8), SIZE, "dark"),
+    (np.full((128, 128, 3), 255, dtype=np.uint8), SIZE, "overexposed"),
+    (np.full((128, 128, 3), (200, 150, 120), dtype=np.uint8), SIZE, "blur"),
+    (_textured((20, 60, 220)), SIZE, "content"),
+])
+def test_each_check_rejects(thumbnail, size, check):
+    assert _rejected_check(QualityGate(), thumbnail, size) == check
+
+
+def test_rejection_result_carries_metrics():
+    flat = np.full((128, 128, 3), (200, 150, 120), dtype=np.uint8)
+    with pytest.raises(ImageQualityError) as info:
+        QualityGate().check(flat, SIZE)
+    result = info.value.to_result()
+    assert result["rejected"] == "blur"
+    assert result["quality"]["sharpness"] == 0.0
+
+
+def test_thresholds_are_configurable():
+    flat = np.full((128, 128, 3), (200, 150, 120), dtype=np.uint8)
+    assert QualityGate(min_sharpness=0).check(flat, SIZE)["sharpness"] == 0.0
+    assert QualityGate(min_side=100).check(_textured((200, 150, 120)), (200, 150))["width"] == 200
+    assert _rejected_check(QualityGate(min_brightness=200), _textured((200, 150, 120))) == "dark"
+    assert QualityGate(min_skin_ratio=0).check(_textured((20, 60, 220)), SIZE)["skin_ratio"] == 0.0
@@ -0,0 +1,39 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.api import predict
+from app.utils.prediction_cache import PredictionCache
+from app.utils.upload import IngestedUpload
+
+
+def _rejected_count():
+    return predict.quality_rejected_total._values.get(("blur",), 0)
+
+
+def test_rejection_counted_once_per_gate_decision(monkeypatch):
+    calls = []
+
+    def fake_predict_batch(image_files, roi_boxes, progress):
+        calls.append(len(image_files))
+        return [{"rejected": "blur", "message": "사진이 흐립니다", "quality": {}} for _ in image_files]
+
+    monkeypatch.setattr(predict, "engine", SimpleNamespace(
+        load_models=lambda: None, hierarchical_predict_batch=fake_predict_batch
+    ))
+    monkeypatch.setattr(predict, "models_ready", lambda: True)
+    monkeypatch.setattr(predict, "get_model_key", lambda: "model")
+    monkeypatch.setattr(predict, "prediction_cache", PredictionCache(max_entries=16))
+    upload = IngestedUpload("jpeg", 3, "digest", content=b"\xff\xd8\xff")
+    before = _rejected_count()
+
+    async def run():
+        first, _ = await predict.predict_upload(upload)
+        second, reused = await predict.predict_upload(upload)  # 같은 이미지 → 캐시된 거절 결과
+        return first, second, reused
+
+    first, second, reused = asyncio.run(run())
+
+    assert first["rejected"] == second["rejected"] == "blur"
+    assert reused == {"reason": "exact"}
+    assert calls == [1]
+    assert _rejected_count() == before + 1
@@ -0,0 +1,40 @@
+import io
+from types import SimpleNamespace
+
+import pytest
+import torch
+from PIL import Image
+
+from app.inference import engine
+
+
+def _jpeg(color, size=(400, 400)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, "JPEG")
+    buffer.seek(0)
+    return buffer
+
+
+def test_run_cascade_empty_batch():
+    empty = torch.empty(0, 3, engine.INPUT_SIZE, engine.INPUT_SIZE)
+    assert engine.run_cascade(None, None, empty, empty) == []
+
+
+@pytest.mark.skipif(not engine.PREDICT_QUALITY_GATE, reason="품질 사전 검사가 꺼져 있음")
+def test_batch_with_every_image_rejected(monkeypatch):
+    # 모델은 실행되지 않아야 하므로 로드하지 않고 빈 묶음으로 대체
+    monkeypatch.setattr(engine, "load_models", lambda warm_up=True: None)
+    monkeypatch.setattr(engine, "active_models", SimpleNamespace(binary=None, disease=None, version="test"))
+    # hierarchical_predict_batch는 예외를 결과로 바꾸므로 run_cascade가 예외 없이 끝났는지 직접 확인
+    outputs = []
+    run_cascade = engine.run_cascade
+    monkeypatch.setattr(engine, "run_cascade", lambda *args: outputs.append(run_cascade(*args)) or outputs[-1])
+
+    results = engine.hierarchical_predict_batch([_jpeg((0, 0, 0)), _jpeg((255, 255, 255))])
+
+    assert outputs == [[]]
+
+    assert len(results) == 2
+    for result in results:
+        assert isinstance(result, dict), result
+        assert result["rejected"]
@@ -0,0 +1,42 @@
+import pytest
+import torch
+
+from app.inference.engine import DualInputConvNeXt
+from app.scripts.export_models import export_onnx, export_torchscript
+from app.utils.runtimes import get_artifact_path, load_artifact
+
+INPUT_SIZE = 64
+
+
+@pytest.fixture(scope="module")
+def eager_model():
+    torch.manual_seed(0)
+    return DualInputConvNeXt(model_name="convnext_atto", num_classes=6).eval()
+
+
+def _inputs(batch_size):
+    return torch.randn(batch_size, 3, INPUT_SIZE, INPUT_SIZE), torch.randn(batch_size, 3, INPUT_SIZE, INPUT_SIZE)
+
+
+@pytest.mark.parametrize("runtime", ["torchscript", "onnx"])
+def test_exported_runtime_matches_eager(runtime, eager_model, tmp_path):
+    if runtime == "onnx":
+        pytest.importorskip("onnx")
+        pytest.importorskip("onnxruntime")
+
+    # export_models와 같은 방식으로 배치 2로 내보낸 뒤 다른 배치 크기에서도 비교 (동적 배치 확인)
+    path = get_artifact_path(tmp_path / "model.pth", runtime)
+    example = _inputs(2)
+    if runtime == "torchscript":
+        export_torchscript(eager_model, example, path)
+    else:
+        export_onnx(eager_model, example, path, opset=17)
+    model = load_artifact(path, runtime, torch.device("cpu"))
+
+    for batch_size in (1, 3):
+        x_full, x_roi = _inputs(batch_size)
+        with torch.no_grad():
+            expected = eager_model(x_full, x_roi)
+            actual = model(x_full, x_roi).float()
+        torch.testing.assert_close(actual, expected, atol=1e-3, rtol=1e-3)
+        assert torch.equal(actual.argmax(1), expected.argmax(1))
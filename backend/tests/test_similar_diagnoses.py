@@ -0,0 +1,75 @@
+import numpy as np
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api import diagnosis
+from app.database import get_db
+from app.db_models import Base, DiagnosisHistory, Pet, User
+from app.utils.auth import create_access_token
+from app.utils.embedding_store import EmbeddingStores
+
+
+def _client(tmp_path, monkeypatch):
+    """사용자 A, B가 각각 진단 기록 하나씩을 가진 앱 (두 기록의 임베딩은 거의 같음) → (클라이언트, A 기록 ID, B 기록 ID)"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    db = Session()
+    record_ids = []
+    for name in ("a", "b"):
+        user = User(name=name, email=f"{name}@example.com", password="x")
+        db.add(user)
+        db.commit()
+        pet = Pet(user_id=user.id, name=f"pet-{name}")
+        db.add(pet)
+        db.commit()
+        record = DiagnosisHistory(pet_id=pet.id, diagnosis="피부염", confidence=0.9)
+        db.add(record)
+        db.commit()
+        record_ids.append(record.id)
+    db.close()
+
+    stores = EmbeddingStores(tmp_path / "embeddings", ivf_min_rows=0)
+    vector = np.ones(8, dtype=np.float32) / np.sqrt(8)
+    stores.get("default").add_many(record_ids, np.stack([vector, vector]))
+    monkeypatch.setattr(diagnosis, "get_embedding_stores", lambda: stores)
+
+    def override_get_db():
+        session = Session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app = FastAPI()
+    app.include_router(diagnosis.router, prefix="/api")
+    app.dependency_overrides[get_db] = override_get_db
+    return TestClient(app), record_ids[0], record_ids[1]
+
+
+def _similar(client, record_id):
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": "a@example.com"})}
+    response = client.get(f"/api/diagnosis/{record_id}/similar", headers=headers).json()
+    assert response["success"], response
+    return response["data"]["results"]
+
+
+def test_similar_excludes_other_users_by_default(tmp_path, monkeypatch):
+    client, record_a, _ = _client(tmp_path, monkeypatch)
+    assert _similar(client, record_a) == []
+
+
+def test_similar_other_users_opt_in(tmp_path, monkeypatch):
+    monkeypatch.setattr(diagnosis, "SIMILAR_INCLUDE_OTHER_USERS", True)
+    client, record_a, _ = _client(tmp_path, monkeypatch)
+
+    results = _similar(client, record_a)
+
+    assert len(results) == 1
+    assert results[0]["own"] is False
+    assert results[0]["id"] is None and results[0]["pet_name"] is None and results[0]["created_at"] is None
+    assert results[0]["diagnosis"] == "피부염"
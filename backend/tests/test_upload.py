@@ -0,0 +1,84 @@
+import io
+
+import pytest
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+from app.utils.upload import (
+    RequestSizeLimitMiddleware, UnsupportedImageType, UploadTooLarge, read_image, save_image, sniff_image_type
+)
+
+JPEG = b"\xff\xd8\xff\xe0" + b"\x00" * 60
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 60
+
+
+@pytest.mark.parametrize("head, expected", [
+    (JPEG, "jpeg"),
+    (PNG, "png"),
+    (b"RIFF\x00\x00\x00\x00WEBPVP8 ", "webp"),
+    (b"\x00\x00\x00\x18ftypheic", "heic"),
+    (b"GIF89a" + b"\x00" * 10, None),
+    (b"%PDF-1.7", None),
+    (b"", None),
+])
+def test_sniff_image_type(head, expected):
+    assert sniff_image_type(head[:12]) == expected
+
+
+def test_read_image_checks_bytes_not_name():
+    upload = read_image(io.BytesIO(JPEG), max_bytes=1024)
+    assert (upload.image_type, upload.size, upload.extension) == ("jpeg", len(JPEG), ".jpg")
+
+    with pytest.raises(UnsupportedImageType):
+        read_image(io.BytesIO(b"<html>" + b"\x00" * 60), max_bytes=1024)
+    with pytest.raises(UnsupportedImageType):
+        read_image(io.BytesIO(PNG), max_bytes=1024, allowed=("jpeg",))
+
+
+def test_read_image_size_cap():
+    assert read_image(io.BytesIO(JPEG), max_bytes=len(JPEG)).size == len(JPEG)
+    with pytest.raises(UploadTooLarge):
+        read_image(io.BytesIO(JPEG + b"\x00"), max_bytes=len(JPEG))
+
+
+def test_save_image_leaves_nothing_on_rejection(tmp_path):
+    with pytest.raises(UploadTooLarge):
+        save_image(io.BytesIO(JPEG * 4), str(tmp_path), "photo", max_bytes=len(JPEG))
+    assert list(tmp_path.iterdir()) == []
+
+    upload = save_image(io.BytesIO(PNG), str(tmp_path), "photo", max_bytes=1024)
+    assert upload.path == str(tmp_path / "photo.png")
+    assert [p.name for p in tmp_path.iterdir()] == ["photo.png"]
+
+
+def _size_limited_client(max_bytes):
+    app = FastAPI()
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    app.add_middleware(RequestSizeLimitMiddleware, max_bytes=max_bytes)
+    return TestClient(app)
+
+
+def test_request_size_limit_by_content_length():
+    client = _size_limited_client(1024)
+    assert client.post("/upload", files={"file": ("a.jpg", JPEG)}).json() == {"size": len(JPEG)}
+
+    response = client.post("/upload", files={"file": ("a.jpg", JPEG * 40)})
+    assert response.status_code == 413
+
+
+def test_request_size_limit_without_content_length():
+    client = _size_limited_client(1024)
+
+    def chunks():
+        # Content-Length 없이(chunked) 보내는 multipart 본문
+        yield b'--b\r\nContent-Disposition: form-data; name="file"; filename="a.jpg"\r\n\r\n'
+        for _ in range(40):
+            yield JPEG
+        yield b"\r\n--b--\r\n"
+
+    response = client.post("/upload", content=chunks(), headers={"Content-Type": "multipart/form-data; boundary=b"})
+    assert response.status_code == 413
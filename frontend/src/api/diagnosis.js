@@ -31,12 +31,15 @@ export async function diagnoseSkinDisease(file) {
  * @param {number} petId - 반려동물 ID
  * @param {string} diagnosis - 진단 결과
  * @param {number} confidence - 신뢰도
+ * @param {string} details - 상세 내용
+ * @param {string|null} modelVersion - 예측에 사용한 AI 모델 버전
+ * @param {string|null} predictionId - 예측 응답의 prediction_id (유사 사례 검색용)
  */
-export async function saveDiagnosis(petId, diagnosis, confidence, details = "") {
+export async function saveDiagnosis(petId, diagnosis, confidence, details = "", modelVersion = null, predictionId = null) {
   try {
     const response = await axios.post(
       `${BASE_URL}/api/diagnosis/save`,
-      { pet_id: petId, diagnosis, confidence, details },  
+      { pet_id: petId, diagnosis, confidence, details, model_version: modelVersion, prediction_id: predictionId },  
       { headers: getAuthHeaders() }
     )
     return response.data.data
@@ -45,6 +48,33 @@ export async function saveDiagnosis(petId, diagnosis, confidence, details = "")
   }
 }
 
+/**
+ * 이미지 진단 후 결과를 바로 진단 이력으로 저장 (진단 요청과 저장을 한 번에)
+ * @param {number} petId - 반려동물 ID
+ * @param {File} file - 업로드할 이미지 파일
+ * @param {string} details - 상세 내용
+ * @returns {Promise<Object>} - { id, pet_name, diagnosis, confidence, details, image_path, model_version, created_at }
+ */
+export async function predictAndSaveDiagnosis(petId, file, details = "") {
+  const formData = new FormData()
+  formData.append('pet_id', petId)
+  formData.append('file', file)
+  if (details) formData.append('details', details)
+
+  try {
+    const response = await axios.post(`${BASE_URL}/api/diagnosis/predict`, formData, {
+      headers: {
+        ...getAuthHeaders(),
+        'Content-Type': 'multipart/form-data'
+      }
+    })
+    if (!response.data.success) throw new Error(response.data.message)
+    return response.data.data
+  } catch (error) {
+    throw new Error('진단 저장 실패: ' + (error.response?.data?.detail || error.message))
+  }
+}
+
 /**
  * 진단 이력 조회
  * @param {number} petId - 반려동물 ID